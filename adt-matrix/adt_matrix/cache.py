@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+
+# SPDX-FileCopyrightText: Canonical Ltd.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import json
+import os
+import sqlite3
+
+
+class ResultsCache(object):
+    '''
+    The per-series adt-matrix result cache.
+
+    Results are held one row per kernel version ("<version> <source>") so
+    that a run loads only the versions of the source it renders and a save
+    rewrites only the versions which changed.  The remaining series wide
+    state (seen, latest, kernel_abi, first_good and current) is held one
+    row per key.
+
+    The legacy JSON cache file is imported whenever it changes underneath
+    us and may be exported on demand in the same format.
+    '''
+
+    STATE = ('seen', 'latest', 'kernel_abi', 'first_good', 'current')
+
+    def __init__(self, path, legacy=None):
+        self.path = path
+        self.legacy = legacy
+
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS results '
+                        '(version TEXT PRIMARY KEY, source TEXT NOT NULL, data TEXT NOT NULL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS results_source ON results (source)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, data TEXT NOT NULL)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+
+        # The serialised form of everything we have handed out, so that we
+        # can tell what has changed when it comes back.
+        self._results = {}
+        self._state = {}
+
+        if (legacy is not None and os.path.exists(legacy) and
+                self.meta('legacy_mtime') != str(os.stat(legacy).st_mtime_ns)):
+            self.legacy_import()
+
+    @staticmethod
+    def encode(data):
+        return json.dumps(data, separators=(',', ':'))
+
+    @staticmethod
+    def version_source(version):
+        return version.split(' ', 1)[-1]
+
+    def meta(self, name):
+        row = self.db.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def set_meta(self, name, value):
+        self.db.execute('INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)', (name, value))
+
+    def close(self):
+        self.db.close()
+
+    def load(self, source):
+        '''
+        Return (state, results) where state is a dict of the series wide
+        state and results holds only the versions of source.
+        '''
+        state = {}
+        for name in self.STATE:
+            row = self.db.execute('SELECT data FROM state WHERE name = ?', (name,)).fetchone()
+            self._state[name] = row[0] if row is not None else None
+            state[name] = json.loads(row[0]) if row is not None else {}
+
+        results = {}
+        rows = self.db.execute('SELECT version, data FROM results WHERE source = ? ORDER BY rowid', (source,))
+        for (version, data) in rows:
+            self._results[version] = data
+            results[version] = json.loads(data)
+
+        return (state, results)
+
+    def fault(self, results, version):
+        '''Bring version into results if we have it and it is not already there.'''
+        if version in results or version in self._results:
+            return
+        row = self.db.execute('SELECT data FROM results WHERE version = ?', (version,)).fetchone()
+        if row is not None:
+            self._results[version] = row[0]
+            results[version] = json.loads(row[0])
+
+    def save(self, state, results):
+        '''Write back any state and versions which have changed.'''
+        changed = False
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            for name in self.STATE:
+                data = self.encode(state[name])
+                if data != self._state.get(name):
+                    self.db.execute('INSERT OR REPLACE INTO state (name, data) VALUES (?, ?)', (name, data))
+                    self._state[name] = data
+                    changed = True
+
+            for (version, result) in results.items():
+                data = self.encode(result)
+                if data == self._results.get(version):
+                    continue
+                if version in self._results:
+                    self.db.execute('UPDATE results SET data = ? WHERE version = ?', (data, version))
+                else:
+                    self.db.execute('INSERT OR REPLACE INTO results (version, source, data) VALUES (?, ?, ?)',
+                                    (version, self.version_source(version), data))
+                self._results[version] = data
+                changed = True
+
+            for version in [version for version in self._results if version not in results]:
+                self.db.execute('DELETE FROM results WHERE version = ?', (version,))
+                del self._results[version]
+                changed = True
+
+            if changed:
+                self.set_meta('exported', None)
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+
+        return changed
+
+    def legacy_import(self, path=None):
+        '''Replace our contents with those of a legacy JSON cache file.'''
+        if path is None:
+            path = self.legacy
+        with open(path) as cfd:
+            tmp = json.load(cfd)
+        if 'missing' in tmp:
+            current = tmp.setdefault('current', {})
+            for key in tmp['missing']:
+                current[key] = {'MISS': tmp['missing'][key]}
+
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.db.execute('DELETE FROM state')
+            self.db.execute('DELETE FROM results')
+            for name in self.STATE:
+                self.db.execute('INSERT INTO state (name, data) VALUES (?, ?)', (name, self.encode(tmp.get(name, {}))))
+            self.db.executemany('INSERT INTO results (version, source, data) VALUES (?, ?, ?)',
+                                ((version, self.version_source(version), self.encode(result))
+                                 for (version, result) in tmp.get('results', {}).items()))
+            if path == self.legacy:
+                self.set_meta('legacy_mtime', str(os.stat(path).st_mtime_ns))
+                self.set_meta('exported', '1')
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+
+        self._results = {}
+        self._state = {}
+
+    def legacy_export(self, path=None, force=False):
+        '''
+        Write our contents out as a legacy JSON cache file, by default only
+        if they have changed since they were last imported or exported.
+        '''
+        if path is None:
+            path = self.legacy
+        if not force and path == self.legacy and self.meta('exported'):
+            return False
+
+        tmp = {}
+        for name in ('seen', 'results', 'latest', 'kernel_abi', 'first_good', 'current'):
+            if name == 'results':
+                rows = self.db.execute('SELECT version, data FROM results ORDER BY rowid')
+                tmp[name] = {version: json.loads(data) for (version, data) in rows}
+                continue
+            row = self.db.execute('SELECT data FROM state WHERE name = ?', (name,)).fetchone()
+            tmp[name] = json.loads(row[0]) if row is not None else {}
+
+        with open(path + '.new', 'w') as cfd:
+            json.dump(tmp, cfd, indent=2)
+        os.rename(path + '.new', path)
+
+        if path == self.legacy:
+            self.set_meta('legacy_mtime', str(os.stat(path).st_mtime_ns))
+            self.set_meta('exported', '1')
+        return True
@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+
+# SPDX-FileCopyrightText: Canonical Ltd.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import http.client
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+
+# The members of an autopkgtest result.tar which we consume.
+RESULT_MEMBERS = ('exitcode', 'testpkg-version', 'summary', 'testinfo.json', 'testbed-packages')
+
+
+class SwiftResult(object):
+    '''
+    The interesting members of a single autopkgtest result.tar.
+
+    status is the HTTP status of the fetch, or None if the fetch itself
+    failed in which case error carries the exception.  damaged carries any
+    error encountered decoding the tar stream.
+    '''
+
+    def __init__(self, url):
+        self.url = url
+        self.status = None
+        self.error = None
+        self.damaged = None
+        self.members = {}
+
+    def member(self, name):
+        '''
+        Return the content of the named member, raising KeyError if it was
+        not present in the result, or the decode error if the tar was damaged
+        before it was found.
+        '''
+        if name in self.members:
+            return self.members[name]
+        if self.damaged is not None:
+            raise self.damaged
+        raise KeyError(name)
+
+
+class SwiftFetcher(object):
+    '''
+    Concurrent fetcher for swift listings and results.  Connections are
+    kept alive and pooled per host, with at most per_host connections to
+    any one host in use at a time.
+    '''
+
+    redirects = 5
+
+    def __init__(self, workers=16, per_host=8, timeout=120):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+        self._executor = None
+
+    def map(self, fn, *iterables):
+        '''Apply fn over iterables concurrently, yielding results in order.'''
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='swift')
+        return self._executor.map(fn, *iterables)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle = {}
+
+    def _slot(self, key):
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.per_host)
+        return slot
+
+    def _checkout(self, key):
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                return conns.pop(), True
+        (scheme, netloc) = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def _checkin(self, key, conn, response):
+        # Only a connection whose response was entirely consumed may be
+        # reused for the next request.
+        if response.isclosed() and not response.will_close:
+            with self._lock:
+                self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+
+    def _request(self, key, path):
+        conn, reused = self._checkout(key)
+        while True:
+            try:
+                conn.request('GET', path)
+                return conn, conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                # An idle connection may have been dropped by the server,
+                # retry once on a fresh connection.
+                if not reused:
+                    raise
+                reused = False
+
+    @contextmanager
+    def open(self, url):
+        '''Open url returning the response, following redirects.'''
+        for redirect in range(self.redirects + 1):
+            parts = urlsplit(url)
+            key = (parts.scheme, parts.netloc)
+            path = urlunsplit(('', '', parts.path or '/', parts.query, ''))
+            with self._slot(key):
+                conn, response = self._request(key, path)
+                location = response.getheader('Location')
+                if response.status in (301, 302, 303, 307, 308) and location:
+                    response.read()
+                    self._checkin(key, conn, response)
+                    url = urljoin(url, location)
+                    continue
+                try:
+                    yield response
+                finally:
+                    self._checkin(key, conn, response)
+                return
+        raise http.client.HTTPException('{}: too many redirects'.format(url))
+
+    def get(self, url):
+        '''Fetch url returning (status, body).'''
+        with self.open(url) as response:
+            return response.status, response.read()
+
+    def fetch_result(self, url, members=RESULT_MEMBERS):
+        '''
+        Fetch a result.tar extracting only the requested members.  The tar
+        is streamed and the transfer abandoned as soon as all of the members
+        have been seen.
+        '''
+        result = SwiftResult(url)
+        try:
+            with self.open(url) as response:
+                result.status = response.status
+                if response.status != 200:
+                    return result
+                try:
+                    with tarfile.open(fileobj=response, mode='r|*') as tar:
+                        for info in tar:
+                            name = info.name[2:] if info.name.startswith('./') else info.name
+                            if name in members and info.isfile():
+                                result.members[name] = tar.extractfile(info).read()
+                                if len(result.members) == len(members):
+                                    break
+                        else:
+                            # Consume the trailing padding so that the
+                            # connection may be reused.
+                            response.read()
+                except tarfile.TarError as e:
+                    result.damaged = e
+        except (OSError, http.client.HTTPException) as e:
+            result.error = e
+        return result
+
+    def fetch_results(self, urls, members=RESULT_MEMBERS):
+        '''Fetch urls concurrently, yielding a SwiftResult for each in order.'''
+        return self.map(lambda url: self.fetch_result(url, members=members), urls)
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+
+# SPDX-FileCopyrightText: Canonical Ltd.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+from bisect import bisect_right
+from functools import cmp_to_key
+
+
+class VersionOrder(object):
+    '''
+    An ordinal table over version strings.
+
+    Every version seen is placed once into a sorted table using compare
+    (normally apt_pkg.version_compare), after which ordering and comparing
+    versions are simple integer operations on their ordinals.
+    '''
+
+    def __init__(self, compare, versions=()):
+        self.compare = compare
+        self._key = cmp_to_key(compare)
+        self._sorted = sorted(set(versions), key=self._key)
+        self._keys = [self._key(version) for version in self._sorted]
+        self._known = set(self._sorted)
+        self._ordinal = None
+
+    def add(self, version):
+        '''Place version into the table if it is not already present.'''
+        if version in self._known:
+            return
+        # Versions which compare equal are kept in the order they were added.
+        key = self._key(version)
+        index = bisect_right(self._keys, key)
+        self._sorted.insert(index, version)
+        self._keys.insert(index, key)
+        self._known.add(version)
+        self._ordinal = None
+
+    def _index(self):
+        # Versions which compare equal share an ordinal.
+        self._ordinal = {}
+        ordinal = -1
+        previous = None
+        for version in self._sorted:
+            if previous is None or self.compare(previous, version) != 0:
+                ordinal += 1
+            self._ordinal[version] = ordinal
+            previous = version
+
+    def ordinal(self, version):
+        '''Return the position of version within all versions seen.'''
+        self.add(version)
+        if self._ordinal is None:
+            self._index()
+        return self._ordinal[version]
+
+    def sort(self, versions):
+        '''Return versions in ascending order.'''
+        versions = list(versions)
+        self.update(versions)
+        return sorted(versions, key=self.ordinal)
+
+    def update(self, versions):
+        '''Place all of versions into the table.'''
+        for version in versions:
+            self.add(version)
+
+    def cmp(self, version_a, version_b):
+        '''
+        As compare: <0, 0, >0.  Versions already in the table are compared
+        by ordinal, any others are left to compare.
+        '''
+        if self._ordinal is None and self._sorted:
+            self._index()
+        if self._ordinal is not None and version_a in self._ordinal and version_b in self._ordinal:
+            return self._ordinal[version_a] - self._ordinal[version_b]
+        return self.compare(version_a, version_b)
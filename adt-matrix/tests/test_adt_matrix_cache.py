@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+
+# SPDX-FileCopyrightText: Canonical Ltd.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import json
+import os
+import tempfile
+import unittest
+
+from adt_matrix.cache import ResultsCache
+
+
+LEGACY = {
+    'seen': {'dkms amd64': '20240101_000000'},
+    'results': {
+        '0 linux': {'dkms': {'amd64': [True, '1.0', 'http://x/1/', '00000001']}},
+        '5.15.0-1.1 linux': {'dkms': {'amd64': [False, '1.0', 'http://x/2/', '00000002']}},
+        '5.15.0-1001.1 linux-aws': {'dkms': {'amd64': [True, '1.0', 'http://x/3/', '00000003']}},
+    },
+    'latest': {'dkms amd64': '1.0'},
+    'kernel_abi': {},
+    'first_good': {},
+    'missing': {'jammy-linux': {'dkms': {'amd64': True}}},
+}
+
+
+class TestAdtMatrixCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.legacy = os.path.join(self.dir.name, 'jammy.cache')
+        with open(self.legacy, 'w') as cfd:
+            json.dump(LEGACY, cfd)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def cache(self):
+        return ResultsCache(self.legacy + '.db', legacy=self.legacy)
+
+    def test_load_source(self):
+        cache = self.cache()
+        (state, results) = cache.load('linux')
+
+        self.assertEqual(sorted(results), ['0 linux', '5.15.0-1.1 linux'])
+        self.assertEqual(state['latest'], {'dkms amd64': '1.0'})
+        self.assertEqual(state['current'], {'jammy-linux': {'MISS': {'dkms': {'amd64': True}}}})
+
+        cache.fault(results, '5.15.0-1001.1 linux-aws')
+        cache.fault(results, '5.15.0-2.2 linux')
+        self.assertEqual(sorted(results), ['0 linux', '5.15.0-1.1 linux', '5.15.0-1001.1 linux-aws'])
+
+    def test_save_changed(self):
+        cache = self.cache()
+        (state, results) = cache.load('linux')
+        self.assertFalse(cache.save(state, results))
+
+        results['5.15.0-1.1 linux']['dkms']['arm64'] = (True, '1.0', 'http://x/4/', '00000004')
+        results['5.15.0-2.2 linux'] = {}
+        del results['0 linux']
+        state['seen']['dkms arm64'] = '20240102_000000'
+        before = cache.db.total_changes
+        self.assertTrue(cache.save(state, results))
+        # Three results, one state entry and the export flag.
+        self.assertEqual(cache.db.total_changes - before, 5)
+        cache.close()
+
+        (state, results) = self.cache().load('linux')
+        self.assertEqual(sorted(results), ['5.15.0-1.1 linux', '5.15.0-2.2 linux'])
+        self.assertEqual(results['5.15.0-1.1 linux']['dkms']['arm64'], [True, '1.0', 'http://x/4/', '00000004'])
+        self.assertIn('dkms arm64', state['seen'])
+
+    def test_legacy_export(self):
+        cache = self.cache()
+        self.assertFalse(cache.legacy_export())
+
+        (state, results) = cache.load('linux-aws')
+        results['5.15.0-1001.1 linux-aws']['dkms']['arm64'] = [True, '1.0', 'http://x/5/', '00000005']
+        cache.save(state, results)
+        self.assertTrue(cache.legacy_export())
+        cache.close()
+
+        with open(self.legacy) as cfd:
+            legacy = json.load(cfd)
+        self.assertEqual(sorted(legacy['results']), sorted(LEGACY['results']))
+        self.assertIn('arm64', legacy['results']['5.15.0-1001.1 linux-aws']['dkms'])
+        self.assertNotIn('missing', legacy)
+
+        # Our own export is not re-imported.
+        cache = self.cache()
+        self.assertFalse(cache.legacy_export())
+
+    def test_legacy_reimport(self):
+        self.cache().close()
+
+        legacy = dict(LEGACY, latest={'dkms amd64': '2.0'})
+        with open(self.legacy, 'w') as cfd:
+            json.dump(legacy, cfd)
+        os.utime(self.legacy, ns=(0, 0))
+
+        (state, results) = self.cache().load('linux')
+        self.assertEqual(state['latest'], {'dkms amd64': '2.0'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+
+# SPDX-FileCopyrightText: Canonical Ltd.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import io
+import tarfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from adt_matrix.swift import SwiftFetcher
+
+
+def make_tar(members):
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode='w') as tar:
+        for name, content in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return data.getvalue()
+
+
+class SwiftHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/complete/result.tar')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        content = self.server.content.get(self.path.split('/', 2)[1])
+        if content is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestAdtMatrixSwift(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), SwiftHandler)
+        self.server.requests = []
+        self.server.content = {
+            'complete': make_tar([
+                ('exitcode', b'0\n'),
+                ('testpkg-version', b'dkms 1.0\n'),
+                ('log.gz', b'x' * 100000),
+                ('testbed-packages', b'linux-image-5.4.0-1-generic\t5.4.0-1.1\n'),
+            ]),
+            'damaged': b'not a tar file' * 100,
+            'listing': b'jammy/amd64/d/dkms/20240101_000000@\n',
+        }
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = 'http://127.0.0.1:{}/'.format(self.server.server_address[1])
+        self.fetcher = SwiftFetcher(workers=4, per_host=2)
+
+    def tearDown(self):
+        self.fetcher.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_fetch_result(self):
+        result = self.fetcher.fetch_result(self.base + 'complete/result.tar')
+
+        self.assertEqual(result.status, 200)
+        self.assertEqual(result.member('exitcode'), b'0\n')
+        self.assertEqual(result.member('testpkg-version'), b'dkms 1.0\n')
+        self.assertIn(b'5.4.0-1.1', result.member('testbed-packages'))
+        self.assertNotIn('log.gz', result.members)
+        with self.assertRaises(KeyError):
+            result.member('summary')
+
+    def test_fetch_result_early_stop(self):
+        result = self.fetcher.fetch_result(self.base + 'complete/result.tar', members=('exitcode',))
+
+        self.assertEqual(result.members, {'exitcode': b'0\n'})
+
+    def test_fetch_result_damaged(self):
+        result = self.fetcher.fetch_result(self.base + 'damaged/result.tar')
+
+        self.assertEqual(result.status, 200)
+        with self.assertRaises(tarfile.TarError):
+            result.member('exitcode')
+
+    def test_fetch_result_missing(self):
+        result = self.fetcher.fetch_result(self.base + 'missing/result.tar')
+
+        self.assertEqual(result.status, 404)
+
+    def test_redirect(self):
+        result = self.fetcher.fetch_result(self.base + 'redirect')
+
+        self.assertEqual(result.member('exitcode'), b'0\n')
+        self.assertEqual(self.server.requests, ['/redirect', '/complete/result.tar'])
+
+    def test_get(self):
+        self.assertEqual(self.fetcher.get(self.base + 'listing'), (200, self.server.content['listing']))
+
+    def test_fetch_results_ordered(self):
+        urls = [self.base + which + '/result.tar' for which in ('complete', 'missing', 'complete', 'damaged') * 4]
+
+        results = list(self.fetcher.fetch_results(urls))
+
+        self.assertEqual([result.url for result in results], urls)
+        self.assertEqual([result.status for result in results], [200, 404, 200, 200] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
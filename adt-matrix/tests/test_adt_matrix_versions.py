@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+# SPDX-FileCopyrightText: Canonical Ltd.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import unittest
+
+from adt_matrix.versions import VersionOrder
+
+
+def numeric_compare(version_a, version_b):
+    # Compare dotted numeric versions ignoring leading zeros, so that
+    # distinct strings may compare equal.
+    key_a = [int(bit) for bit in version_a.split('.')]
+    key_b = [int(bit) for bit in version_b.split('.')]
+    return (key_a > key_b) - (key_a < key_b)
+
+
+class CountingCompare(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, version_a, version_b):
+        self.calls += 1
+        return numeric_compare(version_a, version_b)
+
+
+class TestAdtMatrixVersions(unittest.TestCase):
+    def test_sort(self):
+        order = VersionOrder(numeric_compare)
+
+        self.assertEqual(order.sort(['1.10', '1.2', '1.9', '0.1']), ['0.1', '1.2', '1.9', '1.10'])
+        self.assertEqual(order.sort(['2.0', '1.10', '1.3']), ['1.3', '1.10', '2.0'])
+
+    def test_cmp(self):
+        order = VersionOrder(numeric_compare, ['1.2', '1.10'])
+
+        self.assertLess(order.cmp('1.2', '1.10'), 0)
+        self.assertGreater(order.cmp('1.10', '1.2'), 0)
+        self.assertEqual(order.cmp('1.2', '1.2'), 0)
+        # Versions outside the table fall back to compare.
+        self.assertLess(order.cmp('1.2', '3.0'), 0)
+        self.assertEqual(order.ordinal('1.10'), 1)
+
+    def test_equal_versions(self):
+        order = VersionOrder(numeric_compare)
+
+        self.assertEqual(order.sort(['1.02', '1.1', '1.2']), ['1.1', '1.02', '1.2'])
+        self.assertEqual(order.cmp('1.2', '1.02'), 0)
+        self.assertEqual(order.ordinal('1.2'), order.ordinal('1.02'))
+
+    def test_placed_once(self):
+        compare = CountingCompare()
+        order = VersionOrder(compare)
+
+        versions = ['1.{}'.format(minor) for minor in range(100)]
+        order.sort(versions)
+        calls = compare.calls
+        self.assertEqual(order.sort(reversed(versions)), versions)
+        for version in versions:
+            order.cmp(version, '1.50')
+        self.assertEqual(compare.calls, calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -102,14 +102,13 @@ def find_tag_matching(target_tag, tags):
     best_match = None
     target_tag = UbuntuTag(target_tag)
 
-    for tag in tags:
-        this_tag = UbuntuTag(tag)
+    for this_tag in UbuntuTag.parse_many(tags):
         # Protect against unfiltered tag lists
         if not target_tag.can_compare(this_tag):
             continue
         abi = int(this_tag.abi)
         if abi == target_tag.abi:
-            if best_match is None or this_tag > best_match:
+            if best_match is None or this_tag.sort_key > best_match.sort_key:
                 best_match = this_tag
                 result = best_match.raw_tag
 
@@ -1,6 +1,7 @@
 import contextlib
 import os
 import sys
+from itertools import islice
 
 sys.path.append(os.path.realpath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "libs")))
 
@@ -143,7 +144,8 @@ class HandleCore:
     def identify_directory(self, directory):
         try:
             with change_directory(directory):
-                changelog = Debian.changelog()
+                # Only the first two entries are needed (see below).
+                changelog = list(islice(Debian.changelog_iter(), 2))
         except (DebianError, GitError) as e:
             raise HandleError("{}: bad directory handle -- {}".format(directory, e))
 
@@ -307,7 +309,8 @@ class Handle:
         cycle_name = None
         try:
             with change_directory(directory):
-                changelog = Debian.changelog()
+                # Only the first two entries are needed (see below).
+                changelog = list(islice(Debian.changelog_iter(), 2))
             base = HandleHelper.main_directory(directory)
             with change_directory(base):
                 debian_env = Debian.debian_env() or "debian"
@@ -379,14 +382,9 @@ class Handle:
                 )
             )
 
-        for source_entry in series.sources:
-            for package_entry in source_entry.packages:
-                if package_entry.name == package_name:
-                    source = source_entry
-                    package = package_entry
-                    break
-            if package:
-                break
+        package = series.lookup_package(package_name)
+        if package is not None:
+            source = package.source
 
         if package is None:
             raise HandleError(
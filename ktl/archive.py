@@ -3,9 +3,11 @@
 
 # from ktl.kernel               import *
 from launchpadlib.launchpad import Launchpad
-from urllib.request import urlopen
+from lazr.restfulclient.errors import NotFound
+from datetime import datetime, timedelta, timezone
 import json
 import re
+import sqlite3
 from os import path, mkdir
 from ktl.kernel_series import KernelSeries
 from os.path import exists, getmtime
@@ -76,6 +78,133 @@ class ArchiveError(Exception):
         self.msg = error
 
 
+# ArchiveSnapshot
+#
+class ArchiveSnapshot:
+    """
+    An indexed local snapshot of the source publications of an archive.
+
+    Each publication is held as the representation Launchpad returned for
+    it in the publication collection, keyed by its self_link and indexed
+    by (series, package).
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+        self.db = sqlite3.connect(filename, timeout=60, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS publications (
+                self_link       TEXT PRIMARY KEY,
+                series          TEXT,
+                package         TEXT,
+                version         TEXT,
+                pocket          TEXT,
+                status          TEXT,
+                date_created    TEXT,
+                data            TEXT NOT NULL
+            )"""
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS publications_package ON publications (series, package)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS publications_name ON publications (package)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM publications").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+    def meta(self, name, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def set_meta(self, name, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def age(self):
+        """Return the number of seconds since the last refresh, or None."""
+        refreshed = self.meta("refreshed")
+        if refreshed is None:
+            return None
+        return time() - refreshed
+
+    def clear(self):
+        self.db.execute("DELETE FROM publications")
+
+    @staticmethod
+    def series(representation):
+        return representation["display_name"].split()[-1]
+
+    def store(self, representations):
+        self.db.executemany(
+            "INSERT OR REPLACE INTO publications "
+            "(self_link, series, package, version, pocket, status, date_created, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    representation["self_link"],
+                    self.series(representation),
+                    representation["source_package_name"],
+                    representation["source_package_version"],
+                    representation["pocket"],
+                    representation["status"],
+                    representation["date_created"],
+                    json.dumps(representation, separators=(",", ":")),
+                )
+                for representation in representations
+            ),
+        )
+
+    def remove(self, self_link):
+        self.db.execute("DELETE FROM publications WHERE self_link = ?", (self_link,))
+
+    def publications(self, series=None, package=None, status=None):
+        """
+        Return the representations of the matching publications in the order
+        they were first recorded.
+        """
+        where = []
+        args = []
+        for column, value in (("series", series), ("package", package), ("status", status)):
+            if value is not None:
+                where.append(column + " = ?")
+                args.append(value)
+        query = "SELECT data FROM publications"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY rowid"
+        return [json.loads(row[0]) for row in self.db.execute(query, args)]
+
+    def unsuperseded(self, newer=()):
+        """
+        Return the self_links of the live publications which have a newer
+        publication of the same package in the same series and pocket, these
+        are about to change status.  Publications in newer, not yet stored,
+        are considered along with those recorded.
+        """
+        latest = {}
+        for series, package, pocket, date_created in self.db.execute(
+            "SELECT series, package, pocket, MAX(date_created) FROM publications GROUP BY series, package, pocket"
+        ):
+            latest[(series, package, pocket)] = date_created
+        for representation in newer:
+            key = (self.series(representation), representation["source_package_name"], representation["pocket"])
+            if key not in latest or representation["date_created"] > latest[key]:
+                latest[key] = representation["date_created"]
+
+        return [
+            self_link
+            for self_link, series, package, pocket, date_created in self.db.execute(
+                """SELECT self_link, series, package, pocket, date_created FROM publications
+                    WHERE status IN ('Pending', 'Published') ORDER BY rowid"""
+            )
+            if date_created < latest[(series, package, pocket)]
+        ]
+
+
 # Kernel
 #
 class Archive:
@@ -84,16 +213,26 @@ class Archive:
     # for Launchpad API
     lp_cachedir = path.join(path.expanduser("~"), ".cache", "ktl.archive.lp")
 
-    # For the ckt-ppa.json and distro-archive.json files. By having them in a central
+    # For the ckt-ppa and distro-archive snapshots. By having them in a central
     # location, all apps wherever they are run can take advantage of them.
     #
     archive_cachedir = path.join(path.expanduser("~"), ".cache", "ktl.archive")
     if not path.exists(archive_cachedir):
         mkdir(archive_cachedir)
 
-    # How often should we fetch files? (seconds)
+    # How often should we refresh the snapshots? (seconds)
     archive_cache_lifetime = 900  # 15 minutes
 
+    # How often should we rebuild the snapshots from scratch? (seconds)  This
+    # catches publications deleted outright, which an incremental refresh
+    # cannot see.
+    archive_rebuild_lifetime = 86400  # 1 day
+
+    # How far before the previous refresh an incremental refresh looks for
+    # new publications, allowing for those which only become visible some
+    # time after they were created.
+    archive_refresh_overlap = 3600  # 1 hour
+
     statuses = ["Published"]
 
     # related to the kernel ppa
@@ -104,7 +243,7 @@ class Archive:
     allppainfo = False
     teamname = "canonical-kernel-team"
     ppaname = "ppa"
-    ppafilename = path.join(archive_cachedir, "ckt-ppa.json")
+    ppafilename = path.join(archive_cachedir, "ckt-ppa.sqlite3")
 
     # related to the kernel distro archive
     __distro_get_deleted = False
@@ -112,7 +251,7 @@ class Archive:
     __distro_get_superseded = False
     distro = None
     alldistroinfo = False
-    distrofilename = path.join(archive_cachedir, "distro-archive.json")
+    distrofilename = path.join(archive_cachedir, "distro-archive.sqlite3")
 
     # version
     #
@@ -126,22 +265,183 @@ class Archive:
         self.__fetch_distro_if_needed(force)
         return self.distro
 
-    # __fetch_ppa_if_needed
+    # ppa_publications
     #
-    def __fetch_ppa_if_needed(self, force):
-        # see if there is a local json file that is recent
-        # if there is, return the data
-        age = fileage(self.ppafilename)
-
-        if (not force) and age and (age < self.archive_cache_lifetime):
-            # Try to fetch from the local file
-            f = open(self.ppafilename, "r")
-            self.ppa = json.load(f)
-            f.close()
+    def ppa_publications(self, series=None, package=None, force=False):
+        """
+        Return the kernel PPA publications for series and/or package.
+        """
+        snapshot = self.__ppa_snapshot(force)
+        try:
+            return [
+                sourceinfo
+                for sourceinfo in (self.__sourceinfo(pub) for pub in snapshot.publications(series, package))
+                if sourceinfo is not None
+            ]
+        finally:
+            snapshot.close()
+
+    # distro_publications
+    #
+    def distro_publications(self, series=None, package=None, force=False):
+        """
+        Return the primary archive publications of the supported kernel
+        packages for series and/or package.
+        """
+        snapshot = self.__distro_snapshot(force)
+        try:
+            unsupported = snapshot.meta("unsupported", [])
+            return [
+                self.__sourceinfo(pub, strict=True)
+                for pub in snapshot.publications(series, package)
+                if pub["display_name"].split()[-1] not in unsupported
+            ]
+        finally:
+            snapshot.close()
+
+    # __statuses
+    #
+    def __statuses(self, deleted, obsolete, superseded):
+        statuses = list(self.statuses)
+        if deleted:
+            statuses.append("Deleted")
+        if obsolete:
+            statuses.append("Obsolete")
+        if superseded:
+            statuses.append("Superseded")
+        return statuses
+
+    # __sourceinfo
+    #
+    def __sourceinfo(self, representation, strict=False):
+        """
+        Convert a publication representation into our summary form, None
+        if we are not interested in it.
+        """
+        sourceinfo = dict(representation)
+
+        # Add some plain text fields for some info
+        field = sourceinfo["package_creator_link"]
+        if field:
+            sourceinfo["creator"] = field.split("/")[-1].strip("~")
+        else:
+            sourceinfo["creator"] = "Unknown"
+        field = sourceinfo["package_signer_link"]
+        if field:
+            sourceinfo["signer"] = field.split("/")[-1].strip("~")
+        else:
+            sourceinfo["signer"] = "Unknown"
+        rm = re.match(r"[0-9]\.[0-9](\.[0-9][0-9])*", sourceinfo["source_package_version"])
+        if rm is None:
+            if strict:
+                raise ArchiveError(
+                    "The source package version failed to match the regular expression: {} {}".format(
+                        sourceinfo["source_package_name"], sourceinfo["source_package_version"]
+                    )
+                )
+            return None  # skip this one
+        sourceinfo["series"] = sourceinfo["display_name"].split()[-1]
+        # And strip some things we don't care about
+        if not self.allppainfo:
+            for delkey in [
+                "archive_link",
+                "distro_series_link",
+                "http_etag",
+                "package_maintainer_link",
+                "resource_type_link",
+                "package_creator_link",
+                "package_signer_link",
+                "section_name",
+                "scheduled_deletion_date",
+                "removal_comment",
+                "removed_by_link",
+            ]:
+                sourceinfo.pop(delkey, None)
+        return sourceinfo
+
+    # __refresh
+    #
+    def __refresh(self, snapshot, lp, archive, statuses, queries, wanted, force):
+        """
+        Bring snapshot up to date with archive.
+
+        The snapshot is built from the publication collections themselves,
+        one query per entry in queries for each of statuses.  Once built it
+        is refreshed incrementally: only the publications created since the
+        previous refresh are listed, and only those recorded publications
+        which a newer one is about to supersede are reloaded.
+        """
+        started = datetime.now(timezone.utc)
+        since = snapshot.meta("since")
+        rebuilt = snapshot.meta("rebuilt")
+        rebuild = (
+            force
+            or since is None
+            or rebuilt is None
+            or time() - rebuilt > self.archive_rebuild_lifetime
+            or snapshot.meta("statuses") != statuses
+            or len(snapshot) == 0
+        )
+
+        # Gather everything from Launchpad first, which may take minutes,
+        # and only then lock the snapshot briefly to record it.  Other
+        # processes can continue to read the existing snapshot meanwhile.
+        stored = []
+        removed = []
+        if rebuild:
+            if self.debug:
+                print("Rebuilding", snapshot.filename)
+            for astatus in statuses:
+                for query in queries:
+                    psrc = archive.getPublishedSources(status=astatus, **query)
+                    stored.extend(pub for pub in (p._wadl_resource.representation for p in psrc) if wanted(pub))
+
+        else:
+            created_since = datetime.fromisoformat(since) - timedelta(seconds=self.archive_refresh_overlap)
+            if self.debug:
+                print("Refreshing", snapshot.filename, "since", created_since)
+            for astatus in statuses:
+                psrc = archive.getPublishedSources(status=astatus, created_since_date=created_since)
+                stored.extend(pub for pub in (p._wadl_resource.representation for p in psrc) if wanted(pub))
+
+            # Anything about to be superseded needs its status updating.
+            for self_link in snapshot.unsuperseded(stored):
+                try:
+                    pub = lp.load(self_link)._wadl_resource.representation
+                except NotFound:
+                    pub = None
+                if pub is None or pub["status"] not in statuses or not wanted(pub):
+                    removed.append(self_link)
+                else:
+                    stored.append(pub)
+
+        snapshot.db.execute("BEGIN IMMEDIATE")
+        try:
+            if rebuild:
+                snapshot.clear()
+                snapshot.set_meta("rebuilt", time())
+            snapshot.store(stored)
+            for self_link in removed:
+                snapshot.remove(self_link)
+
+            snapshot.set_meta("statuses", statuses)
+            snapshot.set_meta("since", started.isoformat())
+            snapshot.set_meta("refreshed", time())
+            snapshot.db.execute("COMMIT")
+        except BaseException:
+            snapshot.db.execute("ROLLBACK")
+            raise
+
+    # __ppa_snapshot
+    #
+    def __ppa_snapshot(self, force):
+        snapshot = ArchiveSnapshot(self.ppafilename)
+        age = snapshot.age()
+        if (not force) and age is not None and (age < self.archive_cache_lifetime):
             if self.debug:
-                print("Read cached PPA data, records:", len(self.ppa))
-            if len(self.ppa) != 0:
-                return
+                print("Read cached PPA data, records:", len(snapshot))
+            if len(snapshot) != 0:
+                return snapshot
             else:
                 print("Got nothing for PPA from cached results, fetching from Launchpad")
 
@@ -149,75 +449,44 @@ class Archive:
         if self.debug:
             print("Fetching from Launchpad")
 
-        statuses = list(self.statuses)
-        if self.__ppa_get_deleted:
-            statuses.append("Deleted")
-        if self.__ppa_get_obsolete:
-            statuses.append("Obsolete")
-        if self.__ppa_get_superseded:
-            statuses.append("Superseded")
+        statuses = self.__statuses(self.__ppa_get_deleted, self.__ppa_get_obsolete, self.__ppa_get_superseded)
 
-        outdict = {}
         lp = Launchpad.login_anonymously("kernel team tools", "production", self.lp_cachedir)
         person = lp.people[self.teamname]
         ppa = person.getPPAByName(name=self.ppaname)
 
-        for astatus in statuses:
-            psrc = ppa.getPublishedSources(status=astatus)
-            for p in psrc:
-                fd = urlopen(p.self_link)
-                sourceinfo = json.loads(fd.read().decode("utf-8"))
-
-                # Add some plain text fields for some info
-                sourceinfo["creator"] = sourceinfo["package_creator_link"].split("/")[-1].strip("~")
-                sourceinfo["signer"] = sourceinfo["package_signer_link"].split("/")[-1].strip("~")
-                rm = re.match(r"[0-9]\.[0-9](\.[0-9][0-9])*", sourceinfo["source_package_version"])
-                if rm is None:
-                    continue  # skip this one
-                sourceinfo["series"] = sourceinfo["display_name"].split()[-1]
-                # And strip some things we don't care about
-                if not self.allppainfo:
-                    for delkey in [
-                        "archive_link",
-                        "distro_series_link",
-                        "http_etag",
-                        "package_maintainer_link",
-                        "resource_type_link",
-                        "package_creator_link",
-                        "package_signer_link",
-                        "section_name",
-                        "scheduled_deletion_date",
-                        "removal_comment",
-                        "removed_by_link",
-                    ]:
-                        del sourceinfo[delkey]
-
-                key = p.source_package_name + "-" + p.source_package_version
-                outdict[key] = sourceinfo
-
-        jf = open(self.ppafilename, "w+")
-        jf.write(json.dumps(outdict, sort_keys=True, indent=4))
-        jf.close()
+        self.__refresh(snapshot, lp, ppa, statuses, [{}], lambda pub: True, force)
+        return snapshot
+
+    # __fetch_ppa_if_needed
+    #
+    def __fetch_ppa_if_needed(self, force):
+        snapshot = self.__ppa_snapshot(force)
+        try:
+            outdict = {}
+            for astatus in self.__statuses(self.__ppa_get_deleted, self.__ppa_get_obsolete, self.__ppa_get_superseded):
+                for pub in snapshot.publications(status=astatus):
+                    sourceinfo = self.__sourceinfo(pub)
+                    if sourceinfo is None:
+                        continue
+                    key = pub["source_package_name"] + "-" + pub["source_package_version"]
+                    outdict[key] = sourceinfo
+        finally:
+            snapshot.close()
 
         self.ppa = outdict
         return
 
-    # __fetch_distro_if_needed
+    # __distro_snapshot
     #
-    def __fetch_distro_if_needed(self, force):
-        # see if there is a local json file that is recent
-        # if there is, return the data
-        age = fileage(self.distrofilename)
-
-        if (not force) and age and (age < self.archive_cache_lifetime):
-            # read from the local file
-            f = open(self.distrofilename, "r")
-            self.distro = json.load(f)
-            f.close()
+    def __distro_snapshot(self, force):
+        snapshot = ArchiveSnapshot(self.distrofilename)
+        age = snapshot.age()
+        if (not force) and age is not None and (age < self.archive_cache_lifetime):
             if self.debug:
-                print("Read cached Distro data, records:", len(self.distro))
-            if len(self.distro) != 0:
-                return
+                print("Read cached Distro data, records:", len(snapshot))
+            if len(snapshot) != 0:
+                return snapshot
             else:
                 print("Got nothing for distro from cached results, fetching from Launchpad")
 
@@ -225,16 +494,9 @@ class Archive:
         if self.debug:
             print("Fetching from Distro archives")
 
-        statuses = list(self.statuses)
-        if self.__distro_get_deleted:
-            statuses.append("Deleted")
-        if self.__distro_get_obsolete:
-            statuses.append("Obsolete")
-        if self.__distro_get_superseded:
-            statuses.append("Superseded")
+        statuses = self.__statuses(self.__distro_get_deleted, self.__distro_get_obsolete, self.__distro_get_superseded)
 
         lp = Launchpad.login_anonymously("kernel team tools", "production", self.lp_cachedir)
-        masteroutdict = {}
 
         # archive = lp.distributions['ubuntu'].getSeries(name_or_version=info['name']).main_archive
         archive = lp.distributions["ubuntu"].getArchive(name="primary")
@@ -252,117 +514,111 @@ class Archive:
                     if package.name not in kernel_source_packages:
                         kernel_source_packages.append(package.name)
 
-        for astatus in statuses:
-            for pname in kernel_source_packages:
+        unsupported = []
+        serieslist = []
+        for series in kernel_series.series:
+            if not series.supported:
                 if self.debug:
-                    print("fetching for package", pname, "status", astatus)
-                outdict = {}
-                psrc = archive.getPublishedSources(status=astatus, exact_match=True, source_name=pname)
-                for p in psrc:
-                    fd = urlopen(p.self_link)
-                    sourceinfo = json.loads(fd.read().decode("utf-8"))
-                    if self.debug:
-                        print("fetched", sourceinfo["source_package_name"], sourceinfo["source_package_version"])
-
-                    # Add some plain text fields for some info
-                    field = sourceinfo["package_creator_link"]
-                    if field:
-                        sourceinfo["creator"] = field.split("/")[-1].strip("~")
-                    else:
-                        sourceinfo["creator"] = "Unknown"
-                    field = sourceinfo["package_signer_link"]
-                    if field:
-                        sourceinfo["signer"] = field.split("/")[-1].strip("~")
-                    else:
-                        sourceinfo["signer"] = "Unknown"
-                    rm = re.match(r"[0-9]\.[0-9](\.[0-9][0-9])*", sourceinfo["source_package_version"])
-                    if rm is None:
-                        print("  ** Error: The source package version failed to match the regular expression.")
-                        raise
-                    version = rm.group(0)
-                    sourceinfo["series"] = sourceinfo["display_name"].split()[-1]
-                    # And strip some things we don't care about
-                    if not self.allppainfo:
-                        for delkey in [
-                            "archive_link",
-                            "distro_series_link",
-                            "http_etag",
-                            "package_maintainer_link",
-                            "resource_type_link",
-                            "package_creator_link",
-                            "package_signer_link",
-                            "section_name",
-                            "scheduled_deletion_date",
-                            "removal_comment",
-                            "removed_by_link",
-                        ]:
-                            del sourceinfo[delkey]
-
-                    key = p.source_package_name + "-" + p.source_package_version + "-" + p.pocket
-                    if self.debug:
-                        print("    found: ", key)
-                    outdict[key] = sourceinfo
-
-                if len(outdict) == 0:
-                    if self.debug:
-                        print("Nothing from ", astatus, pname)
-                    continue
+                    print("DEBUG: Fetching from archive, will skip release ", series.codename)
+                unsupported.append(series.codename)
+            else:
+                serieslist.append(series.codename)
+
+        # The primary archive is huge, when building we ask for each of our
+        # packages by name; when refreshing, for the whole archive and keep
+        # only our packages.
+        wanted_packages = set(kernel_source_packages)
+        queries = [dict(exact_match=True, source_name=pname) for pname in kernel_source_packages]
+        if snapshot.meta("packages") != kernel_source_packages:
+            force = True
+        self.__refresh(
+            snapshot, lp, archive, statuses, queries, lambda pub: pub["source_package_name"] in wanted_packages, force
+        )
+
+        snapshot.db.execute("BEGIN IMMEDIATE")
+        snapshot.set_meta("packages", kernel_source_packages)
+        snapshot.set_meta("unsupported", unsupported)
+        snapshot.set_meta("serieslist", serieslist)
+        snapshot.db.execute("COMMIT")
+        return snapshot
 
-                #
-                # Now we have all the data for this package name and status
-                # Remove all the unsupported ones
-                if self.debug:
-                    print("records in outdict after fetch", len(outdict))
-                unsupported = []
-                serieslist = []
-                for series in kernel_series.series:
-                    if not series.supported:
+    # __fetch_distro_if_needed
+    #
+    def __fetch_distro_if_needed(self, force):
+        snapshot = self.__distro_snapshot(force)
+        try:
+            kernel_source_packages = snapshot.meta("packages", [])
+            unsupported = snapshot.meta("unsupported", [])
+            serieslist = snapshot.meta("serieslist", [])
+            statuses = snapshot.meta("statuses", [])
+
+            pubs = {}
+            for pname in kernel_source_packages:
+                pubs[pname] = snapshot.publications(package=pname)
+
+            masteroutdict = {}
+            for astatus in statuses:
+                for pname in kernel_source_packages:
+                    outdict = {}
+                    for pub in pubs[pname]:
+                        if pub["status"] != astatus:
+                            continue
+                        sourceinfo = self.__sourceinfo(pub, strict=True)
                         if self.debug:
-                            print("DEBUG: Fetching from archive, will skip release ", series.codename)
-                        unsupported.append(series.codename)
-                    else:
-                        serieslist.append(series.codename)
-                # remove unwanted ones
-                purge = []
-                for name, sourceinfo in outdict.items():
-                    if sourceinfo["series"] in unsupported:
+                            print("fetched", sourceinfo["source_package_name"], sourceinfo["source_package_version"])
+                        key = pub["source_package_name"] + "-" + pub["source_package_version"] + "-" + pub["pocket"]
                         if self.debug:
-                            print("DEBUG: Fetching from archive, skipping ", name)
-                        purge.append(name)
-                for k in purge:
-                    del outdict[k]
-
-                #
-                # We now have a collection of all supported packages for a given
-                # package name and status. Within each permutation of series and
-                # pocket, keep only the highest version
-                for series in serieslist:
-                    for pocket in pocket_list:
-                        templist = {}
-                        for name, sourceinfo in outdict.items():
-                            if sourceinfo["pocket"] == pocket and sourceinfo["series"] == series:
-                                if self.debug:
-                                    print("found matching", json.dumps(sourceinfo, sort_keys=True, indent=4))
-                                templist[sourceinfo["source_package_version"]] = name
-                        # Now sort the templist
-                        slist = sorted(templist, key=cmp_to_key(compare_versions), reverse=True)
-                        # and delete all but the highest version from the main list
-                        for k in range(1, len(slist)):
+                            print("    found: ", key)
+                        outdict[key] = sourceinfo
+
+                    if len(outdict) == 0:
+                        if self.debug:
+                            print("Nothing from ", astatus, pname)
+                        continue
+
+                    #
+                    # Now we have all the data for this package name and status
+                    # Remove all the unsupported ones
+                    if self.debug:
+                        print("records in outdict after fetch", len(outdict))
+                    purge = []
+                    for name, sourceinfo in outdict.items():
+                        if sourceinfo["series"] in unsupported:
                             if self.debug:
-                                print("deleting", templist[slist[k]])
-                            # If the same version was in Security and Updates . . .
-                            del outdict[templist[slist[k]]]
+                                print("DEBUG: Fetching from archive, skipping ", name)
+                            purge.append(name)
+                    for k in purge:
+                        del outdict[k]
+
+                    #
+                    # We now have a collection of all supported packages for a given
+                    # package name and status. Within each permutation of series and
+                    # pocket, keep only the highest version
+                    for series in serieslist:
+                        for pocket in pocket_list:
+                            templist = {}
+                            for name, sourceinfo in outdict.items():
+                                if sourceinfo["pocket"] == pocket and sourceinfo["series"] == series:
+                                    if self.debug:
+                                        print("found matching", json.dumps(sourceinfo, sort_keys=True, indent=4))
+                                    templist[sourceinfo["source_package_version"]] = name
+                            # Now sort the templist
+                            slist = sorted(templist, key=cmp_to_key(compare_versions), reverse=True)
+                            # and delete all but the highest version from the main list
+                            for k in range(1, len(slist)):
+                                if self.debug:
+                                    print("deleting", templist[slist[k]])
+                                # If the same version was in Security and Updates . . .
+                                del outdict[templist[slist[k]]]
+
+                    if self.debug:
+                        print("Updating Master")
+                        print("records in outdict", len(outdict))
+                        print("records in masteroutdict", len(masteroutdict))
+                    masteroutdict.update(outdict)
+        finally:
+            snapshot.close()
 
-                if self.debug:
-                    print("Updating Master")
-                    print("records in outdict", len(outdict))
-                    print("records in masteroutdict", len(masteroutdict))
-                    # print json.dumps(outdict, sort_keys=True, indent=4)
-                masteroutdict.update(outdict)
-
-        jf = open(self.distrofilename, "w+")
-        jf.write(json.dumps(masteroutdict, sort_keys=True, indent=4))
-        jf.close()
         self.distro = masteroutdict
         return
 
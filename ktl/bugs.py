@@ -1,4 +1,4 @@
-from ktl.utils import date_to_string
+from ktl.utils import date_to_string, string_to_date
 
 
 # DeltaTime
@@ -52,6 +52,50 @@ class Bugs:
     work on Launchpad bugs.
     """
 
+    # kernel_gravity
+    #
+    @classmethod
+    def kernel_gravity(cls, date_created, date_last_message, now):
+        """
+        Try to come up with an integer value that represents the need of a
+        bug to be addressed. The higher the number, the more attention it deserves.
+
+        This depends only on how long ago the bug was created and last commented
+        on, so it may be recalculated from a stored bug_info record as the bug ages.
+        """
+        gravity = 0
+
+        # Calculate a value based on how long before now the bug was created, and
+        # last had a message. The longer ago, the lower the value.
+        #
+        for date in (date_created, date_last_message):
+            if date is None:
+                continue
+            ago = DeltaTime(date, now)
+            if ago.days < 7:
+                gravity += 1000
+            elif ago.days < 14:
+                gravity += 500
+            elif ago.days < 21:
+                gravity += 250
+            elif ago.days < 30:
+                gravity += 100
+
+        return gravity
+
+    # bug_info_gravity
+    #
+    @classmethod
+    def bug_info_gravity(cls, bug_item, now):
+        """
+        Recalculate the kernel_gravity of a bug from its bug_info record.
+        """
+        dates = []
+        for key in ("date created", "date last message"):
+            date = bug_item.get(key)
+            dates.append(None if date in (None, "None") else string_to_date(date))
+        return cls.kernel_gravity(dates[0], dates[1], now)
+
     # bug_info
     #
     @classmethod
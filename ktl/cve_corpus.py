@@ -0,0 +1,223 @@
+import hashlib
+import os
+import pickle
+import re
+import subprocess
+import sys
+import tempfile
+
+
+class CveFile:
+    """
+    The parsed form of a single ubuntu-cve-tracker CVE file.
+
+    name (str): the CVE file name, for example CVE-2024-1234.
+    priority (str): the last Priority: recorded, or None.
+    entries (list): the package status lines in file order as tuples of
+        (release, package, state, annotation), annotation is None where
+        the status carries none.
+    """
+
+    prio_re = re.compile(r"^Priority:\s*([^\s]+)")
+    entry_re = re.compile(r"^([a-z][^_\s]*)_([^:\s]+):\s+([^\s]+)(\s+\((.*)\))?")
+
+    def __init__(self, name, priority=None, fields=()):
+        self.name = name
+        self.priority = priority
+        # The entries flattened into a single tuple; there are millions of
+        # these across the tracker and this keeps the snapshot quick to load.
+        self.fields = fields
+
+    @property
+    def entries(self):
+        fields = iter(self.fields)
+        return list(zip(fields, fields, fields, fields))
+
+    @classmethod
+    def parse(cls, name, lines):
+        priority = None
+        fields = []
+        for line in lines:
+            match = cls.prio_re.match(line)
+            if match:
+                priority = match.group(1)
+                continue
+            match = cls.entry_re.match(line)
+            if match:
+                # The same few release, package and state names recur
+                # throughout, share them.
+                annotation = match.group(5)
+                fields += (
+                    sys.intern(match.group(1)),
+                    sys.intern(match.group(2)),
+                    sys.intern(match.group(3)),
+                    sys.intern(annotation) if annotation is not None else None,
+                )
+        return cls(name, priority, tuple(fields))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as cfd:
+            return cls.parse(os.path.basename(path), cfd)
+
+
+class CveCorpus:
+    """
+    The parsed CVE files in a single ubuntu-cve-tracker directory (active,
+    retired etc).
+
+    The parse is kept as a pickled snapshot shared by all tools, keyed by
+    the directory path.  Each file is recorded against its mtime and size
+    and is only reparsed when these change.  Where the directory is within
+    a git repository only the files git reports as changed since the
+    snapshot, or as locally modified, are checked; otherwise every file is
+    checked.
+    """
+
+    snapshot = True
+    snapshot_dir = os.path.join(os.path.expanduser("~"), ".cache", "ktl.cve_corpus")
+    snapshot_format = 1
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.stats = {"parsed": 0, "cached": 0, "removed": 0}
+
+        # name -> (mtime_ns, size, priority, fields)
+        self._files = {}
+        self._cves = {}
+        self._head = None
+        self._dirty = set()
+
+        self.refresh()
+
+    def __len__(self):
+        return len(self._files)
+
+    def __contains__(self, name):
+        return name in self._files
+
+    def get(self, name, default=None):
+        """Return the CveFile for name, or default if there is none."""
+        cve = self._cves.get(name)
+        if cve is None:
+            entry = self._files.get(name)
+            if entry is None:
+                return default
+            cve = self._cves[name] = CveFile(name, entry[2], entry[3])
+        return cve
+
+    def files(self):
+        """Return all of the CveFiles in name order."""
+        return [self.get(name) for name in sorted(self._files)]
+
+    def _git(self, *args):
+        try:
+            return subprocess.run(
+                ["git", "-C", self.directory] + list(args),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                check=True,
+                universal_newlines=True,
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _git_names(self, *args):
+        names = self._git(*args)
+        if names is None:
+            return None
+        # Only direct children of the directory are of interest.
+        return set(name for name in names.split("\0") if name and "/" not in name)
+
+    def _git_head(self):
+        head = self._git("rev-parse", "--verify", "-q", "HEAD")
+        return head.strip() if head else None
+
+    def _git_dirty(self):
+        modified = self._git_names("diff", "--name-only", "--relative", "-z", "HEAD")
+        untracked = self._git_names("ls-files", "-z", "--others", "--exclude-standard")
+        if modified is None or untracked is None:
+            return None
+        return modified | untracked
+
+    def _update(self, name):
+        """Bring name up to date returning True if it changed."""
+        if name.startswith("."):
+            return False
+        path = os.path.join(self.directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is None or not os.path.isfile(path):
+            self._cves.pop(name, None)
+            if self._files.pop(name, None) is None:
+                return False
+            self.stats["removed"] += 1
+            return True
+
+        entry = self._files.get(name)
+        if entry is not None and entry[0:2] == (st.st_mtime_ns, st.st_size):
+            self.stats["cached"] += 1
+            return False
+        cve = self._cves[name] = CveFile.load(path)
+        self._files[name] = (st.st_mtime_ns, st.st_size, cve.priority, cve.fields)
+        self.stats["parsed"] += 1
+        return True
+
+    def refresh(self):
+        """Bring the corpus up to date with the directory."""
+        snapshot = self.snapshot_load()
+        head = self._git_head()
+        dirty = self._git_dirty() if head else None
+
+        changed = None
+        modified = True
+        if snapshot is not None:
+            (old_head, old_dirty, self._files) = snapshot
+            if head and old_head and dirty is not None:
+                changed = self._git_names("diff", "--name-only", "--relative", "-z", old_head, head)
+                if changed is not None:
+                    changed |= dirty | old_dirty
+            modified = head != old_head or (dirty or set()) != old_dirty
+
+        if changed is None:
+            names = set(self._files)
+            with os.scandir(self.directory) as entries:
+                names.update(entry.name for entry in entries)
+            changed = names
+        for name in sorted(changed):
+            if self._update(name):
+                modified = True
+
+        self._head = head
+        self._dirty = dirty or set()
+        if modified:
+            self.snapshot_save((self._head, self._dirty, self._files))
+
+    def _snapshot_path(self):
+        key = hashlib.sha256(self.directory.encode("utf-8")).hexdigest()
+        return os.path.join(self.snapshot_dir, key + ".pickle")
+
+    def snapshot_load(self):
+        if not self.snapshot:
+            return None
+        try:
+            with open(self._snapshot_path(), "rb") as rfd:
+                (snapshot_format, directory, snapshot) = pickle.load(rfd)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+            return None
+        if snapshot_format != self.snapshot_format or directory != self.directory:
+            return None
+        return snapshot
+
+    def snapshot_save(self, snapshot):
+        if not self.snapshot:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.snapshot_dir, suffix=".new", delete=False) as wfd:
+                pickle.dump((self.snapshot_format, self.directory, snapshot), wfd, protocol=pickle.HIGHEST_PROTOCOL)
+            os.rename(wfd.name, self._snapshot_path())
+        except (OSError, pickle.PicklingError):
+            pass
@@ -6,7 +6,7 @@ from __future__ import absolute_import
 
 from debian.changelog import Changelog, get_maintainer
 from email.utils import formatdate
-from os import path, listdir
+from os import fstat, path, listdir
 from re import compile, findall, finditer
 from glob import glob
 
@@ -24,10 +24,6 @@ class DebianError(Exception):
         self.msg = error
 
 
-# Note: Think about cacheing the decoded, changelog dictionary.
-#
-
-
 class Debian:
     verbose = False
     debug = False
@@ -132,6 +128,49 @@ class Debian:
             raise DebianError("Failed to find the master changelog.")
         return retval
 
+    # Parsed changelogs, keyed by (repository, commit) for the committed
+    # changelog or by (path, mtime, size) for the local copy.  Each holds
+    # (changelog path, list of sections).
+    __changelog_cache = {}
+
+    # changelog_stream
+    #
+    @classmethod
+    def changelog_stream(cls, local=False):
+        """
+        Find the changelog for this branch of this repository, returning
+        (lines, changelog path, cache key) where lines iterates over the
+        changelog lines as they are read.
+        """
+        if not local:
+            current_branch = Git.current_branch()
+
+        # Check each possible directory for a changelog
+        debian_dirs = cls.debian_directories()
+        for debdir in debian_dirs:
+            chglog = debdir + "/changelog"
+            debug("Trying '%s': " % chglog, cls.debug)
+            try:
+                if local:
+                    f = open(chglog, "r")
+                    st = fstat(f.fileno())
+                    key = (path.realpath(chglog), st.st_mtime_ns, st.st_size)
+                    return cls.__stream_file(f), chglog, key
+                else:
+                    lines = Git.show_stream(chglog, branch=current_branch)
+                    return lines, chglog, None
+            except (GitError, OSError, IOError):
+                debug("FAILED\n", cls.debug, False)
+
+        # Not there anywhere, barf
+        raise DebianError("Failed to find the changelog.")
+
+    @classmethod
+    def __stream_file(cls, f):
+        with f:
+            for line in f:
+                yield line.rstrip("\n")
+
     # raw_changelog
     #
     @classmethod
@@ -157,69 +196,176 @@ class Debian:
         # Not there anywhere, barf
         raise DebianError("Failed to find the changelog.")
 
+    @classmethod
+    def __changelog_commit_key(cls):
+        """
+        Return (repository, commit) for HEAD, or None outside of a git tree.
+        """
+        status, result = run_command("git rev-parse --show-toplevel HEAD", cls.debug)
+        if status != 0 or len(result) != 2:
+            return None
+        return (result[0], result[1])
+
+    @classmethod
+    def __changelog_cached(cls, local):
+        """
+        Return (cache key, cached sections) for the changelog of the
+        current tree, the latter None if it has not been parsed yet.
+        """
+        if local:
+            # The local changelog is keyed by its file, we do not know
+            # which until it is found.
+            return None, None
+        key = cls.__changelog_commit_key()
+        if key is None:
+            return None, None
+        return key, cls.__changelog_cache.get(key)
+
     # changelog
     #
     @classmethod
     def changelog(cls, local=False):
-        changelog_contents, changelog_path = cls.raw_changelog(local)
-        return cls.changelog_as_list(changelog_contents)
+        """
+        Return the list of changelog sections, newest first.  Parsed
+        changelogs are cached, the list returned is the caller's own but
+        the sections themselves are shared and should not be modified.
+        """
+        return list(cls.changelog_iter(local))
+
+    # changelog_iter
+    #
+    @classmethod
+    def changelog_iter(cls, local=False):
+        """
+        Iterate over the changelog sections, newest first, parsing each
+        only as it is required.  Use this where only the first few
+        sections are of interest.
+        """
+        key, cached = cls.__changelog_cached(local)
+        if cached is not None:
+            return iter(cached[1])
+
+        lines, chglog, file_key = cls.changelog_stream(local)
+        if key is None:
+            key = file_key
+        if key is not None and key in cls.__changelog_cache:
+            lines.close()
+            return iter(cls.__changelog_cache[key][1])
+        return cls.__changelog_iter_caching(lines, chglog, key)
+
+    @classmethod
+    def __changelog_iter_caching(cls, lines, chglog, key):
+        sections = []
+        try:
+            for section in cls.changelog_parse(lines):
+                sections.append(section)
+                yield section
+        finally:
+            lines.close()
+        # Only a complete changelog can be cached.
+        if key is not None:
+            cls.__changelog_cache[key] = (chglog, sections)
+
+    # changelog_header
+    #
+    @classmethod
+    def changelog_header(cls, local=False):
+        """
+        Return the package, version, series and pocket (as for a section
+        but without its content) from the first line of the changelog
+        alone.
+        """
+        key, cached = cls.__changelog_cached(local)
+        if cached is not None and len(cached[1]) > 0:
+            section = cached[1][0]
+            return {
+                k: v for k, v in section.items() if k not in ("content", "own-content", "bugs", "own-bugs", "master")
+            }
+
+        lines, chglog, file_key = cls.changelog_stream(local)
+        try:
+            m = cls.version_line_rc.match(next(lines, ""))
+        finally:
+            lines.close()
+        if m is None:
+            raise DebianError("The first line in the changelog is not a version line.")
+        return cls.__version_section(m)
 
     # changelog_as_list
     #
     @classmethod
     def changelog_as_list(cls, changelog_contents):
-        retval = []
+        return list(cls.changelog_parse(changelog_contents))
+
+    @classmethod
+    def __version_section(cls, m):
+        """
+        Return a new section for the given version line match.
+        """
+        version = ""
+        release = ""
+        pocket = ""
+        package = m.group(1)
+        version = m.group(2)
+        rp = m.group(3)
+        if "-" in rp:
+            release, pocket = rp.split("-")
+        else:
+            release = rp
+
+        section = {}
+        section["version"] = version
+        section["release"] = release
+        section["series"] = release
+        section["pocket"] = pocket
+        section["package"] = package
+
+        m = cls.version_rc.match(version)
+        if m is not None:
+            section["linux-version"] = m.group(1)
+            section["ABI"] = m.group(2)
+            section["upload-number"] = m.group(3)
+        else:
+            debug("The version (%s) failed to match the regular expression.\n" % version, cls.debug)
+        return section
+
+    # changelog_parse
+    #
+    @classmethod
+    def changelog_parse(cls, changelog_contents):
+        """
+        Parse the changelog lines (any iterable) yielding each section as
+        soon as it is complete.
+        """
+        lines = iter(changelog_contents)
 
         # The first line of the changelog should always be a version line.
         #
-        m = cls.version_line_rc.match(changelog_contents[0])
+        first = next(lines, "")
+        m = cls.version_line_rc.match(first)
         if m is None:
             if cls.debug:
-                m = cls.package_rc.match(changelog_contents[0])
+                m = cls.package_rc.match(first)
                 if m is None:
                     debug("The package does not appear to be in a recognized format.\n", cls.debug)
 
-                m = cls.ver_rc.match(changelog_contents[0])
+                m = cls.ver_rc.match(first)
                 if m is None:
                     debug("The version does not appear to be in a recognized format.\n", cls.debug)
 
             raise DebianError("The first line in the changelog is not a version line.")
 
+        section = cls.__version_section(m)
         content = []
         own_content = []
         bugs = []
         own_bugs = []
         parsing_own_bugs = True
 
-        for line in changelog_contents:
+        for line in lines:
             m = cls.version_line_rc.match(line)
             if m is not None:
-                version = ""
-                release = ""
-                pocket = ""
-                package = m.group(1)
-                version = m.group(2)
-                rp = m.group(3)
-                if "-" in rp:
-                    release, pocket = rp.split("-")
-                else:
-                    release = rp
-
-                section = {}
-                section["version"] = version
-                section["release"] = release
-                section["series"] = release
-                section["pocket"] = pocket
-                section["package"] = package
-
-                m = cls.version_rc.match(version)
-                if m is not None:
-                    section["linux-version"] = m.group(1)
-                    section["ABI"] = m.group(2)
-                    section["upload-number"] = m.group(3)
-                else:
-                    debug("The version (%s) failed to match the regular expression.\n" % version, cls.debug)
-
+                section = cls.__version_section(m)
                 content = []
                 own_content = []
                 bugs = []
@@ -252,9 +398,7 @@ class Debian:
                 section["own-content"] = own_content
                 section["bugs"] = set(bugs)
                 section["own-bugs"] = set(own_bugs)
-                retval.append(section)
-
-        return retval
+                yield section
 
     # abi
     #
@@ -352,13 +496,9 @@ class Debian:
         the kernel on the current directory.  The changelog
         information is used for the series and source package lookup.
         """
-        # Get the changelog
-        changelog = cls.changelog()
-        if not changelog and len(changelog) < 1:
-            raise DebianError("No changelog entries.")
         # Find the first valid entry
         series = package = None
-        for centry in changelog:
+        for centry in cls.changelog_iter():
             if centry["series"] != "UNRELEASED":
                 series = centry["series"]
                 package = centry["package"]
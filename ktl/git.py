@@ -1,7 +1,9 @@
 from __future__ import print_function
 
-from ktl.utils import run_command
+from ktl.utils import debug, run_command
+from itertools import chain
 from re import compile, escape
+from subprocess import DEVNULL, PIPE, Popen
 
 
 class GitError(Exception):
@@ -223,6 +225,40 @@ class Git:
 
         return result
 
+    # show_stream
+    #
+    @classmethod
+    def show_stream(cls, obj, branch=""):
+        """
+        As show() but returns an iterator over the lines of obj as git
+        produces them.  Closing the iterator early terminates git.
+        """
+        if branch != "":
+            obj = branch + ":" + obj
+        debug("     cmd: 'git show %s'\n" % obj, cls.debug)
+        proc = Popen(["git", "show", obj], stdout=PIPE, stderr=DEVNULL, universal_newlines=True)
+
+        # Wait for the first line so that a missing object raises here
+        # rather than part way through the caller's iteration.
+        first = proc.stdout.readline()
+        if first == "" and proc.wait() != 0:
+            proc.stdout.close()
+            raise GitError(["git show {} failed".format(obj)])
+
+        def lines():
+            try:
+                for line in chain([first], proc.stdout):
+                    if line == "":
+                        break
+                    yield line.rstrip("\n")
+            finally:
+                proc.stdout.close()
+                if proc.poll() is None:
+                    proc.terminate()
+                proc.wait()
+
+        return lines()
+
     @classmethod
     def __process_log_commit(cls, commit_text, sha1):
         results = {}
@@ -1,6 +1,6 @@
 from lpltk.LaunchpadService import LaunchpadService
 from lpltk.bug import Bug
-from ktl.bugs import DeltaTime
+from ktl.bugs import Bugs
 from ktl.kernel_series import KernelSeries
 from ktl.utils import debug as dout
 from ktl.dbg import Dbg
@@ -220,34 +220,7 @@ class KernelBug(Bug):
         Try to come up with an integer value that represents the need of this
         bug to be addressed. The higher the number, the more attention it deserves.
         """
-        gravity = 0
-
-        now = datetime.utcnow()
-
-        # Calculate a value based on how long before now the bug was created. The longer
-        # ago, the lower the value.
-        #
-        ago = DeltaTime(self.date_created, now)
-        if ago.days < 7:
-            gravity += 1000
-        elif ago.days < 14:
-            gravity += 500
-        elif ago.days < 21:
-            gravity += 250
-        elif ago.days < 30:
-            gravity += 100
-
-        ago = DeltaTime(self.date_last_message, now)
-        if ago.days < 7:
-            gravity += 1000
-        elif ago.days < 14:
-            gravity += 500
-        elif ago.days < 21:
-            gravity += 250
-        elif ago.days < 30:
-            gravity += 100
-
-        return gravity
+        return Bugs.kernel_gravity(self.date_created, self.date_last_message, datetime.utcnow())
 
     # _ubuntu_series_lookup
     #
@@ -1,7 +1,11 @@
 import errno
+import hashlib
 import io
 import json
 import os
+import pickle
+import tempfile
+import time
 from gzip import GzipFile
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlsplit
@@ -384,6 +388,10 @@ class KernelSourceEntry:
         self._name = name
         self._data = data if data else {}
 
+        self._packages = None
+        self._packages_by_type = None
+        self._snaps = None
+
     def __eq__(self, other):
         if isinstance(self, other.__class__):
             return self.name == other.name and self.series == other.series
@@ -462,46 +470,47 @@ class KernelSourceEntry:
     def package_relations(self):
         return self._data.get("package-relations", "default")
 
+    def _packages_init(self):
+        if self._packages is None:
+            self._packages = {}
+            self._packages_by_type = {}
+            packages = self._data.get("packages")
+            if packages:
+                for package_key, package in packages.items():
+                    entry = KernelPackageEntry(self._ks, self, package_key, package)
+                    self._packages[package_key] = entry
+                    self._packages_by_type.setdefault(entry.type, entry)
+        return self._packages
+
     @property
     def packages(self):
         # XXX: should this return None when empty
-        result = []
-        packages = self._data.get("packages")
-        if packages:
-            for package_key, package in packages.items():
-                result.append(KernelPackageEntry(self._ks, self, package_key, package))
-        return result
+        return list(self._packages_init().values())
 
     def lookup_package(self, package_key=None, type=None):
         if package_key is None and type is None:
             raise ValueError("package-name/package-type required")
-        packages = self._data.get("packages")
-        if not packages:
-            return None
+        packages = self._packages_init()
         if type is not None:
-            for package in self.packages:
-                if package.type == type:
-                    return package
-            return None
-        if package_key is None or package_key not in packages:
-            return None
-        return KernelPackageEntry(self._ks, self, package_key, packages[package_key])
+            return self._packages_by_type.get(type)
+        return packages.get(package_key)
+
+    def _snaps_init(self):
+        if self._snaps is None:
+            self._snaps = {}
+            snaps = self._data.get("snaps")
+            if snaps:
+                for snap_key, snap in snaps.items():
+                    self._snaps[snap_key] = KernelSnapEntry(self._ks, self, snap_key, snap)
+        return self._snaps
 
     @property
     def snaps(self):
         # XXX: should this return None when empty
-        result = []
-        snaps = self._data.get("snaps")
-        if snaps:
-            for snap_key, snap in snaps.items():
-                result.append(KernelSnapEntry(self._ks, self, snap_key, snap))
-        return result
+        return list(self._snaps_init().values())
 
     def lookup_snap(self, snap_key):
-        snaps = self._data.get("snaps")
-        if not snaps or snap_key not in snaps:
-            return None
-        return KernelSnapEntry(self._ks, self, snap_key, snaps[snap_key])
+        return self._snaps_init().get(snap_key)
 
     @property
     def derived_from(self):
@@ -662,6 +671,9 @@ class KernelSeriesEntry:
         if data is not None:
             self._data.update(data)
 
+        self._sources = None
+        self._packages = None
+
     def __eq__(self, other):
         if isinstance(self, other.__class__):
             return self.name == other.name
@@ -728,14 +740,18 @@ class KernelSeriesEntry:
     def __str__(self):
         return "{} ({})".format(self.name, self.codename)
 
+    def _sources_init(self):
+        if self._sources is None:
+            self._sources = {}
+            sources = self._data.get("sources")
+            if sources:
+                for source_key, source in sources.items():
+                    self._sources[source_key] = KernelSourceEntry(self._ks, self, source_key, source)
+        return self._sources
+
     @property
     def sources(self):
-        result = []
-        sources = self._data.get("sources")
-        if sources:
-            for source_key, source in sources.items():
-                result.append(KernelSourceEntry(self._ks, self, source_key, source))
-        return result
+        return list(self._sources_init().values())
 
     @property
     def routing_table(self):
@@ -746,13 +762,27 @@ class KernelSeriesEntry:
         return self._data.get("routing-map", {})
 
     def lookup_source(self, source_key):
-        sources = self._data.get("sources")
-        if not sources or source_key not in sources:
-            return None
-        return KernelSourceEntry(self._ks, self, source_key, sources[source_key])
+        return self._sources_init().get(source_key)
+
+    def lookup_package(self, package_key):
+        """Return the package named package_key from any source in this series."""
+        if self._packages is None:
+            self._packages = {}
+            for source in self.sources:
+                for package in source.packages:
+                    self._packages.setdefault(package.name, package)
+        return self._packages.get(package_key)
 
 
 class KernelSeriesUrl:
+    # Parsed documents are kept as pickled snapshots keyed by a hash of the
+    # raw document, avoiding the json/yaml parse for content we have seen.
+    # Only the snapshot_keep most recently used are retained.
+    snapshot = True
+    snapshot_dir = os.path.join(os.path.expanduser("~"), ".cache", "ktl.kernel_series")
+    snapshot_format = b"1"
+    snapshot_keep = 32
+
     def __init__(self, url=None, data=None, data_location=None):
         if data is None and url is None:
             raise ValueError("expecting url or data")
@@ -760,14 +790,31 @@ class KernelSeriesUrl:
         self.url = url
         self.data_location = data_location
 
+        snapshot_key = None
         if data is None:
             url = urlsplit(url, scheme="file").geturl()
             response = urlopen(url)
             data = response.read()
+            snapshot_key = hashlib.sha256(self.snapshot_format + data).hexdigest()
+
+        snapshot = self.snapshot_load(snapshot_key)
+        if snapshot is not None:
+            (self._data, self.defaults, self._development_series, self._codename_to_series) = snapshot
+
+        else:
+            self._parse(data)
+            self.snapshot_save(
+                snapshot_key, (self._data, self.defaults, self._development_series, self._codename_to_series)
+            )
+
+        self._xc = None
+        self._series = {}
+
+    def _parse(self, data):
+        if isinstance(data, bytes):
             if data[0:2] == b"\x1f\x8b":
                 data = gzip_decompress(data)
-            if isinstance(data, bytes):
-                data = data.decode("utf-8")
+            data = data.decode("utf-8")
 
         if isinstance(data, dict):
             self._data = data
@@ -779,8 +826,6 @@ class KernelSeriesUrl:
         else:
             self._data = yaml.safe_load(data)
 
-        self._xc = None
-
         self._development_series = None
         self._codename_to_series = {}
         for series_key, series in self._data.items():
@@ -800,15 +845,77 @@ class KernelSeriesUrl:
             if "assets" in self.defaults:
                 del self.defaults["assets"]
 
+    def _snapshot_path(self, key):
+        return os.path.join(self.snapshot_dir, key + ".pickle")
+
+    def snapshot_load(self, key):
+        if key is None or not self.snapshot:
+            return None
+        try:
+            with open(self._snapshot_path(key), "rb") as rfd:
+                snapshot = pickle.load(rfd)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return None
+        # Mark it as recently used so that it survives pruning.
+        try:
+            os.utime(self._snapshot_path(key))
+        except OSError:
+            pass
+        return snapshot
+
+    def snapshot_save(self, key, snapshot):
+        if key is None or not self.snapshot:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.snapshot_dir, suffix=".new", delete=False) as wfd:
+                pickle.dump(snapshot, wfd, protocol=pickle.HIGHEST_PROTOCOL)
+            os.rename(wfd.name, self._snapshot_path(key))
+        except (OSError, pickle.PicklingError):
+            return
+        self.snapshot_prune()
+
+    def snapshot_prune(self):
+        """
+        Remove all but the snapshot_keep most recently used snapshots, and
+        any temporary files left behind by interrupted saves.
+        """
+        snapshots = []
+        try:
+            with os.scandir(self.snapshot_dir) as entries:
+                for entry in entries:
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if entry.name.endswith(".pickle"):
+                        snapshots.append((mtime, entry.path))
+                    elif entry.name.endswith(".new") and mtime < time.time() - 3600:
+                        snapshots.append((0, entry.path))
+        except OSError:
+            return
+        snapshots.sort(reverse=True)
+        for mtime, path in snapshots[self.snapshot_keep :]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
     @property
     def xc(self):
         if self._xc is None:
             self._xc = SigningConfig(data_location=self.data_location)
         return self._xc
 
+    def _series_entry(self, series_key):
+        entry = self._series.get(series_key)
+        if entry is None:
+            entry = self._series[series_key] = KernelSeriesEntry(self, series_key, self._data[series_key])
+        return entry
+
     @property
     def series(self):
-        return [KernelSeriesEntry(self, series_key, series) for series_key, series in self._data.items()]
+        return [self._series_entry(series_key) for series_key in self._data]
 
     def lookup_series(self, series=None, codename=None, development=False):
         if not series and not codename and not development:
@@ -823,7 +930,7 @@ class KernelSeriesUrl:
             series = self._development_series
         if series and series not in self._data:
             return None
-        return KernelSeriesEntry(self, series, self._data[series])
+        return self._series_entry(series)
 
     @classmethod
     def key_series_name(cls, series):
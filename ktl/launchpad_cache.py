@@ -1,23 +1,36 @@
 from launchpadlib.launchpad import Launchpad
+from lazr.restfulclient.errors import HTTPError
+from wadllib.application import Resource as WadlResource
 
 try:
     from launchpadlib.credentials import AuthorizeRequestTokenWithURL
 except ImportError:
     from .launchpad_compat import AuthorizeRequestTokenWithURL
 
+import functools
+import json
 import os
 
+from .shared_cache import SharedCache
+
 
 class LaunchpadCacheNamedOperation:
-    def __init__(self, value, key, cache):
+    def __init__(self, value, key, cache, persistent=None, prefix=None):
         self.__value = value
         self.__key = key
         self.__cache = cache
+        self.__persistent = persistent
+        self.__prefix = prefix
 
     def __call__(self, *args, **kwargs):
         op_key = kwargs[self.__key]
         if op_key not in self.__cache:
-            self.__cache[op_key] = self.__value.__call__(*args, **kwargs)
+            lookup = functools.partial(self.__value.__call__, *args, **kwargs)
+            if self.__persistent is not None:
+                value = self.__persistent("{}({}={})".format(self.__prefix, self.__key, op_key), lookup)
+            else:
+                value = lookup()
+            self.__cache[op_key] = value
         return self.__cache[op_key]
 
 
@@ -35,29 +48,39 @@ class LaunchpadCacheAttr:
 class LaunchpadCacheArchives(LaunchpadCacheAttr):
     __reference_cache = {}
 
-    def __init__(self, value):
+    def __init__(self, value, persistent=None):
         super().__init__(value)
 
-        self.getByReference = LaunchpadCacheNamedOperation(value.getByReference, "reference", self.__reference_cache)
+        self.getByReference = LaunchpadCacheNamedOperation(
+            value.getByReference, "reference", self.__reference_cache, persistent, "archives.getByReference"
+        )
 
 
 class LaunchpadCacheDistributionsEntry(LaunchpadCacheAttr):
-    def __init__(self, value):
+    def __init__(self, value, persistent=None, prefix=None):
         super().__init__(value)
 
-        self.getSeries = LaunchpadCacheNamedOperation(value.getSeries, "name_or_version", dict())
+        self.getSeries = LaunchpadCacheNamedOperation(
+            value.getSeries, "name_or_version", dict(), persistent, prefix + ".getSeries"
+        )
 
 
 class LaunchpadCacheDistributions:
     __cache = {}
 
-    def __init__(self, value):
+    def __init__(self, value, persistent=None):
         self.__value = value
+        self.__persistent = persistent
 
     def __getitem__(self, item):
         if item not in self.__cache:
-            value = LaunchpadCacheDistributionsEntry(self.__value[item])
-            self.__cache[item] = value
+            prefix = "distributions[{}]".format(item)
+            lookup = functools.partial(self.__value.__getitem__, item)
+            if self.__persistent is not None:
+                entry = self.__persistent(prefix, lookup)
+            else:
+                entry = lookup()
+            self.__cache[item] = LaunchpadCacheDistributionsEntry(entry, self.__persistent, prefix)
         return self.__cache[item]
 
 
@@ -83,34 +106,150 @@ class LaunchpadCacheProjects:
 class LaunchpadCacheGitRepositories(LaunchpadCacheAttr):
     __path_cache = {}
 
-    def __init__(self, value):
+    def __init__(self, value, persistent=None):
         super().__init__(value)
 
-        self.getByPath = LaunchpadCacheNamedOperation(value.getByPath, "path", self.__path_cache)
+        self.getByPath = LaunchpadCacheNamedOperation(
+            value.getByPath, "path", self.__path_cache, persistent, "git_repositories.getByPath"
+        )
 
 
 class LaunchpadCachePeople:
     __cache = {}
 
-    def __init__(self, value):
+    def __init__(self, value, persistent=None):
         self.__value = value
+        self.__persistent = persistent
 
     def __getitem__(self, item):
         if item not in self.__cache:
-            self.__cache[item] = self.__value[item]
+            lookup = functools.partial(self.__value.__getitem__, item)
+            if self.__persistent is not None:
+                self.__cache[item] = self.__persistent("people[{}]".format(item), lookup)
+            else:
+                self.__cache[item] = lookup()
         return self.__cache[item]
 
 
+class LaunchpadCacheBugs(LaunchpadCacheAttr):
+    """
+    The bugs collection, allowing bug representations fetched elsewhere (for
+    example on another thread's connection) to be handed in with preload().
+    The next lookup of that bug is then bound to this Launchpad without a
+    further round trip.
+    """
+
+    def __init__(self, value, lp):
+        super().__init__(value)
+        self.__value = value
+        self.__lp = lp
+        self.__preloaded = {}
+
+    def preload(self, bug_id, url, representation):
+        self.__preloaded[int(bug_id)] = (url, representation)
+
+    def __getitem__(self, item):
+        preloaded = self.__preloaded.pop(int(item), None)
+        if preloaded is not None:
+            return self.__lp._bind_representation(*preloaded)
+        return self.__value[item]
+
+
 class LaunchpadCache(Launchpad):
+    """
+    A Launchpad which caches lookups of effectively static objects: archives,
+    distributions (and their series), git repositories and people.  Within a
+    process the resulting objects are memoised.  Their representations are
+    also held in a SharedCache so that later processes may reuse them, after
+    persistent_ttl they are revalidated with a conditional GET.
+
+    Bugs are not cached, but may be preloaded (see LaunchpadCacheBugs).
+    """
+
+    # Set to False to disable the cross-process cache.
+    persistent = True
+    persistent_ttl = 3600
+    persistent_max_entries = 10000
+
+    _store = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._me = False
 
-        self.archives = LaunchpadCacheArchives(self.archives)
-        self.distributions = LaunchpadCacheDistributions(self.distributions)
+        persistent = self.cached_lookup if self.persistent else None
+        self.archives = LaunchpadCacheArchives(self.archives, persistent)
+        self.distributions = LaunchpadCacheDistributions(self.distributions, persistent)
         self.projects = LaunchpadCacheProjects(self.projects)
-        self.git_repositories = LaunchpadCacheGitRepositories(self.git_repositories)
-        self.people = LaunchpadCachePeople(self.people)
+        self.git_repositories = LaunchpadCacheGitRepositories(self.git_repositories, persistent)
+        self.people = LaunchpadCachePeople(self.people, persistent)
+        self.bugs = LaunchpadCacheBugs(self.bugs, self)
+
+    @classmethod
+    def cache_store(cls):
+        if LaunchpadCache._store is None:
+            LaunchpadCache._store = SharedCache(
+                "launchpad", ttl=cls.persistent_ttl, max_entries=cls.persistent_max_entries
+            )
+        return LaunchpadCache._store
+
+    @classmethod
+    def cache_stats(cls):
+        """Return the hit/miss counters for the cross-process cache."""
+        return dict(cls.cache_store().stats)
+
+    def _bind_representation(self, url, representation):
+        # As Launchpad.load() but from a representation we already hold.
+        resource_type = self._wadl.get_resource_type(representation["resource_type_link"])
+        wadl_resource = WadlResource(self._wadl, url, resource_type.tag)
+        return self._create_bound_resource(
+            self, wadl_resource, representation, "application/json", representation_needs_processing=False
+        )
+
+    def cached_lookup(self, key, lookup):
+        """
+        Return the object for key from the cross-process cache, revalidating
+        it if stale.  On a miss call lookup() and record the result.
+        """
+        store = self.cache_store()
+        key = "{}|{}".format(self._root_uri, key)
+
+        entry = store.lookup(key)
+        if entry is not None:
+            data = json.loads(entry.value)
+            url = data["url"]
+            representation = data["representation"]
+            if entry.fresh:
+                return self._bind_representation(url, representation)
+
+            try:
+                response, content = self._browser.get(url, headers={"If-None-Match": entry.etag}, return_response=True)
+            except HTTPError:
+                store.delete(key)
+                content = None
+            if content is self._browser.NOT_MODIFIED:
+                store.count("revalidated")
+                store.touch(key)
+                return self._bind_representation(url, representation)
+            if content is not None:
+                if isinstance(content, bytes):
+                    content = content.decode("utf-8")
+                representation = json.loads(content)
+                self._cache_store_entry(store, key, url, representation)
+                return self._bind_representation(url, representation)
+
+        value = lookup()
+        if value is not None:
+            # Ensure we have the representation to hand.
+            url = value.self_link
+            representation = value._wadl_resource.representation
+            if isinstance(representation, dict):
+                self._cache_store_entry(store, key, url, representation)
+        return value
+
+    def _cache_store_entry(self, store, key, url, representation):
+        data = {"url": url, "representation": representation}
+        store.store(key, json.dumps(data), etag=representation.get("http_etag"))
 
     @property
     def me(self):
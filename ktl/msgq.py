@@ -1,5 +1,10 @@
 import functools
+import gzip
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pika
 
 
@@ -10,6 +15,10 @@ class MsgQueue(object):
     REJECT = object()
     REQUEUE = object()
 
+    # Seconds publish_batch() waits without any confirmation arriving
+    # before treating the outstanding messages as failed.
+    confirm_timeout = 120
+
     # __init__
     #
     def __init__(
@@ -20,6 +29,7 @@ class MsgQueue(object):
         heartbeat_interval=None,
         supports_global_qos=False,
         local=False,
+        compress_threshold=None,
         **kwargs,
     ):
         s.exchange_name = exchange
@@ -38,8 +48,24 @@ class MsgQueue(object):
 
         s.connection = None
         s.channel = None
+        s.confirm_channel = None
+
+        # Consumer thread pool and the number of messages it holds which
+        # are not yet acknowledged, see listen_worker(workers=N).
+        s.executor = None
+        s.inflight = 0
+        s.global_prefetch = 0
+
+        # Messages are all persistent and vary only by priority and
+        # encoding, pre-build the properties for each combination.
+        s._properties = {}
+
+        # Payloads larger than this (in bytes) are gzip compressed when
+        # published, None disables compression.
+        s.compress_threshold = compress_threshold
 
         params = pika.ConnectionParameters(**kwargs)
+        s.connection_thread = threading.get_ident()
         s.connection = pika.BlockingConnection(params)
         s.channel = s.connection.channel()
         s.channel.exchange_declare(exchange=s.exchange_name, exchange_type=exchange_type)
@@ -47,6 +73,9 @@ class MsgQueue(object):
         s.supports_global_qos = supports_global_qos
 
     def close(s):
+        if s.confirm_channel is not None:
+            s.confirm_channel.close()
+            s.confirm_channel = None
         if s.channel is not None:
             s.channel.close()
             s.channel = None
@@ -59,7 +88,7 @@ class MsgQueue(object):
 
     def listen(s, queue_name, routing_key, handler_function, queue_durable=True, queue_arguments=None):
         def wrapped_handler(channel, method, properties, body):
-            payload = json.loads(body)
+            payload = json.loads(s.decode_body(properties, body))
             handler_function(payload)
 
         s.channel.basic_qos(prefetch_count=1)
@@ -81,16 +110,21 @@ class MsgQueue(object):
         queue_durable=True,
         auto_delete=False,
         queue_arguments=None,
+        prefetch=1,
+        workers=None,
     ):
-        def wrapped_handler(channel, method, properties, body):
-            if isinstance(body, bytes):
-                body = body.decode("utf-8")
-            payload = json.loads(body)
-            ack = None
-            if handler_function is not None:
-                handler_function(payload)
-            if handler is not None:
-                ack = handler(channel, method, properties, payload)
+        """
+        Consume messages from queue_name, acknowledging each once handled.
+
+        prefetch (int): the number of unacknowledged messages the broker
+            may deliver to us at once.
+        workers (int): when specified handlers are run on a pool of this
+            many threads, leaving the connection thread free to service
+            heartbeats.  Handlers may use publish() and listen_stop() but
+            must not otherwise touch the channel.
+        """
+
+        def settle(channel, method, ack):
             if ack is s.REJECT:
                 channel.basic_reject(method.delivery_tag, requeue=False)
             elif ack is s.REQUEUE:
@@ -98,22 +132,83 @@ class MsgQueue(object):
             else:
                 channel.basic_ack(method.delivery_tag)
 
+        def handle(channel, method, properties, body):
+            payload = json.loads(s.decode_body(properties, body))
+            ack = None
+            if handler_function is not None:
+                handler_function(payload)
+            if handler is not None:
+                ack = handler(channel, method, properties, payload)
+            return ack
+
+        def wrapped_handler(channel, method, properties, body):
+            settle(channel, method, handle(channel, method, properties, body))
+
+        def pooled_settle(channel, method, future):
+            s.inflight -= 1
+            # Reraise any handler failure in the connection thread as we
+            # would have when running synchronously.
+            settle(channel, method, future.result())
+
+        def pooled_handler(channel, method, properties, body):
+            s.inflight += 1
+            future = s.executor.submit(handle, channel, method, properties, body)
+            future.add_done_callback(
+                lambda future: s.connection.add_callback_threadsafe(
+                    functools.partial(pooled_settle, channel, method, future)
+                )
+            )
+
+        if workers is not None:
+            if s.executor is None:
+                s.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="msgq-worker")
+            prefetch = max(prefetch, workers)
+
         if s.supports_global_qos:
-            s.channel.basic_qos(prefetch_count=1, global_qos=True)
+            # A global limit is shared by all consumers on the channel, it
+            # must accommodate the largest requested.
+            s.global_prefetch = max(s.global_prefetch, prefetch)
+            s.channel.basic_qos(prefetch_count=s.global_prefetch, global_qos=True)
         else:
-            s.channel.basic_qos(prefetch_count=1)
+            s.channel.basic_qos(prefetch_count=prefetch)
 
         if isinstance(routing_key, str):
             routing_key = [routing_key]
         s.channel.queue_declare(queue_name, durable=queue_durable, auto_delete=auto_delete, arguments=queue_arguments)
         for key in routing_key:
             s.channel.queue_bind(exchange=s.exchange_name, queue=queue_name, routing_key=key)
-        s.channel.basic_consume(queue=queue_name, auto_ack=False, on_message_callback=wrapped_handler)
+        s.channel.basic_consume(
+            queue=queue_name,
+            auto_ack=False,
+            on_message_callback=wrapped_handler if workers is None else pooled_handler,
+        )
+
+    def in_connection_thread(s):
+        return threading.get_ident() == s.connection_thread
+
+    def service(s):
+        """
+        Service the connection (heartbeats etc) while we are busy.  This is
+        only required from within a synchronous handler, when handlers are
+        run in a pool the connection thread is already doing so.
+        """
+        if s.in_connection_thread():
+            s.connection.process_data_events()
 
     def listen_start(s):
         s.channel.start_consuming()
 
+        # Allow any handlers still running to complete and be acknowledged.
+        if s.executor is not None:
+            while s.inflight > 0:
+                s.connection.process_data_events(time_limit=1)
+            s.executor.shutdown()
+            s.executor = None
+
     def listen_stop(s):
+        if not s.in_connection_thread():
+            s.connection.add_callback_threadsafe(s.channel.stop_consuming)
+            return
         s.channel.stop_consuming()
 
     def queue_info(s, queue_name):
@@ -134,15 +229,156 @@ class MsgQueue(object):
     def exchange_delete(s, queue_name):
         s.channel.exchange_delete(queue_name)
 
-    def publish(s, routing_key, payload, priority=None):
+    def properties(s, priority=None, content_encoding=None):
+        key = (priority, content_encoding)
+        properties = s._properties.get(key)
+        if properties is None:
+            properties = s._properties[key] = pika.BasicProperties(
+                delivery_mode=2, priority=priority, content_encoding=content_encoding
+            )
+        return properties
+
+    def encode_body(s, payload, compress=None):
+        """
+        Encode payload for publication returning the body and its
+        content-encoding.
+        """
         message_body = json.dumps(payload)
-        properties = pika.BasicProperties(delivery_mode=2, priority=priority)
+        if compress is None:
+            compress = s.compress_threshold is not None and len(message_body) > s.compress_threshold
+        if compress:
+            return gzip.compress(message_body.encode("utf-8")), "gzip"
+        return message_body, None
+
+    @classmethod
+    def decode_body(cls, properties, body):
+        if properties is not None and properties.content_encoding == "gzip":
+            body = gzip.decompress(body)
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        return body
+
+    def publish(s, routing_key, payload, priority=None, compress=None):
+        if not s.in_connection_thread():
+            s.publish_threadsafe(routing_key, payload, priority=priority, compress=compress)
+            return
+        message_body, content_encoding = s.encode_body(payload, compress=compress)
         s.channel.basic_publish(
-            exchange=s.exchange_name, routing_key=routing_key, body=message_body, properties=properties
+            exchange=s.exchange_name,
+            routing_key=routing_key,
+            body=message_body,
+            properties=s.properties(priority, content_encoding),
         )
 
-    def publish_threadsafe(s, routing_key, payload, priority=None):
-        cb = functools.partial(s.publish, routing_key, payload, priority)
+    def publish_batch(s, messages, window=64, compress=None):
+        """
+        Publish a sequence of (routing_key, payload, priority) messages with
+        publisher confirms, keeping up to window messages outstanding with
+        the broker at once.  Returns the list of messages which the broker
+        failed to accept.
+        """
+        messages = list(messages)
+        if len(messages) == 0:
+            return []
+
+        # Confirm mode cannot be turned off again on a channel, so confirmed
+        # publications have their own channel.  We need per-message
+        # confirmations to pipeline, which the blocking adapter does not
+        # expose, so drive the underlying channel directly.
+        if s.confirm_channel is not None and s.confirm_channel.is_closed:
+            s.confirm_channel = None
+        if s.confirm_channel is None:
+            channel = s.connection.channel()
+            selected = []
+            channel._impl.confirm_delivery(
+                ack_nack_callback=s._on_confirm, callback=lambda frame: selected.append(frame)
+            )
+            s.confirm_channel = channel
+            s._confirm_tag = 0
+            s._confirm_outstanding = {}
+            if not s._confirm_wait(lambda: len(selected) > 0):
+                s._confirm_abandon()
+                return messages
+        channel = s.confirm_channel._impl
+
+        failed = []
+        s._confirm_failed = failed
+        sent = -1
+        try:
+            for sent, message in enumerate(messages):
+                (routing_key, payload, priority) = message
+                message_body, content_encoding = s.encode_body(payload, compress=compress)
+                channel.basic_publish(
+                    exchange=s.exchange_name,
+                    routing_key=routing_key,
+                    body=message_body,
+                    properties=s.properties(priority, content_encoding),
+                )
+                s._confirm_tag += 1
+                s._confirm_outstanding[s._confirm_tag] = message
+
+                if not s._confirm_wait(lambda: len(s._confirm_outstanding) < window):
+                    raise pika.exceptions.AMQPError("no publisher confirms")
+
+            if not s._confirm_wait(lambda: len(s._confirm_outstanding) == 0):
+                raise pika.exceptions.AMQPError("no publisher confirms")
+
+        except pika.exceptions.AMQPError:
+            # Anything not confirmed is lost with the channel.
+            failed.extend(s._confirm_outstanding.values())
+            failed.extend(messages[sent + 1 :])
+            s._confirm_abandon()
+
+        finally:
+            s._confirm_failed = None
+
+        return failed
+
+    def _confirm_wait(s, done):
+        """
+        Service the connection until done() is true, returning False if the
+        confirm channel closes or no confirmation arrives for confirm_timeout
+        seconds.  A channel closed by the broker (for example on a missing
+        exchange) is only recorded, the confirmations simply never arrive.
+        """
+        outstanding = len(s._confirm_outstanding)
+        deadline = time.monotonic() + s.confirm_timeout
+        while not done():
+            if s.confirm_channel.is_closed:
+                return False
+            if len(s._confirm_outstanding) < outstanding:
+                outstanding = len(s._confirm_outstanding)
+                deadline = time.monotonic() + s.confirm_timeout
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            s.connection.process_data_events(time_limit=min(1, remaining))
+        return True
+
+    def _confirm_abandon(s):
+        """Drop the confirm channel, a new one is opened on next use."""
+        channel = s.confirm_channel
+        s.confirm_channel = None
+        s._confirm_outstanding = {}
+        if channel is not None and channel.is_open:
+            try:
+                channel.close()
+            except pika.exceptions.AMQPError:
+                pass
+
+    def _on_confirm(s, frame):
+        method = frame.method
+        if method.multiple:
+            tags = [tag for tag in s._confirm_outstanding if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag]
+        for tag in tags:
+            message = s._confirm_outstanding.pop(tag, None)
+            if message is not None and isinstance(method, pika.spec.Basic.Nack) and s._confirm_failed is not None:
+                s._confirm_failed.append(message)
+
+    def publish_threadsafe(s, routing_key, payload, priority=None, compress=None):
+        cb = functools.partial(s.publish, routing_key, payload, priority, compress)
         s.connection.add_callback_threadsafe(cb)
 
 
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class SharedCacheEntry:
+    """
+    A single entry retrieved from a SharedCache.
+
+    value (str|bytes): the cached data.
+    etag (str): an opaque validator for the data, suitable for use in a
+        conditional request (If-None-Match) when revalidating.
+    fetched (float): when the data was last fetched or revalidated.
+    fresh (bool): whether the entry is within the cache ttl.
+    """
+
+    def __init__(self, key, value, etag, fetched, fresh):
+        self.key = key
+        self.value = value
+        self.etag = etag
+        self.fetched = fetched
+        self.fresh = fresh
+
+
+class SharedCache:
+    """
+    A persistent, size bounded key/value cache shared between all processes
+    of this user.  Entries carry an optional validator (etag) so that stale
+    entries may be revalidated cheaply with the originating service rather
+    than refetched.
+
+    Backed by SQLite in WAL mode, this is safe for concurrent readers and
+    writers across processes.  Each thread (and each forked child) opens its
+    own connection.  Caching is always best effort; any failure to access
+    the backing store degrades to a miss, misuse of it does not.
+    """
+
+    cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "ktl.shared_cache")
+
+    def __init__(self, name, ttl=3600, max_entries=10000, path=None):
+        """
+        name (str): the name of this cache, selects the backing store.
+        ttl (int): number of seconds for which an entry is considered fresh.
+        max_entries (int): the number of entries retained, the least recently
+            fetched entries are discarded first.
+        path (str): override the backing store path.
+        """
+        if path is None:
+            path = os.path.join(self.cache_dir, name + ".sqlite3")
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.stats = {"hit": 0, "stale": 0, "miss": 0, "store": 0}
+
+        self._local = threading.local()
+
+    @property
+    def db(self):
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.db = None
+            self._local.pid = os.getpid()
+        if self._local.db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, etag TEXT, fetched REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS cache_fetched ON cache (fetched)")
+            self._local.db = db
+        return self._local.db
+
+    def count(self, what):
+        """Increment the named statistics counter."""
+        self.stats[what] = self.stats.get(what, 0) + 1
+
+    def lookup(self, key):
+        """
+        Look up key returning a SharedCacheEntry, or None if it is not
+        present.  Stale entries are returned with fresh False.
+        """
+        try:
+            row = self.db.execute("SELECT value, etag, fetched FROM cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.ProgrammingError:
+            raise
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.count("miss")
+            return None
+
+        (value, etag, fetched) = row
+        fresh = fetched + self.ttl > time.time()
+        self.count("hit" if fresh else "stale")
+        return SharedCacheEntry(key, value, etag, fetched, fresh)
+
+    def store(self, key, value, etag=None):
+        """Record value (and its validator) for key."""
+        try:
+            self.db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, etag, fetched) VALUES (?, ?, ?, ?)",
+                (key, value, etag, time.time()),
+            )
+            self.count("store")
+            if self.stats["store"] % 100 == 1:
+                self.expire()
+        except sqlite3.ProgrammingError:
+            raise
+        except sqlite3.Error:
+            pass
+
+    def touch(self, key):
+        """Mark key as freshly revalidated."""
+        try:
+            self.db.execute("UPDATE cache SET fetched = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.ProgrammingError:
+            raise
+        except sqlite3.Error:
+            pass
+
+    def delete(self, key):
+        try:
+            self.db.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.ProgrammingError:
+            raise
+        except sqlite3.Error:
+            pass
+
+    def expire(self):
+        """Discard the oldest entries to bring us back within max_entries."""
+        self.db.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY fetched DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def close(self):
+        """Close this thread's connection."""
+        if getattr(self._local, "db", None) is not None and self._local.pid == os.getpid():
+            self._local.db.close()
+        self._local.db = None
@@ -0,0 +1,133 @@
+import unittest
+from types import SimpleNamespace
+from testfixtures import (
+    TempDirectory,
+)
+
+from ktl.archive import Archive, ArchiveSnapshot
+
+
+def publication(package, version, series="jammy", pocket="Release", status="Published", created="2024-01-01"):
+    return {
+        "self_link": "https://api.launchpad.net/devel/pub/{}-{}-{}".format(package, version, series),
+        "display_name": "{} {} in {}".format(package, version, series),
+        "source_package_name": package,
+        "source_package_version": version,
+        "pocket": pocket,
+        "status": status,
+        "date_created": created + "T00:00:00+00:00",
+        "package_creator_link": "https://api.launchpad.net/devel/~creator",
+        "package_signer_link": None,
+    }
+
+
+def entry(representation):
+    return SimpleNamespace(_wadl_resource=SimpleNamespace(representation=representation))
+
+
+class FakeArchive:
+    def __init__(self, pubs):
+        self.pubs = pubs
+        self.queries = []
+
+    def getPublishedSources(self, status=None, created_since_date=None, source_name=None, exact_match=False):
+        self.queries.append((status, created_since_date, source_name))
+        for pub in self.pubs:
+            if status is not None and pub["status"] != status:
+                continue
+            if source_name is not None and pub["source_package_name"] != source_name:
+                continue
+            yield entry(pub)
+
+
+class FakeLaunchpad:
+    def __init__(self, pubs):
+        self.pubs = pubs
+        self.loads = []
+
+    def load(self, self_link):
+        self.loads.append(self_link)
+        for pub in self.pubs:
+            if pub["self_link"] == self_link:
+                return entry(pub)
+
+
+class TestArchiveSnapshot(unittest.TestCase):
+    def test_publications(self):
+        with TempDirectory() as d:
+            snapshot = ArchiveSnapshot(d.getpath("snapshot.sqlite3"))
+            snapshot.store(
+                [
+                    publication("linux", "5.15.0-1.1"),
+                    publication("linux", "5.4.0-1.1", series="focal"),
+                    publication("linux-aws", "5.15.0-1.1"),
+                ]
+            )
+
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual(
+                [pub["source_package_version"] for pub in snapshot.publications(series="jammy", package="linux")],
+                ["5.15.0-1.1"],
+            )
+            self.assertEqual(len(snapshot.publications(package="linux")), 2)
+            self.assertEqual(len(snapshot.publications(series="jammy")), 2)
+
+    def test_unsuperseded(self):
+        with TempDirectory() as d:
+            snapshot = ArchiveSnapshot(d.getpath("snapshot.sqlite3"))
+            old = publication("linux", "5.15.0-1.1", created="2024-01-01")
+            snapshot.store(
+                [
+                    old,
+                    publication("linux", "5.15.0-2.2", created="2024-01-02"),
+                    publication("linux", "5.15.0-3.3", pocket="Proposed", created="2024-01-03"),
+                ]
+            )
+
+            self.assertEqual(snapshot.unsuperseded(), [old["self_link"]])
+
+
+class TestArchiveRefresh(unittest.TestCase):
+    def refresh(self, snapshot, lp, archive, force=False):
+        Archive()._Archive__refresh(snapshot, lp, archive, ["Published"], [{}], lambda pub: True, force)
+
+    def test_incremental(self):
+        with TempDirectory() as d:
+            snapshot = ArchiveSnapshot(d.getpath("snapshot.sqlite3"))
+            pubs = [publication("linux", "5.15.0-1.1", created="2024-01-01")]
+            archive = FakeArchive(pubs)
+            lp = FakeLaunchpad(pubs)
+
+            self.refresh(snapshot, lp, archive)
+            self.assertEqual(archive.queries, [("Published", None, None)])
+
+            # A newer upload arrives and supersedes the first.
+            pubs.append(publication("linux", "5.15.0-2.2", created="2024-01-02"))
+            self.refresh(snapshot, lp, archive)
+            self.assertIsNotNone(archive.queries[-1][1])
+            self.assertEqual(lp.loads, [pubs[0]["self_link"]])
+            self.assertEqual(len(snapshot), 2)
+
+            pubs[0]["status"] = "Superseded"
+            self.refresh(snapshot, lp, archive)
+            self.assertEqual(
+                [pub["source_package_version"] for pub in snapshot.publications()],
+                ["5.15.0-2.2"],
+            )
+
+    def test_unlocked_while_listing(self):
+        with TempDirectory() as d:
+            snapshot = ArchiveSnapshot(d.getpath("snapshot.sqlite3"))
+            other = ArchiveSnapshot(d.getpath("snapshot.sqlite3"))
+            other.db.execute("PRAGMA busy_timeout = 0")
+            pubs = [publication("linux", "5.15.0-1.1")]
+
+            class ListingArchive(FakeArchive):
+                def getPublishedSources(self, **kwargs):
+                    # Another process can still write while we list.
+                    other.db.execute("BEGIN IMMEDIATE")
+                    other.db.execute("COMMIT")
+                    return super().getPublishedSources(**kwargs)
+
+            self.refresh(snapshot, FakeLaunchpad(pubs), ListingArchive(pubs))
+            self.assertEqual(len(other), 1)
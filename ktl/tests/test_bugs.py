@@ -0,0 +1,33 @@
+import unittest
+from datetime import datetime, timedelta
+
+from ktl.bugs import Bugs
+from ktl.utils import date_to_string
+
+
+class TestBugsKernelGravity(unittest.TestCase):
+    now = datetime(2024, 3, 1, 12, 0)
+
+    def test_kernel_gravity(self):
+        self.assertEqual(
+            Bugs.kernel_gravity(self.now - timedelta(days=1), self.now - timedelta(days=1), self.now), 2000
+        )
+        self.assertEqual(
+            Bugs.kernel_gravity(self.now - timedelta(days=10), self.now - timedelta(days=15), self.now), 750
+        )
+        self.assertEqual(
+            Bugs.kernel_gravity(self.now - timedelta(days=25), self.now - timedelta(days=90), self.now), 100
+        )
+        self.assertEqual(Bugs.kernel_gravity(self.now - timedelta(days=90), None, self.now), 0)
+
+    def test_bug_info_gravity(self):
+        bug_item = {
+            "date created": date_to_string(self.now - timedelta(days=20)),
+            "date last message": date_to_string(self.now - timedelta(days=3)),
+        }
+        self.assertEqual(Bugs.bug_info_gravity(bug_item, self.now), 1250)
+        # The gravity falls as the bug ages.
+        self.assertEqual(Bugs.bug_info_gravity(bug_item, self.now + timedelta(days=7)), 600)
+
+        bug_item["date last message"] = "None"
+        self.assertEqual(Bugs.bug_info_gravity(bug_item, self.now), 250)
@@ -0,0 +1,120 @@
+import os
+import subprocess
+import unittest
+from testfixtures import (
+    TempDirectory,
+)
+
+from ktl.cve_corpus import CveCorpus, CveFile
+
+
+CVE_A = """Candidate: CVE-2024-0001
+Priority: medium
+Patches_linux:
+ break-fix: - 0123456789abcdef0123456789abcdef01234567
+upstream_linux: released (6.8)
+jammy_linux: needed
+jammy_linux-aws: released (5.15.0-1001.1)
+focal_linux-gcp: DNE
+"""
+
+
+class TestCveCorpusCore(unittest.TestCase):
+    def setUp(self):
+        self.dir = TempDirectory()
+        self.snapshot_dir = CveCorpus.snapshot_dir
+        CveCorpus.snapshot_dir = self.dir.getpath("snapshot")
+        self.tracker = self.dir.makedir("active")
+
+    def tearDown(self):
+        CveCorpus.snapshot_dir = self.snapshot_dir
+        self.dir.cleanup()
+
+    def write(self, name, content, mtime=None):
+        path = os.path.join(self.tracker, name)
+        with open(path, "w") as cfd:
+            cfd.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def git(self, *args):
+        subprocess.run(
+            ["git", "-C", self.tracker, "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args),
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+
+class TestCveFile(TestCveCorpusCore):
+    def test_parse(self):
+        cve = CveFile.parse("CVE-2024-0001", CVE_A.splitlines(True))
+
+        self.assertEqual(cve.priority, "medium")
+        self.assertEqual(
+            cve.entries,
+            [
+                ("upstream", "linux", "released", "6.8"),
+                ("jammy", "linux", "needed", None),
+                ("jammy", "linux-aws", "released", "5.15.0-1001.1"),
+                ("focal", "linux-gcp", "DNE", None),
+            ],
+        )
+
+
+class TestCveCorpus(TestCveCorpusCore):
+    def test_load(self):
+        self.write("CVE-2024-0001", CVE_A)
+        self.write(".hidden", CVE_A)
+
+        corpus = CveCorpus(self.tracker)
+        self.assertEqual([cve.name for cve in corpus.files()], ["CVE-2024-0001"])
+        self.assertEqual(corpus.get("CVE-2024-0001").priority, "medium")
+        self.assertIsNone(corpus.get("CVE-2024-0002"))
+        self.assertEqual(corpus.stats["parsed"], 1)
+
+    def test_snapshot(self):
+        self.write("CVE-2024-0001", CVE_A, mtime=1000)
+        self.write("CVE-2024-0002", CVE_A, mtime=1000)
+        CveCorpus(self.tracker)
+
+        corpus = CveCorpus(self.tracker)
+        self.assertEqual(len(corpus), 2)
+        self.assertEqual(corpus.stats["parsed"], 0)
+
+        self.write("CVE-2024-0002", CVE_A.replace("medium", "high"), mtime=2000)
+        os.unlink(os.path.join(self.tracker, "CVE-2024-0001"))
+        self.write("CVE-2024-0003", CVE_A)
+        corpus = CveCorpus(self.tracker)
+        self.assertEqual([cve.name for cve in corpus.files()], ["CVE-2024-0002", "CVE-2024-0003"])
+        self.assertEqual(corpus.get("CVE-2024-0002").priority, "high")
+        self.assertEqual(corpus.stats, {"parsed": 2, "cached": 0, "removed": 1})
+
+    def test_git(self):
+        self.git("init", "-q")
+        self.write("CVE-2024-0001", CVE_A, mtime=1000)
+        self.write("CVE-2024-0002", CVE_A, mtime=1000)
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "initial")
+        CveCorpus(self.tracker)
+
+        # Unchanged files are not even examined.
+        corpus = CveCorpus(self.tracker)
+        self.assertEqual(corpus.stats, {"parsed": 0, "cached": 0, "removed": 0})
+
+        # Committed and local changes are both picked up.
+        self.write("CVE-2024-0001", CVE_A.replace("medium", "high"), mtime=2000)
+        self.git("commit", "-q", "-a", "-m", "update")
+        self.write("CVE-2024-0002", CVE_A.replace("medium", "low"), mtime=2000)
+        corpus = CveCorpus(self.tracker)
+        self.assertEqual(corpus.get("CVE-2024-0001").priority, "high")
+        self.assertEqual(corpus.get("CVE-2024-0002").priority, "low")
+        self.assertEqual(corpus.stats["parsed"], 2)
+
+        # As is reverting a local change.
+        self.git("checkout", "-q", "CVE-2024-0002")
+        corpus = CveCorpus(self.tracker)
+        self.assertEqual(corpus.get("CVE-2024-0002").priority, "medium")
+
+
+if __name__ == "__main__":
+    unittest.main()
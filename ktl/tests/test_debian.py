@@ -0,0 +1,106 @@
+import os
+import subprocess
+import unittest
+from testfixtures import (
+    TempDirectory,
+)
+
+from ktl.debian import Debian, DebianError
+
+
+CHANGELOG = """linux (5.15.0-58.64) UNRELEASED; urgency=medium
+
+  CHANGELOG: Do not edit directly. Autogenerated at release.
+
+ -- Kernel Team <kernel@example.com>  Mon, 09 Jan 2023 10:00:00 +0000
+
+linux (5.15.0-57.63) jammy; urgency=medium
+
+  * jammy/linux: 5.15.0-57.63 -proposed tracker (LP: #1997000)
+
+  [ Ubuntu: 5.15.0-57.62 ]
+
+  * Some fix (LP: #1990000)
+
+ -- Kernel Team <kernel@example.com>  Mon, 02 Jan 2023 10:00:00 +0000
+
+linux (5.15.0-56.62) jammy-security; urgency=medium
+
+  * jammy/linux: 5.15.0-56.62 -proposed tracker (LP: #1996000, #1996001)
+
+ -- Kernel Team <kernel@example.com>  Mon, 05 Dec 2022 10:00:00 +0000
+"""
+
+
+def git(directory, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"] + list(args),
+        cwd=directory,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+class TestDebianChangelogParse(unittest.TestCase):
+    def test_sections(self):
+        changelog = Debian.changelog_as_list(CHANGELOG.split("\n"))
+
+        self.assertEqual([c["version"] for c in changelog], ["5.15.0-58.64", "5.15.0-57.63", "5.15.0-56.62"])
+        self.assertEqual(changelog[1]["master"], "5.15.0-57.62")
+        self.assertEqual(changelog[1]["bugs"], {"1997000", "1990000"})
+        self.assertEqual(changelog[1]["own-bugs"], {"1997000"})
+        self.assertEqual((changelog[2]["series"], changelog[2]["pocket"]), ("jammy", "security"))
+        self.assertEqual(changelog[2]["ABI"], "56")
+
+    def test_lazy(self):
+        def lines():
+            for line in CHANGELOG.split("\n")[:6]:
+                yield line
+            raise AssertionError("read beyond the first section")
+
+        section = next(Debian.changelog_parse(lines()))
+        self.assertEqual(section["version"], "5.15.0-58.64")
+
+    def test_not_version_line(self):
+        with self.assertRaises(DebianError):
+            Debian.changelog_as_list(["not a changelog"])
+
+
+class TestDebianChangelog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TempDirectory()
+        self.cwd = os.getcwd()
+        git(self.tmp.path, "init", "-q", "-b", "master")
+        self.tmp.write("debian/changelog", CHANGELOG.encode("utf-8"))
+        git(self.tmp.path, "add", "debian/changelog")
+        git(self.tmp.path, "commit", "-q", "-m", "changelog")
+        os.chdir(self.tmp.path)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_header(self):
+        header = Debian.changelog_header()
+        self.assertEqual(header["package"], "linux")
+        self.assertEqual(header["version"], "5.15.0-58.64")
+        self.assertEqual(header["series"], "UNRELEASED")
+        self.assertNotIn("content", header)
+
+    def test_committed(self):
+        first = Debian.changelog()
+        self.assertEqual(len(first), 3)
+        self.assertEqual(first[0]["version"], "5.15.0-58.64")
+
+        # Local modifications are not seen, only the committed changelog.
+        self.tmp.write("debian/changelog", CHANGELOG.replace("58.64", "58.65").encode("utf-8"))
+        self.assertEqual(Debian.changelog()[0]["version"], "5.15.0-58.64")
+        self.assertEqual(Debian.changelog(local=True)[0]["version"], "5.15.0-58.65")
+
+        git(self.tmp.path, "commit", "-q", "-a", "-m", "update")
+        self.assertEqual(Debian.changelog()[0]["version"], "5.15.0-58.65")
+
+    def test_iter(self):
+        self.assertEqual(next(Debian.changelog_iter())["version"], "5.15.0-58.64")
+        self.assertEqual(len(list(Debian.changelog_iter(local=True))), 3)
@@ -6,6 +6,7 @@ from ktl.kernel_series import (
     KernelSeries,
     KernelSeriesCache,
     KernelSeriesEntry,
+    KernelSeriesUrl,
     KernelSourceEntry,
     KernelSourceTestingFlavourEntry,
     KernelPackageEntry,
@@ -3564,5 +3565,82 @@ class TestKernelSeriesCache(unittest.TestCase):
                     self.assertEqual(expected, url)
 
 
+class TestKernelSeriesUrl(unittest.TestCase):
+    data_yaml = """
+    '18.04':
+        codename: bionic
+        sources:
+            linux:
+                packages:
+                    linux:
+                    linux-meta:
+                        type: meta
+            linux-raspi:
+                packages:
+                    linux-raspi:
+    """
+
+    def test_entries_cached(self):
+        ks = KernelSeriesUrl(data=self.data_yaml)
+
+        series = ks.lookup_series("18.04")
+        self.assertIs(series, ks.lookup_series(codename="bionic"))
+        self.assertIs(series, ks.series[0])
+        source = series.lookup_source("linux")
+        self.assertIs(source, series.sources[0])
+        self.assertIs(source.lookup_package("linux-meta"), source.lookup_package(type="meta"))
+
+    def test_series_lookup_package(self):
+        ks = KernelSeriesUrl(data=self.data_yaml)
+
+        series = ks.lookup_series("18.04")
+        package = series.lookup_package("linux-raspi")
+        self.assertEqual(package.source.name, "linux-raspi")
+        self.assertIsNone(series.lookup_package("linux-missing"))
+
+    def test_snapshot(self):
+        with TempDirectory() as d:
+            d.write("kernel-series.yaml", self.data_yaml.encode("utf-8"))
+            url = "file://" + d.getpath("kernel-series.yaml")
+
+            with unittest.mock.patch.object(KernelSeriesUrl, "snapshot_dir", d.getpath("snapshot")):
+                ks1 = KernelSeriesUrl(url=url)
+                self.assertEqual(len(os.listdir(d.getpath("snapshot"))), 1)
+
+                with unittest.mock.patch("ktl.kernel_series.yaml.safe_load") as safe_load:
+                    ks2 = KernelSeriesUrl(url=url)
+                    safe_load.assert_not_called()
+
+                self.assertEqual(ks1._data, ks2._data)
+                self.assertEqual(ks2.lookup_series(codename="bionic").name, "18.04")
+
+                # Changed content must not hit the old snapshot.
+                d.write("kernel-series.yaml", self.data_yaml.replace("bionic", "cosmic").encode("utf-8"))
+                ks3 = KernelSeriesUrl(url=url)
+                self.assertIsNone(ks3.lookup_series(codename="bionic"))
+                self.assertEqual(len(os.listdir(d.getpath("snapshot"))), 2)
+
+    def test_snapshot_prune(self):
+        with TempDirectory() as d:
+            url = "file://" + d.getpath("kernel-series.yaml")
+
+            with unittest.mock.patch.multiple(KernelSeriesUrl, snapshot_dir=d.getpath("snapshot"), snapshot_keep=2):
+                d.write("kernel-series.yaml", self.data_yaml.encode("utf-8"))
+                KernelSeriesUrl(url=url)
+                first = os.listdir(d.getpath("snapshot"))
+                os.utime(d.getpath(["snapshot", first[0]]), (0, 0))
+                d.write("snapshot/leftover.new", b"")
+                os.utime(d.getpath("snapshot/leftover.new"), (0, 0))
+
+                for codename in ("cosmic", "disco"):
+                    d.write("kernel-series.yaml", self.data_yaml.replace("bionic", codename).encode("utf-8"))
+                    KernelSeriesUrl(url=url)
+
+                # The oldest snapshot and the stale temporary file are gone.
+                remaining = os.listdir(d.getpath("snapshot"))
+                self.assertEqual(len(remaining), 2)
+                self.assertNotIn(first[0], remaining)
+
+
 if __name__ == "__main__":
     unittest.main()
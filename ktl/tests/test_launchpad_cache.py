@@ -0,0 +1,39 @@
+import unittest
+
+from ktl.launchpad_cache import LaunchpadCacheBugs
+
+
+class FakeLaunchpad:
+    def __init__(self):
+        self.bound = []
+
+    def _bind_representation(self, url, representation):
+        self.bound.append(url)
+        return representation
+
+
+class FakeBugs:
+    def __init__(self):
+        self.lookups = []
+
+    def __getitem__(self, item):
+        self.lookups.append(item)
+        return {"id": item}
+
+
+class TestLaunchpadCacheBugs(unittest.TestCase):
+    def test_preload(self):
+        lp = FakeLaunchpad()
+        value = FakeBugs()
+        bugs = LaunchpadCacheBugs(value, lp)
+
+        bugs.preload(
+            "123", "https://api.launchpad.net/devel/bugs/123", {"id": 123, "title": "linux: <version to be filled>"}
+        )
+        self.assertEqual(bugs[123]["title"], "linux: <version to be filled>")
+        self.assertEqual(lp.bound, ["https://api.launchpad.net/devel/bugs/123"])
+        self.assertEqual(value.lookups, [])
+
+        # A preload is used once, later lookups go to Launchpad.
+        self.assertEqual(bugs[123], {"id": 123})
+        self.assertEqual(value.lookups, [123])
@@ -0,0 +1,152 @@
+import queue
+import threading
+import unittest
+from unittest import mock
+
+import pika
+
+from ktl.msgq import MsgQueue
+
+
+class TestMsgQueueCore(unittest.TestCase):
+    def mq(self, compress_threshold=None):
+        # Construct without connecting to a broker.
+        mq = MsgQueue.__new__(MsgQueue)
+        mq.connection = None
+        mq.channel = None
+        mq.confirm_channel = None
+        mq._properties = {}
+        mq.compress_threshold = compress_threshold
+        mq.executor = None
+        mq.inflight = 0
+        mq.global_prefetch = 0
+        mq.supports_global_qos = True
+        mq.exchange_name = "test"
+        mq.connection_thread = threading.get_ident()
+        return mq
+
+
+class TestMsgQueue(TestMsgQueueCore):
+    def test_properties_cached(self):
+        mq = self.mq()
+
+        properties = mq.properties(4)
+        self.assertIs(properties, mq.properties(4))
+        self.assertIsNot(properties, mq.properties(6))
+        self.assertEqual(properties.priority, 4)
+        self.assertEqual(properties.delivery_mode, 2)
+
+    def test_encode_plain(self):
+        mq = self.mq()
+
+        body, encoding = mq.encode_body({"type": "shank"})
+        self.assertIsNone(encoding)
+        self.assertEqual(mq.decode_body(mq.properties(4, encoding), body), '{"type": "shank"}')
+
+    def test_encode_compressed(self):
+        mq = self.mq(compress_threshold=16)
+
+        payload = {"type": "shank", "data": "x" * 64}
+        body, encoding = mq.encode_body(payload)
+        self.assertEqual(encoding, "gzip")
+        self.assertLess(len(body), 64)
+        self.assertEqual(mq.decode_body(mq.properties(4, encoding), body), mq.encode_body(payload, compress=False)[0])
+
+    def test_confirm_multiple(self):
+        mq = self.mq()
+        mq._confirm_outstanding = {1: "a", 2: "b", 3: "c"}
+        mq._confirm_failed = []
+
+        mq._on_confirm(pika.frame.Method(1, pika.spec.Basic.Ack(delivery_tag=2, multiple=True)))
+        self.assertEqual(list(mq._confirm_outstanding.keys()), [3])
+
+        mq._on_confirm(pika.frame.Method(1, pika.spec.Basic.Nack(delivery_tag=3)))
+        self.assertEqual(mq._confirm_outstanding, {})
+        self.assertEqual(mq._confirm_failed, ["c"])
+
+    def test_confirm_channel_closed(self):
+        mq = self.mq()
+        mq.confirm_channel = mock.Mock(is_closed=False, is_open=True)
+        mq._confirm_tag = 0
+        mq._confirm_outstanding = {}
+        mq.connection = mock.Mock()
+
+        # The broker closes the channel (say the exchange is missing), the
+        # confirms never arrive.
+        def closed(time_limit=None):
+            self.assertIsNotNone(time_limit)
+            mq.confirm_channel.is_closed = True
+
+        mq.connection.process_data_events.side_effect = closed
+        channel = mq.confirm_channel
+
+        messages = [("key", {"n": n}, 4) for n in range(3)]
+        self.assertEqual(mq.publish_batch(messages, window=2), messages)
+        self.assertIsNone(mq.confirm_channel)
+        self.assertEqual(channel._impl.basic_publish.call_count, 2)
+
+    def test_confirm_timeout(self):
+        mq = self.mq()
+        mq.confirm_timeout = 0.05
+        mq.confirm_channel = mock.Mock(is_closed=False, is_open=True)
+        mq._confirm_tag = 0
+        mq._confirm_outstanding = {}
+        mq.connection = mock.Mock()
+
+        messages = [("key", {"n": 1}, 4)]
+        self.assertEqual(mq.publish_batch(messages), messages)
+        self.assertIsNone(mq.confirm_channel)
+
+
+class TestMsgQueueWorkers(TestMsgQueueCore):
+    def test_pooled_handler(self):
+        mq = self.mq()
+        callbacks = queue.Queue()
+        mq.connection = mock.Mock()
+        mq.connection.add_callback_threadsafe.side_effect = callbacks.put
+        mq.channel = mock.Mock()
+
+        threads = []
+
+        def handler(channel, method, properties, payload):
+            threads.append(threading.get_ident())
+            return MsgQueue.REQUEUE if payload["n"] == 2 else MsgQueue.ACK
+
+        mq.listen_worker("q", "key", handler=handler, workers=2)
+        mq.channel.basic_qos.assert_called_with(prefetch_count=2, global_qos=True)
+        consume = mq.channel.basic_consume.call_args[1]["on_message_callback"]
+
+        for n in (1, 2):
+            consume(mq.channel, mock.Mock(delivery_tag=n), mq.properties(4), '{{"n": {}}}'.format(n))
+        self.assertEqual(mq.inflight, 2)
+
+        # Acks are marshalled back to the connection thread.
+        for n in (1, 2):
+            callbacks.get(timeout=5)()
+        self.assertEqual(mq.inflight, 0)
+        mq.channel.basic_ack.assert_called_once_with(1)
+        mq.channel.basic_reject.assert_called_once_with(2, requeue=True)
+        self.assertNotIn(threading.get_ident(), threads)
+
+        # A later synchronous consumer must not shrink the global window.
+        mq.listen_worker("q2", "key2", handler=handler)
+        mq.channel.basic_qos.assert_called_with(prefetch_count=2, global_qos=True)
+
+        mq.executor.shutdown()
+
+    def test_publish_other_thread(self):
+        mq = self.mq()
+        mq.connection = mock.Mock()
+        mq.channel = mock.Mock()
+
+        thread = threading.Thread(target=mq.publish, args=("key", {"type": "test"}))
+        thread.start()
+        thread.join()
+
+        mq.channel.basic_publish.assert_not_called()
+        mq.connection.add_callback_threadsafe.call_args[0][0]()
+        mq.channel.basic_publish.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
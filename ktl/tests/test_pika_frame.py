@@ -0,0 +1,112 @@
+import unittest
+
+import pika
+from pika import frame, spec
+from pika.connection import Connection
+
+
+def frames(count, channel_number=1):
+    return b"".join(frame.Method(channel_number, spec.Basic.Ack(delivery_tag=tag)).marshal() for tag in range(count))
+
+
+def message(body, channel_number=1):
+    deliver = spec.Basic.Deliver(consumer_tag="c", delivery_tag=1, exchange="", routing_key="q")
+    return (
+        frame.Method(channel_number, deliver).marshal()
+        + frame.Header(channel_number, len(body), spec.BasicProperties(content_type="text/plain")).marshal()
+        + frame.Body(channel_number, body).marshal()
+    )
+
+
+class FrameConnection:
+    # Only the receive path of a Connection, no transport.
+    _on_data_available = Connection._on_data_available
+    _read_frame = Connection._read_frame
+    _trim_frame_buffer = Connection._trim_frame_buffer
+    _compact_frame_buffer = Connection._compact_frame_buffer
+
+    def __init__(self):
+        self._frame_buffer = bytearray()
+        self._frame_offset = 0
+        self.bytes_received = 0
+        self.received = []
+
+    def _process_frame(self, frame_value):
+        self.received.append(frame_value)
+
+
+class TestDecodeFrame(unittest.TestCase):
+    def test_offsets(self):
+        data = bytearray(frames(3) + message(b"hello"))
+
+        offset = 0
+        decoded = []
+        while offset < len(data):
+            consumed, value = frame.decode_frame(data, offset)
+            self.assertGreater(consumed, 0)
+            decoded.append(value)
+            offset += consumed
+        self.assertEqual(offset, len(data))
+
+        self.assertEqual([value.method.delivery_tag for value in decoded[:3]], [0, 1, 2])
+        self.assertIsInstance(decoded[3].method, spec.Basic.Deliver)
+        self.assertEqual(decoded[4].body_size, 5)
+        self.assertEqual(decoded[4].properties.content_type, "text/plain")
+        self.assertEqual(decoded[5].fragment, b"hello")
+
+    def test_partial(self):
+        data = frames(1)
+        for end in range(len(data)):
+            self.assertEqual(frame.decode_frame(bytearray(data[:end])), (0, None))
+        self.assertEqual(frame.decode_frame(bytearray(b"xx" + data), 2)[0], len(data))
+
+    def test_bad_frame_end(self):
+        data = bytearray(frames(1))
+        data[-1] = 0
+        with self.assertRaises(pika.exceptions.InvalidFrameError):
+            frame.decode_frame(data)
+
+    def test_large_body(self):
+        body = bytes(range(256)) * (4 * 4096)
+        data = bytearray(frame.Body(1, body).marshal())
+        consumed, value = frame.decode_frame(data)
+        self.assertEqual(consumed, len(data))
+        self.assertIsInstance(value.fragment, bytes)
+        self.assertEqual(value.fragment, body)
+
+
+class TestConnectionReceive(unittest.TestCase):
+    def test_many_frames(self):
+        conn = FrameConnection()
+        data = frames(20000)
+        conn._on_data_available(data)
+        self.assertEqual(len(conn.received), 20000)
+        self.assertEqual(conn.received[-1].method.delivery_tag, 19999)
+        self.assertEqual(conn.bytes_received, len(data))
+        self.assertEqual(len(conn._frame_buffer), 0)
+
+    def test_split_reads(self):
+        conn = FrameConnection()
+        data = frames(2) + message(b"hello")
+        # Feed the stream in awkward pieces, frames straddle reads.
+        for start in range(0, len(data), 7):
+            conn._on_data_available(data[start : start + 7])
+            self.assertLess(len(conn._frame_buffer), 7 + len(data) // 2)
+        self.assertEqual(len(conn.received), 5)
+        self.assertEqual(conn.received[-1].fragment, b"hello")
+        self.assertEqual(conn.bytes_received, len(data))
+        self.assertEqual((len(conn._frame_buffer), conn._frame_offset), (0, 0))
+
+    def test_large_body_reads(self):
+        conn = FrameConnection()
+        body = bytes(range(256)) * (16 * 4096)
+        data = message(body)
+        for start in range(0, len(data), 16384):
+            conn._on_data_available(data[start : start + 16384])
+        self.assertEqual(len(conn.received), 3)
+        self.assertEqual(conn.received[-1].fragment, body)
+        self.assertEqual(len(conn._frame_buffer), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
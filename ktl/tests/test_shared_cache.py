@@ -0,0 +1,97 @@
+import sys
+import threading
+import unittest
+from testfixtures import (
+    TempDirectory,
+)
+
+from ktl.shared_cache import SharedCache
+
+
+class TestSharedCacheCore(unittest.TestCase):
+    if sys.version_info[:3] > (3, 0):
+
+        def assertItemsEqual(self, a, b):
+            return self.assertCountEqual(a, b)
+
+
+class TestSharedCache(TestSharedCacheCore):
+    def test_miss(self):
+        with TempDirectory() as d:
+            cache = SharedCache("test", path=d.getpath("test.sqlite3"))
+
+            self.assertIsNone(cache.lookup("key"))
+            self.assertEqual(cache.stats["miss"], 1)
+
+    def test_store_lookup(self):
+        with TempDirectory() as d:
+            cache = SharedCache("test", path=d.getpath("test.sqlite3"))
+            cache.store("key", "value", etag="etag")
+
+            entry = cache.lookup("key")
+            self.assertEqual(entry.value, "value")
+            self.assertEqual(entry.etag, "etag")
+            self.assertTrue(entry.fresh)
+            self.assertEqual(cache.stats["hit"], 1)
+
+    def test_shared(self):
+        with TempDirectory() as d:
+            cache_a = SharedCache("test", path=d.getpath("test.sqlite3"))
+            cache_b = SharedCache("test", path=d.getpath("test.sqlite3"))
+            cache_a.store("key", b"value")
+
+            self.assertEqual(cache_b.lookup("key").value, b"value")
+
+    def test_stale_touch(self):
+        with TempDirectory() as d:
+            cache = SharedCache("test", ttl=-1, path=d.getpath("test.sqlite3"))
+            cache.store("key", "value")
+
+            self.assertFalse(cache.lookup("key").fresh)
+            self.assertEqual(cache.stats["stale"], 1)
+
+            cache.ttl = 60
+            cache.touch("key")
+            self.assertTrue(cache.lookup("key").fresh)
+
+    def test_delete(self):
+        with TempDirectory() as d:
+            cache = SharedCache("test", path=d.getpath("test.sqlite3"))
+            cache.store("key", "value")
+            cache.delete("key")
+
+            self.assertIsNone(cache.lookup("key"))
+
+    def test_max_entries(self):
+        with TempDirectory() as d:
+            cache = SharedCache("test", max_entries=2, path=d.getpath("test.sqlite3"))
+            for key in ("a", "b", "c"):
+                cache.store(key, key)
+            cache.expire()
+
+            self.assertIsNone(cache.lookup("a"))
+            self.assertEqual(cache.lookup("c").value, "c")
+
+    def test_threads(self):
+        with TempDirectory() as d:
+            cache = SharedCache("test", path=d.getpath("test.sqlite3"))
+
+            # A worker thread opening the cache first must not break it for
+            # the main thread, nor the other way around.
+            worker = threading.Thread(target=cache.store, args=("worker", "a"))
+            worker.start()
+            worker.join()
+            cache.store("main", "b")
+
+            found = []
+            worker = threading.Thread(target=lambda: found.append(cache.lookup("main")))
+            worker.start()
+            worker.join()
+
+            self.assertEqual(cache.lookup("worker").value, "a")
+            self.assertEqual(found[0].value, "b")
+            self.assertEqual(cache.stats["miss"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
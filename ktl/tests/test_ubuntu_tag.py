@@ -459,3 +459,71 @@ class TestUbuntuTagCompare(unittest.TestCase):
         # Assert
         with self.assertRaises(ValueError):
             _ = a < b
+
+
+class TestUbuntuTagSortKey(unittest.TestCase):
+    """Test the sort key and bulk parsing"""
+
+    raw_tags = (
+        "Ubuntu-5.15.0-57.63+3",
+        "Ubuntu-5.15.0-54.60",
+        "Ubuntu-5.15.0-54.60+signed+cvm1.3",
+        "Ubuntu-5.15.0-54.60~rc1",
+        "Ubuntu-5.15.0-54.60+1",
+        "Ubuntu-5.15.0-54.60.1",
+        "Ubuntu-5.15.0-57.63",
+        "Ubuntu-5.15.0-54.60+signed+1.2",
+    )
+
+    def test_sort_key(self):
+        """Sorting by sort_key matches sorting by comparison"""
+        # Setup
+        tags = [UbuntuTag(raw_tag) for raw_tag in self.raw_tags]
+
+        # Assert
+        self.assertEqual(
+            [str(tag) for tag in sorted(tags, key=lambda tag: tag.sort_key)],
+            [str(tag) for tag in sorted(tags)],
+        )
+        self.assertEqual(
+            [str(tag) for tag in sorted(tags, key=lambda tag: tag.sort_key)],
+            [
+                "Ubuntu-5.15.0-54.60~rc1",
+                "Ubuntu-5.15.0-54.60",
+                "Ubuntu-5.15.0-54.60+1",
+                "Ubuntu-5.15.0-54.60+signed+1.2",
+                "Ubuntu-5.15.0-54.60+signed+cvm1.3",
+                "Ubuntu-5.15.0-54.60.1",
+                "Ubuntu-5.15.0-57.63",
+                "Ubuntu-5.15.0-57.63+3",
+            ],
+        )
+
+    def test_parse_many(self):
+        """Non-Ubuntu and invalid tags are skipped"""
+        # Execute
+        tags = UbuntuTag.parse_many(
+            [
+                "refs/tags/v5.15",
+                "refs/tags/Ubuntu-5.15.0-57.63",
+                "refs/tags/Ubuntu-hwe-5.17-5.17.0.1",
+                "refs/tags/Ubuntu-lowlatency-5.15.0-21.21",
+            ]
+        )
+
+        # Assert
+        self.assertEqual([tag.package for tag in tags], ["", "lowlatency"])
+
+    def test_cached(self):
+        """Repeated parses give identical results"""
+        # Setup
+        a = UbuntuTag("Ubuntu-5.15.0-54.60_20.04.1+signed+cvm1.2")
+        b = UbuntuTag("Ubuntu-5.15.0-54.60_20.04.1+signed+cvm1.2")
+
+        # Assert
+        self.assertEqual(repr(a), repr(b))
+        self.assertEqual(a, b)
+        with self.assertRaises(ValueError):
+            UbuntuTag("Ubuntu-hwe-5.17-5.17.0-1")
+        with self.assertRaises(ValueError):
+            UbuntuTag("Ubuntu-hwe-5.17-5.17.0-1")
@@ -14,9 +14,12 @@ if LIBDIR not in sys.path:
 
 from ktl.workflow import Workflow, DefaultAssigneeMissing
 from ktl.kernel_series import KernelSeries
+from ktl.launchpad_cache import LaunchpadCache
 from lpltk.LaunchpadService import LaunchpadService
 from lpltk.bug import Bug
+from concurrent.futures import ThreadPoolExecutor
 import re
+import threading
 import yaml
 
 from ktl.log import cdebug, cinfo, cerror, cwarn, center, cleave
@@ -873,6 +876,9 @@ class TrackingBugs:
 
     __tbd = TrackingBugDefines()
 
+    # The number of bugs fetched concurrently by load().
+    load_workers = 8
+
     def __add_to_set(s, new_tb):
         """
         Internal helper to add a tracking bug object into the set and update
@@ -920,6 +926,7 @@ class TrackingBugs:
         try:
             defaults = {
                 "launchpad_client_name": "trackingbugs-library",
+                "launchpad_class": LaunchpadCache,
             }
             s.__lps = LaunchpadService(defaults)
         except LaunchpadServiceError as e:
@@ -928,6 +935,7 @@ class TrackingBugs:
 
         s.__ks = KernelSeries()
         s.__wf = Workflow()
+        s.__local = threading.local()
         s.__idx_pkg_by_series = {}
         s.__tbs = {}
         s.project = wf_project_name
@@ -1053,34 +1061,85 @@ class TrackingBugs:
         cleave(s.__class__.__name__ + ".add")
         return tb
 
-    def load(s, series_filter=[], tag_filter=[], debug=False):
+    __valid_states = [
+        "New",
+        "Confirmed",
+        "Triaged",
+        "In Progress",
+        "Incomplete",
+        "Fix Committed",
+        "Fix Released",
+        "Invalid",
+    ]
+
+    def __search(s, search_tag, series_filter):
         """
-        Load a set of tracking bugs from Launchpad which match
-        the given filters (default all live tracking bugs).
+        Internal helper returning the IDs of the tracking bugs with any of
+        the given tags and (optionally) targeted at one of the series,
+        in search order.
+        """
+        lp = s.__lps.launchpad
+        if len(series_filter) > 0:
+            # Search only the series we are interested in, plus the
+            # workflow project for the snap-debs tasks which carry their
+            # series in the title.
+            ubuntu = lp.distributions["ubuntu"]
+            targets = [ubuntu.getSeries(name_or_version=series) for series in series_filter]
+            targets.append(lp.projects[TRACKINGBUG_DEFAULT_PROJECT])
+        else:
+            targets = [lp.bugs]
+
+        bug_ids = {}
+        for target in targets:
+            for task in target.searchTasks(tags=search_tag, status=s.__valid_states):
+                tlink = task.target_link
+                # Is this a snap-debs task in that case the series is part of the title.
+                # To make things not that easy the tasks.title is something in the form:
+                #  'Bug #[0-9]+ in Kernel SRU Workflow: "<series>/<source>: ..."'
+                if "snap-debs" in task.title and tlink.endswith("kernel-sru-workflow"):
+                    series = task.title.split('"')[1].split(":")[0].split("/")[0]
+                    if len(series_filter) > 0 and series not in series_filter:
+                        continue
+                    bug_ids[int(task.self_link.split("/")[-1])] = True
+                    continue
 
-        :param series_filter: List of series (codenames of releases)
-            for which tracking bug data should get loaded.
-        :type  series_filter: []
+                # Only interested in the <package> tasks in the ubuntu project
+                # because that has info about the target series codename.
+                if "/ubuntu/" not in tlink:
+                    continue
+                if "/ubuntu/+source/" in tlink:
+                    continue
+                series = tlink.partition("/+source/")[0].split("/")[-1]
+                if len(series_filter) > 0:
+                    if series not in series_filter:
+                        continue
+                bug_ids[int(task.self_link.split("/")[-1])] = True
 
-        :param tag_filter: List of tags to be used in the Launchpad
-            task search (instead of the live tracking bug tag).
-        :type  tag_filter: []
+        return list(bug_ids)
 
-        :param debug: Print status info while working on the task.
-        :type  debug: Bool()
+    def __fetch(s, bug_id):
         """
-        center(s.__class__.__name__ + ".load")
+        Internal helper run on the load() workers. Fetches the bug using
+        a Launchpad connection private to this thread (launchpadlib is not
+        thread safe) and returns its representation.
+        """
+        lps = getattr(s.__local, "lps", None)
+        if lps is None:
+            lps = s.__local.lps = LaunchpadService(s.__lps.config)
+        lpbug = lps.launchpad.bugs[bug_id]
+        return (lpbug.self_link, lpbug._wadl_resource.representation)
 
-        valid_states = [
-            "New",
-            "Confirmed",
-            "Triaged",
-            "In Progress",
-            "Incomplete",
-            "Fix Committed",
-            "Fix Released",
-            "Invalid",
-        ]
+    def iter_load(s, series_filter=[], tag_filter=[], debug=False):
+        """
+        Load a set of tracking bugs from Launchpad which match the given
+        filters (default all live tracking bugs), yielding each tracking
+        bug as it is added. The bugs are fetched concurrently in the
+        background so that callers may start work on the first of them
+        immediately.
+
+        Takes the same arguments as load().
+        """
+        center(s.__class__.__name__ + ".iter_load")
 
         if len(tag_filter) > 0:
             search_tag = tag_filter
@@ -1090,51 +1149,58 @@ class TrackingBugs:
             else:
                 search_tag = s.__tbd.tag_names["default"]["valid"]
 
-        tasks = s.__lps.launchpad.bugs.searchTasks(tags=search_tag)
-
-        bug_ids = []
-        for task in tasks:
-            if task.status not in valid_states:
-                continue
-            tlink = task.target_link
-            # Is this a snap-debs task in that case the series is part of the title.
-            # To make things not that easy the tasks.title is something in the form:
-            #  'Bug #[0-9]+ in Kernel SRU Workflow: "<series>/<source>: ..."'
-            if "snap-debs" in task.title and tlink.endswith("kernel-sru-workflow"):
-                series = task.title.split('"')[1].split(":")[0].split("/")[0]
-                if len(series_filter) > 0 and series not in series_filter:
-                    continue
-                bug_ids.append(task.self_link.split("/")[-1])
-                continue
-
-            # Only interested in the <package> tasks in the ubuntu project
-            # because that has info about the target series codename.
-            if "/ubuntu/" not in tlink:
-                continue
-            if "/ubuntu/+source/" in tlink:
-                continue
-            series = tlink.partition("/+source/")[0].split("/")[-1]
-            if len(series_filter) > 0:
-                if series not in series_filter:
-                    continue
-            bug_ids.append(task.self_link.split("/")[-1])
+        bug_ids = s.__search(search_tag, series_filter)
 
         if debug:
             print("Gathering details for %i tracking bugs" % len(bug_ids))
 
         cnt = 0
-        for bug_id in bug_ids:
+        with ThreadPoolExecutor(max_workers=s.load_workers) as executor:
+            pending = [(bug_id, executor.submit(s.__fetch, bug_id)) for bug_id in bug_ids if bug_id not in s.__tbs]
             try:
-                s.add(bug_id)
-                cnt = cnt + 1
-                if debug:
-                    print("\rInstantiating bugs... %i" % cnt, end="", flush=True)
-            except TrackingBugError as e:
-                cerror("LP: #%i: %s (skipped)" % (bug_id, e.msg))
-                pass
+                for bug_id, future in pending:
+                    (url, representation) = future.result()
+                    # Masters are added along with their derivatives so
+                    # may already be present.
+                    if bug_id in s.__tbs:
+                        continue
+                    s.__lps.launchpad.bugs.preload(bug_id, url, representation)
+                    try:
+                        tb = s.add(bug_id)
+                        cnt = cnt + 1
+                        if debug:
+                            print("\rInstantiating bugs... %i" % cnt, end="", flush=True)
+                    except TrackingBugError as e:
+                        cerror("LP: #%i: %s (skipped)" % (bug_id, e.msg))
+                        continue
+                    yield tb
+            finally:
+                for bug_id, future in pending:
+                    future.cancel()
         if debug:
             print("")
 
+        cleave(s.__class__.__name__ + ".iter_load")
+
+    def load(s, series_filter=[], tag_filter=[], debug=False):
+        """
+        Load a set of tracking bugs from Launchpad which match
+        the given filters (default all live tracking bugs).
+
+        :param series_filter: List of series (codenames of releases)
+            for which tracking bug data should get loaded.
+        :type  series_filter: []
+
+        :param tag_filter: List of tags to be used in the Launchpad
+            task search (instead of the live tracking bug tag).
+        :type  tag_filter: []
+
+        :param debug: Print status info while working on the task.
+        :type  debug: Bool()
+        """
+        center(s.__class__.__name__ + ".load")
+        for tb in s.iter_load(series_filter=series_filter, tag_filter=tag_filter, debug=debug):
+            pass
         cleave(s.__class__.__name__ + ".load")
         return s
 
@@ -7,11 +7,9 @@ A canonical representation for git tags as used by Ubuntu kernel releases.
 
 import json
 import re
+import string
 from abc import abstractmethod
-from typing import Any, List, Tuple
-import apt_pkg
-
-apt_pkg.init()
+from typing import Any, Iterable, List, Tuple
 
 
 def _group_nth_int_get(match: re.match, group: int, default: Any = 0, raise_value_error: bool = False):
@@ -31,6 +29,53 @@ def _group_nth_int_get(match: re.match, group: int, default: Any = 0, raise_valu
         return default
 
 
+_RE_VERSION_PART = re.compile(r"(\D*)(\d*)")
+_VERSION_PART_END = ((0,), 0)
+
+
+def _version_char_order(char: str) -> int:
+    """Debian ordering of a non-digit version character: ~ before the end
+    of the string, before letters, before everything else.
+    """
+    if char == "~":
+        return -1
+    if char in string.ascii_letters:
+        return ord(char)
+    return ord(char) + 256
+
+
+def _version_part_key(value: str) -> Tuple:
+    """Returns a tuple which orders as dpkg orders upstream versions (or
+    revisions) by splitting value into alternating non-digit and digit runs.
+    A trailing end marker makes a shorter version order correctly against
+    one which continues with ~ or anything else.
+    """
+    key = []
+    for nondigits, digits in _RE_VERSION_PART.findall(value):
+        if not nondigits and not digits:
+            continue
+        key.append((tuple(_version_char_order(char) for char in nondigits) + (0,), int(digits) if digits else 0))
+    if not key:
+        key.append(_VERSION_PART_END)
+    key.append(_VERSION_PART_END)
+    return tuple(key)
+
+
+def _debian_version_key(version: str) -> Tuple:
+    """Returns a sort key for a Debian version string, comparing as
+    apt_pkg.version_compare() would.
+    :param version: [epoch:]upstream[-revision]
+    """
+    epoch = 0
+    if ":" in version:
+        epoch, version = version.split(":", 1)
+        epoch = int(epoch or 0)
+    upstream, sep, revision = version.rpartition("-")
+    if not sep:
+        upstream, revision = version, ""
+    return (epoch, _version_part_key(upstream), _version_part_key(revision))
+
+
 class _Comparable:
     @abstractmethod
     def compare(self, other: object):
@@ -188,6 +233,10 @@ class UbuntuTag(_Comparable):
 
     .. note:: Versions do not reflect semver semantics
 
+    Parsing is cached per raw tag so repeatedly parsing the tags of a tree is
+    cheap. To sort large numbers of tags use the :py:attr: `sort_key` property
+    as the sort key.
+
     :param raw_tag: Git tag to parse
     :raises ValueError: When tag is invalid. Use :py:meth: `UbuntuTag.from_str` to allow parsing to silently fail.
     """
@@ -238,16 +287,32 @@ class UbuntuTag(_Comparable):
         re.VERBOSE | re.IGNORECASE,
     )
 
+    PREFIX = "Ubuntu-"
+
+    # The parsed fields (or the parse error) of every raw tag seen.
+    _parse_cache = {}
+
     def __init__(self, raw_tag: str):
         self._raw_tag = raw_tag
-        self._package: str = ""
-        self._kernel_version: Version = Version(0, 0, 0)
-        self._ubuntu_version: Version = Version(0, 0, 0)
-        self._series: str = ""
-        self._extra: str = ""
-        self._respin_version: Version = Version(0, 0, 0)
-        self._raw_version: str = ""
-        self._parse()
+        parsed = self._parse_cache.get(raw_tag)
+        if parsed is None:
+            self._package: str = ""
+            self._kernel_version: Version = Version(0, 0, 0)
+            self._ubuntu_version: Version = Version(0, 0, 0)
+            self._series: str = ""
+            self._extra: str = ""
+            self._respin_version: Version = Version(0, 0, 0)
+            self._raw_version: str = ""
+            try:
+                self._parse()
+                self._version_key = _debian_version_key(self._raw_version)
+                parsed = dict(self.__dict__)
+            except ValueError as ex:
+                parsed = str(ex)
+            self._parse_cache[raw_tag] = parsed
+        if isinstance(parsed, str):
+            raise ValueError(parsed)
+        self.__dict__.update(parsed)
 
     @staticmethod
     def from_str(value: str, raise_on_error=False) -> "UbuntuTag":
@@ -265,12 +330,28 @@ class UbuntuTag(_Comparable):
                 raise
         return result
 
+    @staticmethod
+    def parse_many(raw_tags: Iterable[str]) -> List["UbuntuTag"]:
+        """Helper for creating UbuntuTags from a list of Git tags, such as the
+        output of git tag -l or git ls-remote. Anything which is not a valid
+        Ubuntu tag is skipped.
+        :param raw_tags: Raw values to parse
+        """
+        result = []
+        for raw_tag in raw_tags:
+            if not raw_tag.rpartition("/")[2].startswith(UbuntuTag.PREFIX):
+                continue
+            tag = UbuntuTag.from_str(raw_tag)
+            if tag is not None:
+                result.append(tag)
+        return result
+
     @property
     def prefix(self) -> str:
         """
         :returns: Expected tag prefix
         """
-        return "Ubuntu-"
+        return self.PREFIX
 
     @property
     def raw_tag(self) -> str:
@@ -353,6 +434,14 @@ class UbuntuTag(_Comparable):
         """
         return self._respin_version
 
+    @property
+    def sort_key(self) -> Tuple:
+        """A key ordering tags by package and then version. Within a package
+        this orders exactly as :py:meth: `compare`.
+        :returns: Tuple suitable as a sort key
+        """
+        return (self._package, self._version_key)
+
     def can_compare(self, other: object) -> bool:
         """Returns True if other is comparable to this"""
         result = True
@@ -382,13 +471,7 @@ class UbuntuTag(_Comparable):
                 + "Compare ubuntu_version properties directly if you know what you're doing."
             )
 
-        ret = None
-        if other is None:
-            ret = 1
-        elif self.raw_tag == other.raw_tag:
-            ret = 0
-
-        return apt_pkg.version_compare(self.version, other.version)
+        return (self._version_key > other._version_key) - (self._version_key < other._version_key)
 
     def _parse(self):
         """Parse self into fields
@@ -73,6 +73,7 @@ class LaunchpadService:
         self.config['bot']                     = False
         self.config['read_only']               = False        # FIXME: 'read_only' doesn't seem very descriptive here.
         self.config['launchpad_version']       = 'devel'
+        self.config['launchpad_class']         = Launchpad    # or a subclass such as ktl.launchpad_cache.LaunchpadCache
 
         # The configuration dictionary which is ~/.lpltkrc will override the
         # default configuration parameters.
@@ -132,12 +133,12 @@ class LaunchpadService:
 
         try:
             if self.config['read_only']:
-                self.launchpad = Launchpad.login_anonymously(
+                self.launchpad = self.config['launchpad_class'].login_anonymously(
                     self.config['launchpad_client_name'],
                     service_root=self.config['launchpad_services_root'],
                     version=self.config['launchpad_version'])
             else:
-                self.launchpad = Launchpad.login_with(
+                self.launchpad = self.config['launchpad_class'].login_with(
                     self.config['launchpad_client_name'],
                     service_root=self.config['launchpad_services_root'],
                     launchpadlib_dir=self.config['launchpad_cachedir'],
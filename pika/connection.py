@@ -1111,7 +1111,8 @@ class Connection(pika.compat.AbstractBase):
         self.server_properties = None
 
         # Inbound buffer for decoding frames
-        self._frame_buffer = bytes()
+        self._frame_buffer = bytearray()
+        self._frame_offset = 0
 
         # Dict of open channels
         self._channels = dict()
@@ -1944,13 +1945,15 @@ class Connection(pika.compat.AbstractBase):
         """
         self._frame_buffer += data_in
 
-        while self._frame_buffer:
+        while self._frame_offset < len(self._frame_buffer):
             consumed_count, frame_value = self._read_frame()
             if not frame_value:
-                return
+                break
             self._trim_frame_buffer(consumed_count)
             self._process_frame(frame_value)
 
+        self._compact_frame_buffer()
+
     def _terminate_stream(self, error):
         """Deactivate heartbeat instance if activated already, and initiate
         termination of the stream (TCP) connection asynchronously.
@@ -2123,7 +2126,7 @@ class Connection(pika.compat.AbstractBase):
         :rtype tuple: (int, pika.frame.Frame)
 
         """
-        return frame.decode_frame(self._frame_buffer)
+        return frame.decode_frame(self._frame_buffer, self._frame_offset)
 
     def _remove_callbacks(self, channel_number, method_classes):
         """Remove the callbacks for the specified channel number and list of
@@ -2296,9 +2299,19 @@ class Connection(pika.compat.AbstractBase):
         :param int byte_count: The number of bytes consumed
 
         """
-        self._frame_buffer = self._frame_buffer[byte_count:]
+        self._frame_offset += byte_count
         self.bytes_received += byte_count
 
+    def _compact_frame_buffer(self):
+        """Discard the consumed leading portion of the frame buffer. This is
+        done once per read rather than per frame so that a read containing
+        many frames does not repeatedly copy the remainder of the buffer.
+
+        """
+        if self._frame_offset:
+            del self._frame_buffer[:self._frame_offset]
+            self._frame_offset = 0
+
     def _output_marshaled_frames(self, marshaled_frames):
         """Output list of marshaled frames to buffer and update stats
 
@@ -9,6 +9,9 @@ from pika.compat import byte
 
 LOGGER = logging.getLogger(__name__)
 
+# Payload size above which decode_frame copies the payload out via a view.
+_DECODE_VIEW_MIN = 4096
+
 
 class Frame(amqp_object.AMQPObject):
     """Base Frame object mapping. Defines a behavior for all child classes for
@@ -185,27 +188,33 @@ class ProtocolHeader(amqp_object.AMQPObject):
                                      self.revision)
 
 
-def decode_frame(data_in): # pylint: disable=R0911,R0914
+def decode_frame(data_in, offset=0): # pylint: disable=R0911,R0914
     """Receives raw socket data and attempts to turn it into a frame.
     Returns bytes used to make the frame and the frame
 
-    :param str data_in: The raw data stream
+    The frame is decoded in place starting at offset, allowing a receive
+    buffer holding many frames to be consumed without re-slicing it.  Only
+    the frame payload is copied out.
+
+    :param bytes|bytearray|memoryview data_in: The raw data stream
+    :param int offset: The offset in data_in at which the frame starts
     :rtype: tuple(bytes consumed, frame)
     :raises: pika.exceptions.InvalidFrameError
 
     """
     # Look to see if it's a protocol header frame
     try:
-        if data_in[0:4] == b'AMQP':
-            major, minor, revision = struct.unpack_from('BBB', data_in, 5)
+        if data_in[offset:offset + 4] == b'AMQP':
+            major, minor, revision = struct.unpack_from('BBB', data_in,
+                                                        offset + 5)
             return 8, ProtocolHeader(major, minor, revision)
     except (IndexError, struct.error):
         return 0, None
 
     # Get the Frame Type, Channel Number and Frame Size
     try:
-        (frame_type, channel_number, frame_size) = struct.unpack(
-            '>BHL', data_in[0:7])
+        (frame_type, channel_number, frame_size) = struct.unpack_from(
+            '>BHL', data_in, offset)
     except struct.error:
         return 0, None
 
@@ -213,15 +222,23 @@ def decode_frame(data_in): # pylint: disable=R0911,R0914
     frame_end = spec.FRAME_HEADER_SIZE + frame_size + spec.FRAME_END_SIZE
 
     # We don't have all of the frame yet
-    if frame_end > len(data_in):
+    if offset + frame_end > len(data_in):
         return 0, None
 
     # The Frame termination chr is wrong
-    if data_in[frame_end - 1:frame_end] != byte(spec.FRAME_END):
+    if data_in[offset + frame_end - 1:offset + frame_end] != byte(
+            spec.FRAME_END):
         raise exceptions.InvalidFrameError("Invalid FRAME_END marker")
 
-    # Get the raw frame data
-    frame_data = data_in[spec.FRAME_HEADER_SIZE:frame_end - 1]
+    # Get the raw frame data.  Large payloads are copied directly out of
+    # the stream via a view, for small ones creating the view costs more
+    # than the extra copy.
+    data_start = offset + spec.FRAME_HEADER_SIZE
+    data_end = offset + frame_end - 1
+    if frame_size < _DECODE_VIEW_MIN:
+        frame_data = bytes(data_in[data_start:data_end])
+    else:
+        frame_data = bytes(memoryview(data_in)[data_start:data_end])
 
     if frame_type == spec.FRAME_METHOD:
 
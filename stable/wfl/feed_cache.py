@@ -0,0 +1,113 @@
+#
+# feed_cache -- on-disk copies of remote JSON feeds, revalidated on use
+#
+from email.utils                        import formatdate
+import hashlib
+import json
+import os
+import tempfile
+import time
+from urllib.error                       import HTTPError
+from urllib.request                     import Request, urlopen
+
+from .log                               import cdebug
+
+
+# FeedCache
+#
+class FeedCache:
+    '''
+    Keep an on-disk copy of each remote feed shared by all processes.  A
+    copy younger than max_age seconds is used as is, an older one is
+    revalidated against the server using its ETag and Last-Modified and
+    only downloaded again if it has changed.
+
+    Fetch failures are raised exactly as urlopen() would raise them so that
+    callers retain their existing error handling.
+    '''
+    path = os.path.join(os.path.expanduser('~'), '.cache', 'kernel-swm', 'feeds')
+    max_age = 60
+
+    # __init__
+    #
+    def __init__(self, path=None, max_age=None):
+        if path is not None:
+            self.path = path
+        if max_age is not None:
+            self.max_age = max_age
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.path, key)
+        return (base + '.data', base + '.meta')
+
+    def _load(self, url):
+        (data_path, meta_path) = self._paths(url)
+        try:
+            with open(meta_path) as mfd:
+                meta = json.load(mfd)
+            with open(data_path, 'rb') as dfd:
+                data = dfd.read()
+        except (OSError, ValueError):
+            return (None, None)
+        if meta.get('url') != url:
+            return (None, None)
+        return (meta, data)
+
+    def _write(self, path, data):
+        with tempfile.NamedTemporaryFile(dir=self.path, suffix='.new', delete=False) as tfd:
+            tfd.write(data)
+        os.rename(tfd.name, path)
+
+    def _save(self, url, meta, data=None):
+        (data_path, meta_path) = self._paths(url)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            if data is not None:
+                self._write(data_path, data)
+            self._write(meta_path, json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            cdebug("FeedCache: unable to save {} -- {}".format(url, str(e)))
+
+    def fetch(self, url, headers=None, timeout=None):
+        '''
+        Return the body of url, from our copy where it is still current.
+        '''
+        (meta, data) = self._load(url)
+        now = time.time()
+        if meta is not None and now - meta.get('checked', 0) < self.max_age:
+            cdebug("FeedCache: {} fresh".format(url))
+            return data
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get('etag') is not None:
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last-modified') is not None:
+                request_headers['If-Modified-Since'] = meta['last-modified']
+            elif meta.get('fetched') is not None:
+                request_headers['If-Modified-Since'] = formatdate(meta['fetched'], usegmt=True)
+
+        kwargs = {} if timeout is None else {'timeout': timeout}
+        try:
+            with urlopen(Request(url, headers=request_headers, method='GET'), **kwargs) as response:
+                body = response.read()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except HTTPError as e:
+            if e.code != 304 or meta is None:
+                raise
+            cdebug("FeedCache: {} not modified".format(url))
+            meta['checked'] = now
+            self._save(url, meta)
+            return data
+
+        cdebug("FeedCache: {} fetched".format(url))
+        self._save(url, {
+            'url': url,
+            'etag': etag,
+            'last-modified': last_modified,
+            'fetched': now,
+            'checked': now,
+        }, body)
+        return body
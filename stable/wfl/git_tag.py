@@ -1,4 +1,10 @@
+from bisect                     import bisect_left
+from fnmatch                    import fnmatchcase
+import json
+import os
 import re
+import sqlite3
+import time
 
 from subprocess                 import Popen, PIPE, run
 
@@ -32,15 +38,6 @@ def __init__(self, package, version, sloppy=None):
         self._present = False
 
         if package.repo is not None and package.repo.url is not None:
-            remote = GitRemote(package.repo.url)
-
-            try:
-                self._refs = remote.refs
-                self._verifiable = True
-            except GitTagError as e:
-                self._refs = {}
-                cdebug("GitTag: remote lookup failed -- {}".format(str(e)))
-
             tag_prefix = 'Ubuntu{}-'.format(
                 package.source.name.replace('linux', ''))
             version_encoded = version.replace('~', '_')
@@ -52,16 +49,29 @@ def __init__(self, package, version, sloppy=None):
             # years.
             prefixes = [tag_prefix]
             if '-edge' in tag_prefix:
-                prefixes.append(tag.replace('-edge', ''))
+                prefixes.append(tag_prefix.replace('-edge', ''))
             if '-lts-' in tag_prefix:
                 prefixes.append('Ubuntu-lts-')
+            prefixes = ['refs/tags/' + tag_prefix for tag_prefix in prefixes]
+
+            # We only need to know about tags with these prefixes.
+            remote = GitRemote(package.repo.url,
+                patterns=[tag_prefix + '*' for tag_prefix in prefixes])
+
+            try:
+                self._refs = remote.index
+                self._verifiable = True
+            except GitTagError as e:
+                self._refs = GitRefIndex({})
+                cdebug("GitTag: remote lookup failed -- {}".format(str(e)))
+
             for tag_prefix in prefixes:
-                tag_prefix = 'refs/tags/' + tag_prefix
                 tag = '{}{}'.format(tag_prefix, version_encoded)
                 found = None
-                for ref in self._refs:
-                    if ref == tag or (sloppy is not None and ref.startswith(tag + sloppy)):
-                        found = ref
+                if sloppy is not None:
+                    found = self._refs.last(tag + sloppy)
+                if found is None and tag in self._refs:
+                    found = tag
                 if found:
                     self._present = True
                     self.version = found[len(tag_prefix):].replace('_', '~')
@@ -78,30 +88,177 @@ def present(self):
         return self._present
 
 
+# GitRefIndex
+#
+class GitRefIndex:
+    '''
+    A sorted index over a set of refs allowing exact and prefix lookups
+    without scanning every ref.
+    '''
+    # __init__
+    #
+    def __init__(self, refs):
+        self.refs = refs
+        self.names = sorted(refs)
+
+    def __contains__(self, name):
+        return name in self.refs
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefixed(self, prefix):
+        '''
+        Return the names of all refs starting with prefix in sorted order.
+        '''
+        start = bisect_left(self.names, prefix)
+        end = start
+        while end < len(self.names) and self.names[end].startswith(prefix):
+            end += 1
+        return self.names[start:end]
+
+    def last(self, prefix):
+        '''
+        Return the highest sorting ref starting with prefix, or None.
+        '''
+        names = self.prefixed(prefix)
+        return names[-1] if names else None
+
+
+# GitRefCache
+#
+class GitRefCache:
+    '''
+    Remote ref listings shared between processes, keyed by repository url
+    and the ls-remote patterns used.  A listing is only used for ttl seconds
+    after it was taken.  A full listing of a repository will also satisfy
+    any patterned lookup of it.
+    '''
+    path = os.path.join(os.path.expanduser('~'), '.cache', 'kernel-swm', 'git-refs.db')
+    ttl = 300
+
+    _shared = None
+
+    # __init__
+    #
+    def __init__(self, path=None, ttl=None):
+        if path is not None:
+            self.path = path
+        if ttl is not None:
+            self.ttl = ttl
+        self.pid = os.getpid()
+        self.db = None
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('PRAGMA synchronous=NORMAL')
+            self.db.execute('''CREATE TABLE IF NOT EXISTS listing (
+                url         TEXT NOT NULL,
+                patterns    TEXT NOT NULL,
+                fetched     REAL NOT NULL,
+                data        TEXT NOT NULL,
+                PRIMARY KEY (url, patterns)
+            )''')
+        except (OSError, sqlite3.Error) as e:
+            cdebug("GitRefCache: cache unavailable -- {}".format(str(e)))
+            self.db = None
+
+    @classmethod
+    def shared(cls):
+        '''
+        Return the cache instance for this process.
+        '''
+        if cls._shared is None or cls._shared.pid != os.getpid():
+            cls._shared = cls()
+        return cls._shared
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def lookup(self, url, patterns):
+        '''
+        Return the fresh (ref, hash) pairs for url matching patterns, or
+        None.
+        '''
+        if self.db is None:
+            return None
+        key = ' '.join(patterns)
+        try:
+            rows = self.db.execute(
+                'SELECT patterns, data FROM listing WHERE url = ? AND patterns IN (?, ?) AND fetched >= ?',
+                (url, key, '', time.time() - self.ttl)).fetchall()
+        except sqlite3.Error as e:
+            cdebug("GitRefCache: lookup failed -- {}".format(str(e)))
+            return None
+        # Prefer the matching listing, else filter the full listing.
+        rows.sort(key=lambda row: row[0] != key)
+        for (row_patterns, data) in rows:
+            pairs = json.loads(data)
+            if row_patterns != key:
+                pairs = [(ref, sha) for (ref, sha) in pairs
+                    if any(fnmatchcase(ref, pattern) for pattern in patterns)]
+            return pairs
+        return None
+
+    def store(self, url, patterns, pairs):
+        if self.db is None:
+            return
+        try:
+            self.db.execute('INSERT OR REPLACE INTO listing (url, patterns, fetched, data) VALUES (?, ?, ?, ?)',
+                (url, ' '.join(patterns), time.time(), json.dumps(pairs, separators=(',', ':'))))
+        except sqlite3.Error as e:
+            cdebug("GitRefCache: store failed -- {}".format(str(e)))
+
+
 # GitRemoteDirect
 #
 class GitRemoteDirect:
 
     # __init__
     #
-    def __init__(self, url):
+    def __init__(self, url, patterns=None, cache=None):
         center(self.__class__.__name__ + '.__init__')
 
         self.url = url
+        self.patterns = list(patterns) if patterns else []
+        self.cache = cache
         self._refs = None
         self._hashes = None
+        self._index = None
 
         cleave(self.__class__.__name__ + '.__init__')
 
     def cache_refs(self, url):
         center(self.__class__.__name__ + '.cache_refs')
         cdebug('url     : {}'.format(url))
+        cdebug('patterns: {}'.format(self.patterns))
+
+        cache = self.cache if self.cache is not None else GitRefCache.shared()
+        pairs = cache.lookup(url, self.patterns)
+        if pairs is None:
+            pairs = self.ls_remote(url)
+            cache.store(url, self.patterns, pairs)
 
-        cmd = ['git', 'ls-remote', url]
-        #print('  CMD: ' + ' '.join(cmd))
-        proc = Popen(cmd, stdout=PIPE, stderr=PIPE)
         refs = {}
         hashes = {}
+        for (ref, sha) in pairs:
+            refs[ref] = sha
+            hashes[sha] = ref
+
+        self._refs = refs
+        self._hashes = hashes
+        self._index = None
+        cleave(self.__class__.__name__ + '.cache_refs')
+
+    def ls_remote(self, url):
+        cmd = ['git', 'ls-remote', url] + self.patterns
+        #print('  CMD: ' + ' '.join(cmd))
+        proc = Popen(cmd, stdout=PIPE, stderr=PIPE)
+        pairs = []
         for entry in proc.stdout:
             bits = entry.decode('utf-8').split()
             if bits[1] == 'HEAD':
@@ -110,15 +267,12 @@ def cache_refs(self, url):
             # peeled tags.
             if bits[1].endswith('^{}'):
                 bits[1] = bits[1][:-3]
-            refs[bits[1]] = bits[0]
-            hashes[bits[0]] = bits[1]
+            pairs.append((bits[1], bits[0]))
         retcode = proc.wait()
         if retcode != 0:
             raise GitTagError(proc.stderr.read().decode('utf-8').strip())
 
-        self._refs = refs
-        self._hashes = hashes
-        cleave(self.__class__.__name__ + '.cache_refs')
+        return pairs
 
     @property
     def refs(self):
@@ -132,6 +286,12 @@ def hashes(self):
             self.cache_refs(self.url)
         return self._hashes
 
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = GitRefIndex(self.refs)
+        return self._index
+
 
 # GitRemoteLaunchpad
 #
@@ -183,10 +343,10 @@ def hashes(self):
 
 class GitRemote:
 
-    def __new__(cls, url):
+    def __new__(cls, url, patterns=None):
         #if '//git.launchpad.net/~' in url:
         #    return GitRemoteLaunchpad(url, ctx.lp)
-        return GitRemoteDirect(url)
+        return GitRemoteDirect(url, patterns=patterns)
 
 
 class GitTagsSnap:
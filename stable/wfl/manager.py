@@ -5,7 +5,6 @@
 from copy                               import copy
 from datetime                           import datetime
 from fcntl                              import lockf, LOCK_EX, LOCK_NB, LOCK_UN
-import json
 import os
 import yaml
 
@@ -21,6 +20,7 @@
 from .bug                               import WorkflowBug, WorkflowBugError, WorkflowBugTaskError
 from .package                           import PackageError, SeriesLookupFailure
 from .snap                              import SnapError
+from .status_store                      import StatusStore
 from .bugmail                           import BugMailConfigFileMissing
 from .work                              import SwmWork
 import wfl.wft
@@ -29,6 +29,8 @@
 # WorkflowManager
 #
 class WorkflowManager():
+    context_ready = False
+
     # __init__
     #
     def __init__(s, args, test_mode=False):
@@ -103,12 +105,11 @@ def __init__(s, args, test_mode=False):
         # attempt to clean out any bugs we did not know.  We should only
         # do this if the bug is present at the start of our run to prevent
         # us cleansing bugs which were newly created and shanked by other
-        # instances.
+        # instances.  The status itself is held in an indexed store, the
+        # status.json is exported from there for external consumers.
         s.status_path = 'status.json'
-        s.status_validator = None
-        s.Status_current = None
-        with s.lock_status():
-            s.status_start = s.status_load()
+        s.status_store = StatusStore('status.db', legacy_path=s.status_path)
+        s.status_start = s.status_store.index()
         s.status_wanted = {}
 
         s.tracker_validator = {}
@@ -130,7 +131,7 @@ def single_thread(s):
             yield
 
     @contextmanager
-    def lock_status(s):
+    def lock_status_export(s):
         with s.lock_bug(2):
             yield
 
@@ -141,24 +142,23 @@ def single_dependants_only(s):
 
     @centerleave
     def status_get(s, bugid, summary=False, modified=None):
-        with s.lock_status():
-            status = s.status_load()
+        status = s.status_store.get(bugid)
 
-        return status.get(bugid, {})
+        return status if status is not None else {}
 
     def status_set(s, bugid, summary=False, update=False, modified=None):
-        with s.lock_status():
-            status = s.status_load()
+        with s.status_store.transaction() as store:
+            current = store.get(bugid)
             # If we supply no summary assume we want it unchanged.
             if summary is False:
-                summary = status.get(bugid)
+                summary = current
             if update is not False:
                 if summary is None:
                     summary = {}
                 summary.update(update)
             if summary is not None:
                 # Pull forward persistent swm related state.
-                manager = summary['manager'] = status.get(bugid, {}).get('manager', {})
+                manager = summary['manager'] = (current or {}).get('manager', {})
 
                 # Update the scanned/modified times.
                 if modified is not None:
@@ -167,74 +167,24 @@ def status_set(s, bugid, summary=False, update=False, modified=None):
                     if modified is True or 'time-modified' not in manager:
                         manager['time-modified'] = copy(now)
 
-                status[bugid] = summary
+                store.set(bugid, summary)
                 s.status_wanted[bugid] = True
             else:
-                if bugid in status:
+                if store.delete(bugid):
                     cinfo('overall status {} closing'.format(bugid))
-                    del status[bugid]
                 s.status_wanted[bugid] = False
 
-            s.status_save(status)
-
-    def _json_object_decode(self, obj):
-        isoformat = obj.get('_isoformat')
-        if isoformat is not None:
-            #return datetime.fromisoformat(isoformat)
-            # XXX: before python 3.6 fromisoformat is not available -- detect and remove
-            # the non-standard : in a timezone offset.
-            if isoformat[-5] in ("+", "-") and isoformat[-3] == ':':
-                isoformat = isoformat[0:-3] + isoformat[-2:]
-            for fmt in (
-                    '%Y-%m-%dT%H:%M:%S.%f%z',
-                    '%Y-%m-%dT%H:%M:%S%z',
-                    '%Y-%m-%dT%H:%M:%S.%f',
-                    '%Y-%m-%dT%H:%M:%S'):
-                try:
-                    obj = datetime.strptime(isoformat, fmt)
-                    break
-                except ValueError:
-                    pass
-            else:
-                raise ValueError("isoformat: {} invalid format".format(isoformat))
-        return obj
-
-    @centerleave
-    def status_load(s):
-        status = {}
-        if os.path.exists(s.status_path):
-            with open(s.status_path) as rfd:
-                stat = os.stat(rfd.fileno())
-                validator = (stat.st_ino, stat.st_mtime)
-                cinfo("VALIDATOR: {} {}".format(s.status_validator, validator))
-                if validator != s.status_validator:
-                    data = json.load(rfd, object_hook=s._json_object_decode)
-                    s.status_current = data.get('trackers', data)
-                    s.status_validator = validator
-            status = s.status_current
-
-        return status
-
-    def _json_object_encode(self, obj):
-        if isinstance(obj, datetime):
-            return { '_isoformat': obj.isoformat() }
-        raise TypeError('Object of type %s with value of %s is not JSON serializable' % (type(obj), repr(obj)))
-
+    # status_export
+    #
     @centerleave
-    def status_save(s, status):
-        # Use a top-level trackers collection to allow us to extend with
-        # non-tracker information later.
-        data = {'trackers': status}
-
-        with open(s.status_path + '.new', 'w') as wfd:
-            json.dump(data, fp=wfd, default=s._json_object_encode, separators=(',', ':'))
-        os.rename(s.status_path + '.new', s.status_path)
-
-        # We are writing the file, update our cache.
-        stat = os.stat(s.status_path)
-        validator = (stat.st_ino, stat.st_mtime)
-        s.status_current = status
-        s.status_validator = (stat.st_ino, stat.st_mtime)
+    def status_export(s):
+        '''
+        Export the status store as status.json for external consumers.
+        Concurrent callers wait on the export lock and then find any changes
+        they made have already been exported.
+        '''
+        with s.lock_status_export():
+            return s.status_store.export_json(s.status_path)
 
     # Returns a tuple (depth, master-bug-number, bug-number) which will be used
     # to sort a list of bug numbers.  By sorting by master-bug chain length we
@@ -273,13 +223,7 @@ def tracker_key(s, bug_nr):
 
     def live_children(s, bug_nr):
         result = []
-        with s.lock_status():
-            status = s.status_load()
-
-        for child_nr, child_data in status.items():
-            master_bug = str(child_data.get('master-bug', 0))
-            if master_bug != bug_nr:
-                continue
+        for child_nr, child_data in s.status_store.children(bug_nr):
             series = child_data.get('series', 'unknown')
             source = child_data.get('source', 'unknown')
             target = child_data.get('target', 'unknown')
@@ -307,75 +251,33 @@ def cycle_key(s, entry):
 
     def live_trackers_for_target(s, series, source, target):
         result = []
-        with s.lock_status():
-            status = s.status_load()
-
-        for tracker_nr, tracker_data in status.items():
-            t_series = tracker_data.get('series', 'unknown')
-            t_source = tracker_data.get('source', 'unknown')
-            t_target = tracker_data.get('target', 'unknown')
+        for tracker_nr, tracker_data in s.status_store.for_target(series, source, target):
             t_status = tracker_data.get('task', {}).get('kernel-sru-workflow', {}).get('status', 'Invalid')
 
-            if (
-                series == t_series
-                and source == t_source
-                and target == t_target
-                and t_status not in ("Fix Committed", "Fix Released")
-            ):
+            if t_status not in ("Fix Committed", "Fix Released"):
                 result.append((tracker_nr, tracker_data))
 
         return sorted(result, key=s.cycle_key)
 
     def live_dependants_rescan(s):
         result = []
-        with s.lock_status():
-            status = s.status_load()
-
-        for child_nr, child_data in status.items():
-            rescan = False
-            child_manager = child_data['manager']
-            scanned = child_manager.get('time-scanned')
-
+        for child_nr, parent_nr, scanned, modified in s.status_store.stale_dependants():
             # If a bug has been marked needing a scan, scan it.
             if scanned is None:
                 cinfo('    LP: #{} marked for rescan/fix -- triggering'.format(child_nr), 'magenta')
-                rescan = True
-
-            if not rescan:
-                # This tracker has no parent, skip it.
-                parent_nr = str(child_data.get('master-bug'))
-                if parent_nr is None:
-                    continue
-
-                parent_data = status.get(parent_nr)
-                if parent_data is not None:
-                    parent_manager = parent_data['manager']
-                    modified = parent_manager.get('time-modified')
 
-                    # If our scanned time is before the modified time then we need
-                    # to be rescanned.
-                    if modified is not None and scanned < modified:
-                        cinfo('    LP: #{} parent LP: #{} modified since scanned -- triggering ({}, {})'.format(child_nr, parent_nr, modified, scanned, scanned is None or modified > scanned), 'magenta')
-                        rescan = True
+            # Otherwise our scanned time is before our parent's modified
+            # time and we need to be rescanned.
+            else:
+                cinfo('    LP: #{} parent LP: #{} modified since scanned -- triggering ({}, {})'.format(child_nr, parent_nr, modified, scanned, scanned is None or modified > scanned), 'magenta')
 
-            if rescan:
-                result.append(child_nr)
+            result.append(child_nr)
 
         return result
 
     def live_duplicates_mark(s, old, new):
-        with s.lock_status():
-            status = s.status_load()
-            modified = False
-            for child_nr, child_data in status.items():
-                # This tracker has no parent, skip it.
-                parent_nr = str(child_data.get('master-bug'))
-                if parent_nr is None:
-                    continue
-                # Unrelated to the duplication in process.
-                if parent_nr != old:
-                    continue
-
+        with s.status_store.transaction() as store:
+            for child_nr, child_data in store.children(old):
                 # Ignore snap-debs variants as those should remain tightly
                 # coupled with their parent.
                 child_variant = child_data.get('variant')
@@ -388,10 +290,7 @@ def live_duplicates_mark(s, old, new):
 
                 # Mark this child as needing scanning by removing its scan time.
                 child_data['manager']['time-scanned'] = None
-                modified = True
-
-            if modified:
-                s.status_save(status)
+                store.set(child_nr, child_data)
 
     # Some changes to a tracker can only safely be applied while we have the
     # lock for that bug.  The easiest way to do that is trigger scanning of
@@ -400,10 +299,8 @@ def live_duplicates_mark(s, old, new):
     # and commit them to the persistent state.  Do all of this under the status
     # lock so setting/clearing the fix-* markers is atomic.
     def apply_fixes(s, bugid, bug):
-        with s.lock_status():
-            status_all = s.status_load()
-
-            status = status_all.get(bugid)
+        with s.status_store.transaction() as store:
+            status = store.get(bugid)
             if status is None:
                 return
             manager = status.get('manager')
@@ -426,7 +323,7 @@ def apply_fixes(s, bugid, bug):
                 bug.save()
 
             if status_modified:
-                s.status_save(status_all)
+                store.set(bugid, status)
 
     #@property
     #def lp(s):
@@ -498,33 +395,64 @@ def buglist(s):
     # initialise_context
     #
     def initialise_context(self):
+        # The context is global and its attributes become read-only once
+        # instantiated, only bind them once per process.  Long running
+        # callers will call manage() repeatedly against the same context.
+        if WorkflowManager.context_ready:
+            return
+        WorkflowManager.context_ready = True
+
         # We use lambda here to convert the expression into a callable
         # so that we can delay instantiating it until first use.
         ctx.lp = lambda : LaunchpadDirect.login_application('swm-engine')
         ctx.sc = lambda : SruCycle()
         ctx.ks = lambda : KernelSeries()
 
+    # manage_request
+    #
+    def manage_request(s, bugs, dependants_only=False):
+        '''
+        Process a single request within a long running manager (swm-worker
+        --in-process).  The context (launchpad connection, kernel-series,
+        sru-cycle) is retained from previous requests, all per-run state is
+        reset so the request behaves as if it were a fresh swm run.
+        '''
+        center('WorkflowManager.manage_request')
+        s.args.bugs = bugs
+        s.args.dependants_only = dependants_only
+        s.tracker_validator = {}
+        s.status_wanted = {}
+        s.status_start = s.status_store.index()
+
+        s.manage()
+        cleave('WorkflowManager.manage_request')
+
     # manage
     #
     def manage(s):
         cinfo('Starting run ' + str(datetime.now()))
         s.initialise_context()
-        if s.args.dependants_only:
-            try:
-                with s.single_dependants_only():
-                    s.manage_payload()
-            except BlockingIOError:
-                cerror('dependants-only run already in progress.', 'red')
+        # Whatever happened to the cranks, status.db has been updated;
+        # keep status.json in step with it.
+        try:
+            if s.args.dependants_only:
+                try:
+                    with s.single_dependants_only():
+                        s.manage_payload()
+                except BlockingIOError:
+                    cerror('dependants-only run already in progress.', 'red')
 
-        elif not s.args.bugs:
-            try:
-                with s.single_thread():
-                    s.manage_payload()
-            except BlockingIOError:
-                cerror('Full run already in progress.', 'red')
+            elif not s.args.bugs:
+                try:
+                    with s.single_thread():
+                        s.manage_payload()
+                except BlockingIOError:
+                    cerror('Full run already in progress.', 'red')
 
-        else:
-            s.manage_payload()
+            else:
+                s.manage_payload()
+        finally:
+            s.status_export()
         cinfo('Completed run ' + str(datetime.now()))
 
     # queue_cranks
@@ -539,27 +467,33 @@ def queue_cranks(self, buglist, priority=None, dependants=False):
 
         group = SwmWork(config=os.path.expanduser("~/.kernel-swm-worker.yaml")).rescan_group()
 
-        with self.lock_status():
-            status = self.status_load()
-
-            submitted = 0
-            for bugid in buglist:
-                manager = status.get(bugid,{}).get('manager', {})
-                scanned = manager.get('time-scanned')
-                requested = manager.get('time-requested')
-
-                if requested is not None and scanned == requested:
-                    cinfo("queuing shank {} {} -- already requested, ignored".format(bugid, scanned))
-                    continue
-
-                cinfo("queuing shank {} {}".format(bugid, scanned))
-                group.send_shank(bugid, scanned=scanned, priority=priority)
-                submitted += 1
-
-                manager['time-requested'] = scanned
-
-            if submitted > 0:
-                self.status_save(status)
+        with self.status_store.transaction() as store:
+            queued = {}
+            with group.batch() as batch:
+                for bugid in buglist:
+                    status = store.get(bugid)
+                    manager = (status or {}).get('manager', {})
+                    scanned = manager.get('time-scanned')
+                    requested = manager.get('time-requested')
+
+                    if requested is not None and scanned == requested:
+                        cinfo("queuing shank {} {} -- already requested, ignored".format(bugid, scanned))
+                        continue
+
+                    cinfo("queuing shank {} {}".format(bugid, scanned))
+                    group.send_shank(bugid, scanned=scanned, priority=priority)
+                    queued[bugid] = (status, manager, scanned)
+
+            # Only record those the broker accepted as requested so any
+            # failures are requeued on the next pass.
+            for payload in batch.failed_payloads:
+                cerror("queuing shank {} -- publish failed".format(payload['tracker']))
+                del queued[payload['tracker']]
+
+            for bugid, (status, manager, scanned) in queued.items():
+                if status is not None:
+                    manager['time-requested'] = scanned
+                    store.set(bugid, status)
 
     # bug_url
     #
@@ -3,6 +3,8 @@
 
 import os
 import re
+import threading
+from concurrent.futures                  import ThreadPoolExecutor
 from datetime                           import datetime, timedelta, timezone
 from hashlib                            import sha384
 import json
@@ -21,6 +23,7 @@
 from .context                           import ctx
 from .errors                            import ShankError, ErrorExit, WorkflowCrankError
 from .git_tag                           import GitTag, GitTagError
+from .launchpad                         import LaunchpadDirect
 from .log                               import cdebug, cerror, cwarn, center, cleave, Clog, cinfo, centerleave, centerleaveargs
 
 # PackageError
@@ -102,6 +105,7 @@ def __init__(self, series, dependent, route_name, route_entry, archive, pocket,
 
         self._source = False
         self._binary_analysis = False
+        self._prefetched = None
 
         self.monitors = []
 
@@ -114,23 +118,73 @@ def reference(self):
         """the archive reference for this route entry"""
         return self.archive.reference
 
+    def _lookup_source(self, archive):
+        srcs = archive.getPublishedSources(
+            order_by_date=True,
+            exact_match=True,
+            distro_series=self.series,
+            source_name=self.package,
+            pocket=self.pocket,
+        )
+        # Only consider positive states as present.
+        if len(srcs) > 0 and srcs[0].status in ("Pending", "Published"):
+            return srcs[0]
+        return None
+
+    def prefetch(self, lp):
+        """
+        Look up the source publication and its builds and binaries using
+        the supplied launchpad connection.  This has no side effects so may
+        be run in parallel for many route entries; the results are consumed
+        by ``source`` and ``binary_analysis`` when they are first used.
+
+        :param lp:
+            a launchpad connection private to the calling thread
+        :return:
+            tuple of the source and lists of its builds and binaries, each
+            as (self_link, representation); objects bound to lp must not
+            escape the calling thread, see prefetch_bind()
+        """
+        def snapshot(obj):
+            return (obj.self_link, obj._wadl_resource.representation)
+
+        source = self._lookup_source(lp.load(self.archive.self_link))
+        if source is None:
+            return (None, None, None)
+        builds = [snapshot(build) for build in source.getBuilds()]
+        binaries = [snapshot(binary) for binary in source.getPublishedBinaries(active_binaries_only=False)]
+        return (snapshot(source), builds, binaries)
+
+    def prefetch_bind(self, lp, prefetched):
+        """
+        Bind the results of prefetch() to a launchpad connection owned by
+        the calling thread.
+
+        :param lp:
+            the launchpad connection the results will be used with
+        :param prefetched:
+            the tuple returned by prefetch()
+        :return:
+            tuple of source, builds and binaries
+        """
+        (source, builds, binaries) = prefetched
+        if source is None:
+            return (None, None, None)
+        return (
+            lp._bind_representation(*source),
+            [lp._bind_representation(*build) for build in builds],
+            [lp._bind_representation(*binary) for binary in binaries],
+        )
+
     @property
     def source(self):
         """the Launchpad source package object"""
         if self._source is False:
             cdebug("SOURCE {} {} {}".format(self.dependent, self.route_name_entry, self.package))
-            srcs = self.archive.getPublishedSources(
-                order_by_date=True,
-                exact_match=True,
-                distro_series=self.series,
-                source_name=self.package,
-                pocket=self.pocket,
-            )
-            # Only consider positive states as present.
-            if len(srcs) > 0 and srcs[0].status in ("Pending", "Published"):
-                src = srcs[0]
+            if self._prefetched is not None:
+                src = self._prefetched[0]
             else:
-                src = None
+                src = self._lookup_source(self.archive)
             self._source = src
 
             # Generate a monitor record for this source.
@@ -201,7 +255,10 @@ def binary_analysis(self):
 
             arch_build = set()
             arch_complete = set()
-            builds = source.getBuilds()
+            if self._prefetched is not None:
+                builds = self._prefetched[1]
+            else:
+                builds = source.getBuilds()
             if len(builds) == 0:
                 self.monitor_add({
                         'type': 'launchpad-nobuilds',
@@ -280,7 +337,10 @@ def binary_analysis(self):
             arch_published = set()
             # Grab all the binaries, including those superseded so we can tell if
             # we have been dominated away.
-            binaries_all = source.getPublishedBinaries(active_binaries_only=False)
+            if self._prefetched is not None:
+                binaries_all = self._prefetched[2]
+            else:
+                binaries_all = source.getPublishedBinaries(active_binaries_only=False)
 
             # NOTE: that this set may contain more than record for a binary if that
             # binary has been republished to change components, or if it was simply
@@ -951,6 +1011,16 @@ def get(self, name, default=None):
 # Package
 #
 class Package():
+    # Bound on concurrent launchpad requests while prefetching builds, 0
+    # disables prefetching.
+    prefetch_workers = 8
+
+    # The prefetch pool is shared by every Package in this process, and each
+    # of its threads keeps its own launchpad connection for its lifetime.
+    _prefetch_lock = threading.Lock()
+    _prefetch_local = threading.local()
+    _prefetch_executor = None
+    _prefetch_pid = None
 
     # __init__
     #
@@ -1363,6 +1433,11 @@ def __determine_build_status(s):
                 #cinfo('%-8s : %-5s / %-10s    (%s : %s) %s [%s %s]' % (pocket, info[0], info[5], info[3], info[4], info[6], src_archive.reference, src_pocket), 'cyan')
             Clog.indent -= 4
 
+        # Prefetching needs the stream we were built in; when it is not yet
+        # known it will be determined below and we prefetch once it is.
+        built_in = s.bug.built_in
+        s.__prefetch_build_status()
+
         # Scan across the build locations and dertermine if we see an upload in an appropriate
         # version.  Use this to set the built_in if we don't have one.
         for pkg in s.pkgs:
@@ -1388,9 +1463,76 @@ def __determine_build_status(s):
                 elif package_published.route_entry != s.bug.built_in:
                     cwarn("APW: NEW package_version built_in={} != {}".format(s.bug.built_in, package_published.route_entry))
 
+        if built_in is None:
+            s.__prefetch_build_status()
+
         cleave('Sources::__determine_build_status')
         return None
 
+    # __prefetch_build_status
+    #
+    def __prefetch_build_status(s):
+        '''
+        Resolve the sources, builds and binaries for every route entry we may
+        consult during this crank in one parallel batch, rather than lazily
+        and serially as each task handler asks.
+        '''
+        center('Sources::__prefetch_build_status')
+
+        # Without a built_in stream we would be prefetching every stream.
+        if s.prefetch_workers == 0 or s.bug.built_in is None:
+            cleave('Sources::__prefetch_build_status')
+            return
+
+        entries = []
+        for dep, dep_builds in s._builds.items():
+            # Note: 'ppa' is an alias for the first build route.
+            for build_route in set(dep_builds.values()):
+                entries += build_route.publications_match(limit_stream=s.bug.built_in)
+
+        if len(entries) == 0:
+            cleave('Sources::__prefetch_build_status')
+            return
+
+        executor = s.__prefetch_executor()
+        results = list(zip(entries, [executor.submit(s.__prefetch_entry, entry) for entry in entries]))
+
+        # Anything which failed will simply be looked up on demand.
+        for entry, future in results:
+            try:
+                entry._prefetched = entry.prefetch_bind(ctx.lp, future.result())
+            except Exception as e:
+                cwarn("prefetch {} {} {} failed: {}".format(entry.dependent, entry.route_name_entry, entry.package, e))
+        cinfo("prefetched {} route entries".format(len(results)))
+
+        cleave('Sources::__prefetch_build_status')
+
+    # __prefetch_executor
+    #
+    @classmethod
+    def __prefetch_executor(cls):
+        '''
+        Return the process wide prefetch pool, starting it on first use (or
+        after a fork, which leaves the parent's worker threads behind).
+        '''
+        with cls._prefetch_lock:
+            if cls._prefetch_executor is None or cls._prefetch_pid != os.getpid():
+                cls._prefetch_executor = ThreadPoolExecutor(max_workers=cls.prefetch_workers, thread_name_prefix='prefetch')
+                cls._prefetch_pid = os.getpid()
+            return cls._prefetch_executor
+
+    # __prefetch_entry
+    #
+    @classmethod
+    def __prefetch_entry(cls, entry):
+        # launchpadlib is not thread safe, use a connection per thread.  Only
+        # representations are returned, the caller rebinds them on its own
+        # connection.
+        lp = getattr(cls._prefetch_local, 'lp', None)
+        if lp is None:
+            lp = cls._prefetch_local.lp = LaunchpadDirect.login_application('swm-engine')
+        return entry.prefetch(lp)
+
     def __all_arches_built(s, matches):
         '''
         Determine if all the builds that have been done for all of the arches. This helps
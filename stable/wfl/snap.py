@@ -9,6 +9,8 @@
 
 import os
 import json
+import sqlite3
+import time
 from copy import copy
 from .errors import ShankError
 from datetime import datetime
@@ -41,6 +43,81 @@ class SnapStoreError(ShankError):
     pass
 
 
+# SnapStoreCache
+#
+class SnapStoreCache:
+    """
+    Snap store channel map responses shared between processes, keyed by
+    snap, store, architecture and tracks.  A response is only used for ttl
+    seconds after it was made.
+    """
+    path = os.path.join(os.path.expanduser('~'), '.cache', 'kernel-swm', 'snap-store.db')
+    ttl = 120
+
+    _shared = None
+
+    # __init__
+    #
+    def __init__(s, path=None, ttl=None):
+        if path is not None:
+            s.path = path
+        if ttl is not None:
+            s.ttl = ttl
+        s.pid = os.getpid()
+        s.db = None
+
+        try:
+            os.makedirs(os.path.dirname(s.path), exist_ok=True)
+            s.db = sqlite3.connect(s.path, timeout=60, isolation_level=None)
+            s.db.execute('PRAGMA journal_mode=WAL')
+            s.db.execute('PRAGMA synchronous=NORMAL')
+            s.db.execute('''CREATE TABLE IF NOT EXISTS channels (
+                key         TEXT PRIMARY KEY,
+                fetched     REAL NOT NULL,
+                data        TEXT NOT NULL
+            )''')
+        except (OSError, sqlite3.Error) as e:
+            cdebug("SnapStoreCache: cache unavailable -- {}".format(str(e)))
+            s.db = None
+
+    @classmethod
+    def shared(cls):
+        """
+        Return the cache instance for this process.
+        """
+        if cls._shared is None or cls._shared.pid != os.getpid():
+            cls._shared = cls()
+        return cls._shared
+
+    def close(s):
+        if s.db is not None:
+            s.db.close()
+            s.db = None
+
+    def lookup(s, key):
+        """
+        Return the fresh results for key, or None.
+        """
+        if s.db is None:
+            return None
+        try:
+            row = s.db.execute('SELECT data FROM channels WHERE key = ? AND fetched >= ?',
+                (key, time.time() - s.ttl)).fetchone()
+        except sqlite3.Error as e:
+            cdebug("SnapStoreCache: lookup failed -- {}".format(str(e)))
+            return None
+        return json.loads(row[0]) if row is not None else None
+
+    def store(s, key, results):
+        if s.db is None:
+            return
+        try:
+            s.db.execute('INSERT OR REPLACE INTO channels (key, fetched, data) VALUES (?, ?, ?)',
+                (key, time.time(), json.dumps(results, separators=(',', ':'))))
+        except sqlite3.Error as e:
+            cdebug("SnapStoreCache: store failed -- {}".format(str(e)))
+
+
 # SnapStore
 #
 class SnapStore:
@@ -48,9 +125,21 @@ class SnapStore:
     A helper class to handle Snapcraft store operations.
     """
     base_url = "https://api.snapcraft.io/v2/snaps/info/"
+    refresh_url = "https://api.snapcraft.io/v2/snaps/refresh"
     common_headers = {'Snap-Device-Series': '16'}
     # curl -H 'Snap-Device-Series: 16' 'https://api.snapcraft.io/v2/snaps/info/pc-kernel?fields=channel-map,architecture,channel,revision,version'
 
+    # XXX: we should be a little more dynamic with streams perhaps.
+    risks = [
+        "edge", "edge/stream2",
+        "beta", "beta/stream2",
+        "candidate", "candidate/stream2",
+        "stable"
+    ]
+
+    # The most actions we place in a single refresh request.
+    batch_size = 250
+
     # __init__
     #
     def __init__(s, snap):
@@ -62,6 +151,163 @@ def __init__(s, snap):
         s._revision_map = None  # dictionary with {<revision}: {<version>,<revision>}}
         s.secrets = Secrets(os.path.expanduser("~/.swm-secrets.yaml")).get('snaps')
 
+    @classmethod
+    def _refresh(cls, store_id, arch, wanted):
+        """
+        Look up the channels for a number of snaps in a single refresh request.
+
+        :param store_id: the store to query or None
+        :param arch: the architecture to query
+        :param wanted: list of (<snap-name>, <channels>)
+        :return: dictionary with {<snap-name>: [(<channel>, <entry>)]}
+        """
+        actions = []
+        for name, channels in wanted:
+            for channel in channels:
+                actions.append({
+                    "action": "download",
+                    "instance-key": name + ":" + channel,
+                    "name": name,
+                    "channel": channel,
+                })
+        data = {
+            "context": [],
+            "actions": actions,
+            "fields": ["name","revision","type","version"],
+        }
+        found = {name: [] for name, channels in wanted}
+        try:
+            headers = copy(cls.common_headers)
+            if store_id is not None:
+                cdebug("SnapStore: using snap specific store-id")
+                headers["Snap-Device-Store"] = store_id
+            headers["Snap-Device-Architecture"] = arch
+            headers["Content-Type"] = 'application/json'
+
+            req = Request(cls.refresh_url, headers=headers, method="POST", data=bytes(json.dumps(data), "ascii"))
+            with urlopen(req) as resp:
+                raw_data = resp.read().decode('utf-8')
+                cdebug("SNAP JSON: {}".format(raw_data))
+                response = json.loads(raw_data)
+                cdebug(response)
+                for result in response["results"]:
+                    (name, channel) = result["instance-key"].split(":", 1)
+                    if "error" in result:
+                        cdebug("SNAP RESULT: snap={} arch={} channel={} error.code={}".format(name, arch, channel, result["error"]["code"]))
+                        continue
+                    # XXX: should be checking for individual channel errors.
+                    cdebug("SNAP RESULT: snap={} channel={} version={} revision={} released-at={}".format(name, channel, result["snap"]["version"], result["snap"]["revision"], result["released-at"]))
+                    entry = {}
+                    entry['version'] = result["snap"]["version"]
+                    entry['revision'] = result["snap"]["revision"]
+                    entry['released-at'] = result["released-at"]
+                    found[name].append((channel, entry))
+
+        except HTTPError as e:
+            # Error 404 is returned if the snap has never been published
+            # to the given channel.
+            store_err = False
+            ret_body = e.read().decode()
+            cdebug("SNAP ERROR: ret_body={}".format(ret_body))
+            if hasattr(e, 'code') and e.code == 404:
+                ret_data = json.loads(ret_body)
+                cinfo("SNAP 404: {}".format(ret_data))
+                for error in ret_data.get('error-list', []):
+                    cinfo("SNAP ERROR: code={} message={}".format(error['code'], error['message']))
+                    if error['code'] == 'resource-not-found':
+                        store_err = True
+                # XXX: convert to something sane in the above loop.
+                store_err_str = 'has no published revisions in the given context'
+                if store_err_str in ret_body:
+                    store_err = True
+            if not store_err:
+                raise SnapStoreError('failed to retrieve store URL (%s)' % str(e))
+            # A batch may be refused as a whole for one unpublished snap,
+            # ask about each separately.
+            if len(wanted) > 1:
+                for one in wanted:
+                    found.update(cls._refresh(store_id, arch, [one]))
+        except (URLError, KeyError, ValueError) as e:
+            raise SnapStoreError('failed to retrieve store URL (%s: %s)' %
+                                 (type(e), str(e)))
+        return found
+
+    @classmethod
+    def resolve(cls, snaps, secrets=None, cache=None):
+        """
+        Probe the snap publishing records in the store for a number of snaps
+        at once.  Responses are shared via the SnapStoreCache, the snaps and
+        architectures not found there are looked up with as few refresh
+        requests as the store allows: one per store and architecture.
+
+        :param snaps: list of kernel-series snap entries
+        :return: dictionary with {<snap-name>: (<channels>, <revisions>)}
+        """
+        if secrets is None:
+            secrets = Secrets(os.path.expanduser("~/.swm-secrets.yaml")).get('snaps')
+        if cache is None:
+            cache = SnapStoreCache.shared()
+
+        # Work out what we need for each snap, and what we have already.
+        results = {}
+        batches = {}
+        for snap in snaps:
+            cdebug("    snap.name={}".format(snap.name))
+            cdebug("    snap.publish_to={}".format(snap.publish_to))
+            store_id = secrets.get(snap.name, {}).get("store-id")
+            for arch, tracks in snap.publish_to.items():
+                key = " ".join([snap.name, str(store_id), arch] + list(tracks))
+                if key in results:
+                    continue
+                results[key] = cache.lookup(key)
+                if results[key] is None:
+                    channels = ["{}/{}".format(track, risk) for track in tracks for risk in cls.risks]
+                    batches.setdefault((store_id, arch), []).append((key, snap.name, channels))
+
+        for (store_id, arch), wanted in batches.items():
+            batch = []
+            for key, name, channels in wanted:
+                if sum(len(channels) for key, name, channels in batch) + len(channels) > cls.batch_size:
+                    cls._resolve_batch(store_id, arch, batch, results, cache)
+                    batch = []
+                batch.append((key, name, channels))
+            cls._resolve_batch(store_id, arch, batch, results, cache)
+
+        found = {}
+        for snap in snaps:
+            store_id = secrets.get(snap.name, {}).get("store-id")
+            channels = {}
+            revisions = {}
+            for arch, tracks in snap.publish_to.items():
+                key = " ".join([snap.name, str(store_id), arch] + list(tracks))
+                for channel, entry in results[key]:
+                    channels[(arch, channel)] = entry
+                    revisions[entry["revision"]] = entry
+            found[snap.name] = (channels, revisions)
+        return found
+
+    @classmethod
+    def _resolve_batch(cls, store_id, arch, batch, results, cache):
+        if len(batch) == 0:
+            return
+        # Each snap may only appear once in a request.
+        names = {}
+        for key, name, channels in batch:
+            names.setdefault(name, []).append((key, channels))
+        while names:
+            wanted = []
+            keys = {}
+            for name in list(names):
+                (key, channels) = names[name].pop(0)
+                if len(names[name]) == 0:
+                    del names[name]
+                wanted.append((name, channels))
+                keys[name] = key
+            found = cls._refresh(store_id, arch, wanted)
+            for name, key in keys.items():
+                results[key] = found[name]
+                cache.store(key, found[name])
+
     # channel_map_lookup
     #
     def channel_map_lookup(s):
@@ -70,85 +316,7 @@ def channel_map_lookup(s):
 
         :return: publishing array
         """
-        cdebug("    snap.name={}".format(s.snap.name))
-        cdebug("    snap.publish_to={}".format(s.snap.publish_to))
-
-        channels = {}
-        revisions = {}
-        for arch, tracks in s.snap.publish_to.items():
-            actions = []
-            for track in tracks:
-                # XXX: we should be a little more dynamic with streams perhaps.
-                for risk in [
-                    "edge", "edge/stream2",
-                    "beta", "beta/stream2",
-                    "candidate", "candidate/stream2",
-                    "stable"
-                ]:
-                    channel = "{}/{}".format(track, risk)
-                    actions.append({
-                        "action": "download",
-                        "instance-key": channel,
-                        "name": s.snap.name,
-                        "channel": channel,
-                    })
-            data = {
-                "context": [],
-                "actions": actions,
-                "fields": ["name","revision","type","version"],
-            }
-            try:
-                headers = copy(s.common_headers)
-                store_id = s.secrets.get(s.snap.name, {}).get("store-id")
-                if store_id is not None:
-                    cdebug("SnapStore: {} using snap specific store-id")
-                    headers["Snap-Device-Store"] = store_id
-                headers["Snap-Device-Architecture"] = arch
-                headers["Content-Type"] = 'application/json'
-
-                url = "https://api.snapcraft.io/v2/snaps/refresh"
-                req = Request(url, headers=headers, method="POST", data=bytes(json.dumps(data), "ascii"))
-                with urlopen(req) as resp:
-                    raw_data = resp.read().decode('utf-8')
-                    cdebug("SNAP JSON: {}".format(raw_data))
-                    response = json.loads(raw_data)
-                    cdebug(response)
-                    for result in response["results"]:
-                        if "error" in result:
-                            cdebug("SNAP RESULT: arch={} channel={} error.code={}".format(arch, result["instance-key"], result["error"]["code"]))
-                            continue
-                        # XXX: should be checking for individual channel errors.
-                        cdebug("SNAP RESULT: channel={} version={} revision={} released-at={}".format(result["instance-key"], result["snap"]["version"], result["snap"]["revision"], result["released-at"]))
-                        entry = {}
-                        entry['version'] = result["snap"]["version"]
-                        entry['revision'] = result["snap"]["revision"]
-                        entry['released-at'] = result["released-at"]
-                        channels[(arch, result["instance-key"])] = entry
-                        revisions[entry["revision"]] = entry
-
-            except HTTPError as e:
-                # Error 404 is returned if the snap has never been published
-                # to the given channel.
-                store_err = False
-                ret_body = e.read().decode()
-                cdebug("SNAP ERROR: ret_body={}".format(ret_body))
-                if hasattr(e, 'code') and e.code == 404:
-                    ret_data = json.loads(ret_body)
-                    cinfo("SNAP 404: {}".format(ret_data))
-                    for error in ret_data.get('error-list', []):
-                        cinfo("SNAP ERROR: code={} message={}".format(error['code'], error['message']))
-                        if error['code'] == 'resource-not-found':
-                            store_err = True
-                    # XXX: convert to something sane in the above loop.
-                    store_err_str = 'has no published revisions in the given context'
-                    if store_err_str in ret_body:
-                        store_err = True
-                if not store_err:
-                    raise SnapStoreError('failed to retrieve store URL (%s)' % str(e))
-            except (URLError, KeyError) as e:
-                raise SnapStoreError('failed to retrieve store URL (%s: %s)' %
-                                     (type(e), str(e)))
-        return channels, revisions
+        return s.resolve([s.snap], secrets=s.secrets)[s.snap.name]
 
     def channel_map(s):
         if s._channel_map is None:
@@ -0,0 +1,281 @@
+#
+# status_store -- indexed persistent store for the per-tracker swm status
+#
+from contextlib                         import contextmanager
+from datetime                           import datetime
+import json
+import os
+import sqlite3
+
+from .log                               import center, cleave, cinfo
+
+
+# StatusStore
+#
+class StatusStore:
+    '''
+    Per-tracker status storage backed by SQLite.  Each tracker is held as a
+    single row containing its JSON encoded summary, allowing individual
+    trackers to be updated without rewriting the whole status.  The fields
+    we search on (master-bug, series/source/target, time-scanned and
+    time-modified) are maintained as indexed columns.
+
+    The classic status.json is exported on demand for SwmStatus consumers,
+    and is used to seed the store when it is first created.
+    '''
+    _schema = [
+        '''CREATE TABLE IF NOT EXISTS trackers (
+            id              TEXT PRIMARY KEY,
+            master_bug      TEXT,
+            series          TEXT,
+            source          TEXT,
+            target          TEXT,
+            time_scanned    TEXT,
+            time_modified   TEXT,
+            data            TEXT NOT NULL
+        )''',
+        'CREATE INDEX IF NOT EXISTS trackers_master_bug ON trackers (master_bug)',
+        'CREATE INDEX IF NOT EXISTS trackers_target ON trackers (series, source, target)',
+        'CREATE INDEX IF NOT EXISTS trackers_time_scanned ON trackers (time_scanned)',
+        'CREATE INDEX IF NOT EXISTS trackers_time_modified ON trackers (time_modified)',
+        'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+    ]
+
+    # Fixed width timestamp format, these sort correctly as text.
+    _time_format = '%Y-%m-%dT%H:%M:%S.%f'
+
+    # __init__
+    #
+    def __init__(self, path, legacy_path=None):
+        '''
+        :param path: path to the SQLite database
+        :param legacy_path: path to a status.json used to seed a new database
+        '''
+        center(self.__class__.__name__ + '.__init__')
+        self.path = path
+
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        for statement in self._schema:
+            self.db.execute(statement)
+
+        if legacy_path is not None and os.path.exists(legacy_path):
+            self.import_json(legacy_path)
+
+        cleave(self.__class__.__name__ + '.__init__')
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _json_object_decode(self, obj):
+        isoformat = obj.get('_isoformat')
+        if isoformat is not None:
+            #return datetime.fromisoformat(isoformat)
+            # XXX: before python 3.6 fromisoformat is not available -- detect and remove
+            # the non-standard : in a timezone offset.
+            if isoformat[-5] in ("+", "-") and isoformat[-3] == ':':
+                isoformat = isoformat[0:-3] + isoformat[-2:]
+            for fmt in (
+                    '%Y-%m-%dT%H:%M:%S.%f%z',
+                    '%Y-%m-%dT%H:%M:%S%z',
+                    '%Y-%m-%dT%H:%M:%S.%f',
+                    '%Y-%m-%dT%H:%M:%S'):
+                try:
+                    obj = datetime.strptime(isoformat, fmt)
+                    break
+                except ValueError:
+                    pass
+            else:
+                raise ValueError("isoformat: {} invalid format".format(isoformat))
+        return obj
+
+    def _json_object_encode(self, obj):
+        if isinstance(obj, datetime):
+            return { '_isoformat': obj.isoformat() }
+        raise TypeError('Object of type %s with value of %s is not JSON serializable' % (type(obj), repr(obj)))
+
+    def _decode(self, data):
+        return json.loads(data, object_hook=self._json_object_decode)
+
+    def _encode(self, data):
+        return json.dumps(data, default=self._json_object_encode, separators=(',', ':'))
+
+    def _time_key(self, when):
+        if not isinstance(when, datetime):
+            return None
+        return when.strftime(self._time_format)
+
+    def _time_value(self, when):
+        if when is None:
+            return None
+        return datetime.strptime(when, self._time_format)
+
+    @contextmanager
+    def transaction(self):
+        '''
+        Take the database write lock for the duration.  This serialises all
+        read-modify-write sequences against other writers, readers continue
+        to see the last committed state.
+        '''
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            yield self
+        except:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def _bump_generation(self):
+        self.db.execute("INSERT INTO meta (key, value) VALUES ('generation', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+
+    def _meta(self, key):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    # get
+    #
+    def get(self, bugid):
+        '''
+        Return the status for the specified tracker, None when unknown.
+        '''
+        row = self.db.execute('SELECT data FROM trackers WHERE id = ?', (str(bugid),)).fetchone()
+        if row is None:
+            return None
+        return self._decode(row[0])
+
+    # set
+    #
+    def set(self, bugid, data):
+        '''
+        Insert or replace the status for a single tracker.
+        '''
+        manager = data.get('manager', {})
+        master_bug = data.get('master-bug')
+        self.db.execute('INSERT INTO trackers '
+            '(id, master_bug, series, source, target, time_scanned, time_modified, data) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (id) DO UPDATE SET master_bug = excluded.master_bug, '
+            'series = excluded.series, source = excluded.source, target = excluded.target, '
+            'time_scanned = excluded.time_scanned, time_modified = excluded.time_modified, '
+            'data = excluded.data', (
+                str(bugid),
+                None if master_bug is None else str(master_bug),
+                data.get('series'),
+                data.get('source'),
+                data.get('target'),
+                self._time_key(manager.get('time-scanned')),
+                self._time_key(manager.get('time-modified')),
+                self._encode(data)))
+        self._bump_generation()
+
+    # delete
+    #
+    def delete(self, bugid):
+        '''
+        Remove a tracker returning True if it was present.
+        '''
+        cursor = self.db.execute('DELETE FROM trackers WHERE id = ?', (str(bugid),))
+        if cursor.rowcount == 0:
+            return False
+        self._bump_generation()
+        return True
+
+    # index
+    #
+    def index(self):
+        '''
+        Return a lightweight map of all trackers to their indexed attributes
+        (master-bug, series, source, target) without decoding their status.
+        '''
+        result = {}
+        for bugid, master_bug, series, source, target in self.db.execute(
+                'SELECT id, master_bug, series, source, target FROM trackers'):
+            entry = {}
+            for key, value in (('master-bug', master_bug), ('series', series), ('source', source), ('target', target)):
+                if value is not None:
+                    entry[key] = value
+            result[bugid] = entry
+        return result
+
+    # children
+    #
+    def children(self, master_bug):
+        '''
+        Return (bugid, status) for all trackers whose master-bug is specified.
+        '''
+        return [(bugid, self._decode(data)) for bugid, data in self.db.execute(
+            'SELECT id, data FROM trackers WHERE master_bug = ?', (str(master_bug),))]
+
+    # for_target
+    #
+    def for_target(self, series, source, target):
+        '''
+        Return (bugid, status) for all trackers for the specified target.
+        '''
+        return [(bugid, self._decode(data)) for bugid, data in self.db.execute(
+            'SELECT id, data FROM trackers WHERE series = ? AND source = ? AND target = ?',
+            (series, source, target))]
+
+    # stale_dependants
+    #
+    def stale_dependants(self):
+        '''
+        Return (bugid, master-bug, time-scanned, master time-modified) for
+        all trackers which have never been scanned, or whose master tracker
+        was modified after they were last scanned.
+        '''
+        return [(bugid, master_bug, self._time_value(scanned), self._time_value(modified))
+            for bugid, master_bug, scanned, modified in self.db.execute(
+                'SELECT child.id, child.master_bug, child.time_scanned, parent.time_modified '
+                'FROM trackers AS child LEFT JOIN trackers AS parent ON parent.id = child.master_bug '
+                'WHERE child.time_scanned IS NULL OR child.time_scanned < parent.time_modified')]
+
+    # import_json
+    #
+    def import_json(self, path):
+        '''
+        Seed an empty store from a legacy status.json.
+        '''
+        with self.transaction():
+            if self._meta('imported') is not None:
+                return
+            if self.db.execute('SELECT COUNT(*) FROM trackers').fetchone()[0] == 0:
+                cinfo("StatusStore: importing {}".format(path))
+                with open(path) as rfd:
+                    data = json.load(rfd, object_hook=self._json_object_decode)
+                for bugid, status in data.get('trackers', data).items():
+                    self.set(bugid, status)
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported', ?)", (path,))
+
+    # export_json
+    #
+    def export_json(self, path):
+        '''
+        Write the complete status out as a status.json compatible with
+        SwmStatus.  The export is skipped when nothing has changed since the
+        last export.  Callers are expected to serialise exports.
+        '''
+        # Read the generation and the content in a single read transaction
+        # so we record exactly which generation we exported.
+        self.db.execute('BEGIN')
+        try:
+            generation = self._meta('generation')
+            if generation is not None and generation == self._meta('exported') and os.path.exists(path):
+                return False
+            status = {bugid: self._decode(data) for bugid, data in self.db.execute(
+                'SELECT id, data FROM trackers ORDER BY rowid')}
+        finally:
+            self.db.execute('COMMIT')
+
+        # Use a top-level trackers collection to allow us to extend with
+        # non-tracker information later.
+        with open(path + '.new', 'w') as wfd:
+            json.dump({'trackers': status}, fp=wfd, default=self._json_object_encode, separators=(',', ':'))
+        os.rename(path + '.new', path)
+
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('exported', ?)", (generation,))
+        return True
@@ -1,9 +1,9 @@
 import json
 import socket
-from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
 
 from wfl.errors import ShankError
+from wfl.feed_cache import FeedCache
 from wfl.log import cinfo
 
 
@@ -23,15 +23,14 @@ def __init__(self, url=None, data=False):
         self.url = url
 
         self._data = {}
+        self._versions = {}
 
     def _grab_json(self, url):
         if self._broken is not None:
             raise self._broken
         try:
             headers = {"Content-Type": 'application/json'}
-            req = Request(url, headers=headers, method="GET")
-            with urlopen(req, timeout=30) as response:
-                data = response.read()
+            data = FeedCache().fetch(url, headers=headers, timeout=30)
         except HTTPError as e:
             if e.code != 404:
                 raise TestObserverError("fetch failure -- " + str(e.reason))
@@ -61,6 +60,12 @@ def family(self, family):
 
             self._data[family] = data
 
+            # Index the artefacts by version, in their original order.
+            versions = {}
+            for artefact in data:
+                versions.setdefault(artefact.get("version"), []).append(artefact)
+            self._versions[family] = versions
+
         return self._data[family]
 
         #cinfo("APW data={}".format(self.family))
@@ -85,7 +90,10 @@ def lookup_results(self, family, series=None, track=None, stage=None, name=None,
         #cinfo("TO RESULTS={}".format(self.family(family)))
         cinfo("TO lookup_result({}, {}, {}, {}, {}, {})".format(family, series, track, stage, name, version))
         results = []
-        for data in self.family(family):
+        candidates = self.family(family)
+        if version is not None:
+            candidates = self._versions[family].get(version, [])
+        for data in candidates:
             if (
                 (version is not None and data.get("version") != version)
                 or (series is not None and data.get("series") != series)
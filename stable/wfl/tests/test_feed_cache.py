@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+from http.server        import BaseHTTPRequestHandler, HTTPServer
+from testfixtures       import TempDirectory
+import threading
+import unittest
+from urllib.error       import HTTPError
+
+from wfl.feed_cache     import FeedCache
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.path != '/feed.json':
+            self.send_error(404)
+            return
+        if self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', server.etag)
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFeedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = TempDirectory()
+        self.server = HTTPServer(('127.0.0.1', 0), FeedHandler)
+        self.server.requests = []
+        self.server.etag = '"one"'
+        self.server.body = b'[1]'
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = 'http://127.0.0.1:{}/feed.json'.format(self.server.server_port)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.tmp.cleanup()
+
+    def test_fresh(self):
+        cache = FeedCache(path=self.tmp.path, max_age=60)
+        self.assertEqual(cache.fetch(self.url), b'[1]')
+        self.assertEqual(cache.fetch(self.url), b'[1]')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_revalidate(self):
+        cache = FeedCache(path=self.tmp.path, max_age=0)
+        self.assertEqual(cache.fetch(self.url), b'[1]')
+        # Unchanged, our copy is revalidated.
+        self.assertEqual(cache.fetch(self.url), b'[1]')
+        self.assertEqual(self.server.requests[-1].get('If-None-Match'), '"one"')
+
+        # Changed, the new version is fetched.
+        self.server.etag = '"two"'
+        self.server.body = b'[2]'
+        self.assertEqual(cache.fetch(self.url), b'[2]')
+        self.assertEqual(FeedCache(path=self.tmp.path, max_age=60).fetch(self.url), b'[2]')
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_missing(self):
+        cache = FeedCache(path=self.tmp.path)
+        with self.assertRaises(HTTPError) as e:
+            cache.fetch(self.url.replace('feed', 'missing'))
+        self.assertEqual(e.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
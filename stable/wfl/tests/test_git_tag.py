@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+
+import os
+import subprocess
+from testfixtures       import TempDirectory
+from types              import SimpleNamespace
+import unittest
+from unittest           import mock
+
+from wfl.git_tag        import GitRefCache, GitRefIndex, GitRemote, GitTag
+
+
+class TestGitRefIndex(unittest.TestCase):
+
+    refs = {
+        'refs/heads/master': '1',
+        'refs/tags/Ubuntu-5.15.0-1.1': '2',
+        'refs/tags/Ubuntu-5.15.0-10.10': '3',
+        'refs/tags/Ubuntu-5.15.0-10.10+1': '4',
+        'refs/tags/Ubuntu-5.15.0-10.10+2': '5',
+        'refs/tags/Ubuntu-aws-5.15.0-10.10': '6',
+    }
+
+    def test_contains(self):
+        index = GitRefIndex(self.refs)
+        self.assertIn('refs/tags/Ubuntu-5.15.0-10.10', index)
+        self.assertNotIn('refs/tags/Ubuntu-5.15.0-10.11', index)
+
+    def test_prefixed(self):
+        index = GitRefIndex(self.refs)
+        self.assertEqual(index.prefixed('refs/tags/Ubuntu-5.15.0-10.10'), [
+            'refs/tags/Ubuntu-5.15.0-10.10',
+            'refs/tags/Ubuntu-5.15.0-10.10+1',
+            'refs/tags/Ubuntu-5.15.0-10.10+2',
+        ])
+        self.assertEqual(index.prefixed('refs/tags/Ubuntu-6'), [])
+
+    def test_last(self):
+        index = GitRefIndex(self.refs)
+        self.assertEqual(index.last('refs/tags/Ubuntu-5.15.0-10.10+'), 'refs/tags/Ubuntu-5.15.0-10.10+2')
+        self.assertIsNone(index.last('refs/tags/Ubuntu-5.15.0-1.1+'))
+
+
+class TestGitRemoteDirect(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = TempDirectory()
+        self.repo = os.path.join(self.tmp.path, 'repo')
+        self.git('init', '-q', self.repo)
+        self.git('-C', self.repo, 'commit', '-q', '--allow-empty', '-m', 'one')
+        self.git('-C', self.repo, 'tag', 'Ubuntu-5.15.0-1.1')
+        self.git('-C', self.repo, 'tag', '-a', '-m', 'two', 'Ubuntu-aws-5.15.0-1.1')
+        self.cache = GitRefCache(path=os.path.join(self.tmp.path, 'refs.db'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def git(self, *args):
+        env = dict(os.environ, GIT_AUTHOR_NAME='T', GIT_AUTHOR_EMAIL='t@example.com',
+            GIT_COMMITTER_NAME='T', GIT_COMMITTER_EMAIL='t@example.com')
+        subprocess.run(['git'] + list(args), check=True, env=env)
+
+    def remote(self, patterns=None):
+        remote = GitRemote(self.repo, patterns=patterns)
+        remote.cache = self.cache
+        return remote
+
+    def test_refs(self):
+        refs = self.remote().refs
+        self.assertIn('refs/tags/Ubuntu-5.15.0-1.1', refs)
+        self.assertIn('refs/tags/Ubuntu-aws-5.15.0-1.1', refs)
+        # Annotated tags are recorded against the commit they point to.
+        self.assertEqual(refs['refs/tags/Ubuntu-aws-5.15.0-1.1'], refs['refs/tags/Ubuntu-5.15.0-1.1'])
+
+    def test_patterns(self):
+        refs = self.remote(patterns=['refs/tags/Ubuntu-aws-*']).refs
+        self.assertEqual(list(refs), ['refs/tags/Ubuntu-aws-5.15.0-1.1'])
+
+    def test_cached(self):
+        self.remote().refs
+        self.git('-C', self.repo, 'tag', 'Ubuntu-5.15.0-2.2')
+        # Within the ttl the cached listing is used, and satisfies patterns.
+        self.assertNotIn('refs/tags/Ubuntu-5.15.0-2.2', self.remote().refs)
+        self.assertEqual(list(self.remote(patterns=['refs/tags/Ubuntu-aws-*']).refs),
+            ['refs/tags/Ubuntu-aws-5.15.0-1.1'])
+
+        self.cache.ttl = -1
+        self.assertIn('refs/tags/Ubuntu-5.15.0-2.2', self.remote().refs)
+
+
+class TestGitTag(unittest.TestCase):
+
+    git = TestGitRemoteDirect.git
+
+    def setUp(self):
+        self.tmp = TempDirectory()
+        self.repo = os.path.join(self.tmp.path, 'repo')
+        self.git('init', '-q', self.repo)
+        self.git('-C', self.repo, 'commit', '-q', '--allow-empty', '-m', 'one')
+        for tag in ('Ubuntu-5.15.0-10.10', 'Ubuntu-5.15.0-11.11+1', 'Ubuntu-5.15.0-11.11+2',
+                'Ubuntu-hwe-5.15.0-12.12_20.04.1', 'Ubuntu-aws-5.15.0-13.13'):
+            self.git('-C', self.repo, 'tag', tag)
+
+        cache = GitRefCache(path=os.path.join(self.tmp.path, 'refs.db'))
+        self.addCleanup(cache.close)
+        patcher = mock.patch.object(GitRefCache, '_shared', cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def package(self, name):
+        return SimpleNamespace(repo=SimpleNamespace(url=self.repo), source=SimpleNamespace(name=name))
+
+    def test_exact(self):
+        tag = GitTag(self.package('linux'), '5.15.0-10.10')
+        self.assertTrue(tag.verifiable)
+        self.assertTrue(tag.present)
+        self.assertEqual(tag.version, '5.15.0-10.10')
+
+    def test_missing(self):
+        tag = GitTag(self.package('linux'), '5.15.0-13.13')
+        self.assertTrue(tag.verifiable)
+        self.assertFalse(tag.present)
+        self.assertEqual(tag.version, '5.15.0-13.13')
+
+    def test_sloppy(self):
+        # A respin picks the highest matching tag.
+        tag = GitTag(self.package('linux'), '5.15.0-11.11', sloppy='+')
+        self.assertTrue(tag.present)
+        self.assertEqual(tag.version, '5.15.0-11.11+2')
+
+        # With no respin tagged the exact tag still matches.
+        tag = GitTag(self.package('linux'), '5.15.0-10.10', sloppy='+')
+        self.assertTrue(tag.present)
+        self.assertEqual(tag.version, '5.15.0-10.10')
+
+    def test_edge(self):
+        # -edge packages are tagged with the non-edge prefix.
+        tag = GitTag(self.package('linux-hwe-edge'), '5.15.0-12.12~20.04.1')
+        self.assertTrue(tag.present)
+        self.assertEqual(tag.version, '5.15.0-12.12~20.04.1')
+
+        tag = GitTag(self.package('linux-hwe-edge'), '5.15.0-10.10')
+        self.assertFalse(tag.present)
+
+
+if __name__ == '__main__':
+    unittest.main()
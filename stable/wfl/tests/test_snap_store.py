@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+import io
+import json
+import os
+from testfixtures       import TempDirectory
+import unittest
+from unittest           import mock
+
+from wfl.snap           import SnapStore, SnapStoreCache
+
+
+class FakeSnap:
+
+    def __init__(self, name, publish_to):
+        self.name = name
+        self.publish_to = publish_to
+
+
+class FakeStore:
+
+    def __init__(self):
+        self.requests = []
+
+    def urlopen(self, req):
+        data = json.loads(req.data)
+        self.requests.append((req.headers.get('Snap-device-architecture'), data))
+        results = []
+        for action in data['actions']:
+            (track, risk) = action['channel'].split('/', 1)
+            if risk != 'stable':
+                results.append({'instance-key': action['instance-key'], 'error': {'code': 'revision-not-found'}})
+                continue
+            results.append({
+                'instance-key': action['instance-key'],
+                'released-at': '2024-01-02T03:04:05.000000+00:00',
+                'snap': {'version': action['name'] + '-' + track, 'revision': len(action['name'])},
+            })
+        return io.BytesIO(json.dumps({'results': results}).encode('utf-8'))
+
+
+class TestSnapStoreResolve(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = TempDirectory()
+        self.cache = SnapStoreCache(path=os.path.join(self.tmp.path, 'snap-store.db'))
+        self.store = FakeStore()
+        self.snaps = [
+            FakeSnap('pc-kernel', {'amd64': ['22'], 'arm64': ['22']}),
+            FakeSnap('pi-kernel', {'arm64': ['22', '24']}),
+        ]
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def resolve(self, snaps):
+        with mock.patch('wfl.snap.urlopen', self.store.urlopen):
+            return SnapStore.resolve(snaps, secrets={}, cache=self.cache)
+
+    def test_batched(self):
+        found = self.resolve(self.snaps)
+        # One request per architecture covering all of the snaps.
+        self.assertEqual(sorted(arch for arch, data in self.store.requests), ['amd64', 'arm64'])
+
+        (channels, revisions) = found['pc-kernel']
+        self.assertEqual(sorted(channels), [('amd64', '22/stable'), ('arm64', '22/stable')])
+        self.assertEqual(channels[('amd64', '22/stable')]['version'], 'pc-kernel-22')
+        self.assertEqual(list(revisions), [9])
+
+        (channels, revisions) = found['pi-kernel']
+        self.assertEqual(sorted(channels), [('arm64', '22/stable'), ('arm64', '24/stable')])
+
+    def test_cached(self):
+        first = self.resolve(self.snaps)
+        self.assertEqual(self.resolve(self.snaps[1:])['pi-kernel'], first['pi-kernel'])
+        self.assertEqual(len(self.store.requests), 2)
+
+        self.cache.ttl = -1
+        self.resolve(self.snaps[1:])
+        self.assertEqual(len(self.store.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+
+from datetime           import datetime
+import json
+import sys
+from testfixtures       import TempDirectory
+import unittest
+
+from wfl.status_store   import StatusStore
+
+
+class TestStatusStoreCore(unittest.TestCase):
+
+    if sys.version_info[:3] > (3, 0):
+        def assertItemsEqual(self, a, b):
+            return self.assertCountEqual(a, b)
+
+
+class TestStatusStore(TestStatusStoreCore):
+
+    data_json = """{
+        "trackers": {
+            "100": {
+                "series": "jammy",
+                "source": "linux",
+                "target": "linux",
+                "manager": {
+                    "time-scanned": {"_isoformat": "2024-01-02T00:00:00"},
+                    "time-modified": {"_isoformat": "2024-01-03T00:00:00"}
+                }
+            },
+            "101": {
+                "series": "jammy",
+                "source": "linux-meta",
+                "target": "linux-meta",
+                "master-bug": 100,
+                "manager": {
+                    "time-scanned": {"_isoformat": "2024-01-02T12:00:00"}
+                }
+            },
+            "102": {
+                "series": "jammy",
+                "source": "linux-signed",
+                "target": "linux-signed",
+                "master-bug": 100,
+                "manager": {
+                    "time-scanned": {"_isoformat": "2024-01-04T00:00:00.500000"}
+                }
+            },
+            "103": {
+                "series": "focal",
+                "source": "linux",
+                "target": "linux",
+                "master-bug": 999,
+                "manager": {
+                    "time-scanned": null
+                }
+            }
+        }
+    }"""
+
+    def store(self, d):
+        d.write("status.json", self.data_json.encode("utf-8"))
+        return StatusStore(d.getpath("status.db"), legacy_path=d.getpath("status.json"))
+
+    def test_import(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+
+            self.assertEqual(sorted(store.index().keys()), ["100", "101", "102", "103"])
+            self.assertEqual(store.get("100")["manager"]["time-modified"], datetime(2024, 1, 3))
+            self.assertIsNone(store.get("200"))
+
+    def test_import_once(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+            with store.transaction():
+                store.delete("100")
+            store.close()
+
+            store = StatusStore(d.getpath("status.db"), legacy_path=d.getpath("status.json"))
+            self.assertIsNone(store.get("100"))
+
+    def test_index(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+
+            index = store.index()
+            self.assertEqual(index["100"], {"series": "jammy", "source": "linux", "target": "linux"})
+            self.assertEqual(index["101"]["master-bug"], "100")
+
+    def test_children(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+
+            self.assertItemsEqual([bugid for bugid, data in store.children("100")], ["101", "102"])
+            self.assertEqual(store.children("101"), [])
+
+    def test_for_target(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+
+            self.assertEqual([bugid for bugid, data in store.for_target("jammy", "linux", "linux")], ["100"])
+            self.assertEqual(store.for_target("noble", "linux", "linux"), [])
+
+    def test_stale_dependants(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+
+            stale = {bugid: (master, scanned, modified) for bugid, master, scanned, modified in store.stale_dependants()}
+            self.assertEqual(sorted(stale.keys()), ["101", "103"])
+            self.assertEqual(stale["101"], ("100", datetime(2024, 1, 2, 12), datetime(2024, 1, 3)))
+            self.assertEqual(stale["103"], ("999", None, None))
+
+    def test_set_updates_index(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+
+            with store.transaction():
+                data = store.get("101")
+                data["manager"]["time-scanned"] = datetime(2024, 1, 5)
+                store.set("101", data)
+
+            self.assertNotIn("101", [bugid for bugid, _, _, _ in store.stale_dependants()])
+
+    def test_rollback(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+
+            with self.assertRaises(ValueError):
+                with store.transaction():
+                    store.delete("100")
+                    raise ValueError("abort")
+
+            self.assertIsNotNone(store.get("100"))
+
+    def test_export(self):
+        with TempDirectory() as d:
+            store = self.store(d)
+            path = d.getpath("export.json")
+
+            self.assertTrue(store.export_json(path))
+            self.assertFalse(store.export_json(path))
+
+            with open(path) as rfd:
+                data = json.load(rfd)
+            self.assertEqual(sorted(data["trackers"].keys()), ["100", "101", "102", "103"])
+            self.assertEqual(data["trackers"]["100"]["manager"]["time-modified"], {"_isoformat": "2024-01-03T00:00:00"})
+
+            with store.transaction():
+                store.delete("103")
+            self.assertTrue(store.export_json(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,9 @@
 import json
-from urllib.request import urlopen
 from urllib.error import HTTPError
 
 from wfl.bug                                    import WorkflowBugTaskError
 from wfl.errors                                 import ShankError
+from wfl.feed_cache                             import FeedCache
 from wfl.log                                    import center, cleave, cdebug, cinfo
 from .base                                      import TaskHandler
 import requests
@@ -69,8 +69,7 @@ def __init__(self, url=None, data=None):
 
         if data is None:
             try:
-                response = urlopen(url)
-                data = response.read()
+                data = FeedCache().fetch(url)
             except HTTPError as e:
                 data = AutomatedTestingResultsError("overall-results-data fetch failure -- " + str(e.reason))
 
@@ -84,17 +83,19 @@ def __init__(self, url=None, data=None):
         else:
             self.data = {}
 
+        # Index the records by (series, source, version), the first record
+        # for each wins.
+        self._index = {}
+        if not isinstance(self.data, Exception):
+            for record in self.data:
+                key = (record.get('series'), record.get('source'), record.get('latest_version'))
+                self._index.setdefault(key, record)
+
     def lookup_result(self, series, source, version):
         if isinstance(self.data, Exception):
             raise self.data
 
-        for record in self.data:
-            if (record.get('series') == series and
-                    record.get('source') == source and
-                    record.get('latest_version') == version):
-                break
-        else:
-            record = {}
+        record = self._index.get((series, source, version), {})
 
         return AutomatedTestingResultsOne(record)
 
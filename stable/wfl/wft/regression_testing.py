@@ -1,9 +1,9 @@
 import json
-from urllib.request import urlopen
 from urllib.error import HTTPError, URLError
 
 from wfl.bug                                    import WorkflowBugTaskError
 from wfl.errors                                 import ShankError
+from wfl.feed_cache                             import FeedCache
 from wfl.log                                    import center, cleave, cdebug, cinfo
 from .base                                      import TaskHandler
 
@@ -27,8 +27,7 @@ def __init__(self, cycle, url=None, data=None):
 
         if data is None:
             try:
-                response = urlopen(url, timeout=30)
-                data = response.read()
+                data = FeedCache().fetch(url, timeout=30)
             except HTTPError as e:
                 if e.code != 404:
                     raise e
@@ -47,6 +46,18 @@ def __init__(self, cycle, url=None, data=None):
         else:
             self.data = {}
 
+        # op -> series codename -> series data
+        self._series = {}
+
+    def series_data(self, op_data):
+        '''
+        Return op_data's series indexed by codename, the first entry for
+        each codename wins.
+        '''
+        series = {}
+        for series_name, series_data in op_data.get("series-names", {}).items():
+            series.setdefault(series_data.get("series-codename"), series_data)
+        return series
 
     def lookup_result(self, series, source, version, op):
         if isinstance(self.data, Exception):
@@ -63,11 +74,10 @@ def lookup_result(self, series, source, version, op):
             return None
 
         # Find the series by codename.
-        all_series_data = op_data.get("series-names", {})
-        for series_name, series_data in all_series_data.items():
-            if series_data.get("series-codename") == series:
-                break
-        else:
+        if op not in self._series:
+            self._series[op] = self.series_data(op_data)
+        series_data = self._series[op].get(series)
+        if series_data is None:
             cdebug(f"lookup_result: no series data for {series}")
             return None
 
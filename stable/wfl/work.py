@@ -4,14 +4,26 @@
 import os
 import json
 import uuid
+from contextlib import contextmanager
 
 from ktl.msgq import MsgQueueService, MsgQueueCredentials
 
 from wfl.secrets import Secrets
 
 
+class SwmWorkBatch:
+    def __init__(self):
+        self.messages = []
+        self.failed = []
+
+    @property
+    def failed_payloads(self):
+        return [payload for key, payload, priority in self.failed]
+
+
 class SwmWorkCmds:
     _group = None
+    _batch = None
 
     def _publish(self, payload, priority=None, name=None):
         if priority is None:
@@ -19,7 +31,25 @@ def _publish(self, payload, priority=None, name=None):
         key = "swm.{}".format(payload["type"])
         if name:
             key = "direct.{}.".format(name) + key
-        self.mq.publish(key, payload, priority=priority)
+        if self._batch is not None:
+            self._batch.messages.append((key, payload, priority))
+        else:
+            self.mq.publish(key, payload, priority=priority)
+
+    @contextmanager
+    def batch(self, window=64):
+        """
+        Collect all commands sent within the context and publish them as a
+        single confirmed batch on exit.  Messages the broker did not accept
+        are reported in the batch failed list.
+        """
+        batch = SwmWorkBatch()
+        self._batch = batch
+        try:
+            yield batch
+        finally:
+            self._batch = None
+        batch.failed = self.mq.publish_batch(batch.messages, window=window)
 
     def group_id(self, rotate=False):
         if self._group is None or rotate: